@@ -0,0 +1,49 @@
+import json
+
+from django.db import models
+
+from api.services import fast_json
+from api.services.compact_codec import CompactCodec
+
+
+class CompactJSONField(models.BinaryField):
+    """JSON value stored as a `CompactCodec` blob.
+
+    Reads and writes plain Python values, so models and serializers see the same
+    shape as a ``JSONField``. Rows written before the column was compacted still
+    hold JSON text and are decoded transparently until ``compact_voices`` rewrites them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('editable', True)
+        super().__init__(*args, **kwargs)
+
+    def encode(self, value):
+        return CompactCodec.encode_json(value)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return fast_json.loads(value)
+
+        return CompactCodec.decode(value)
+
+    def to_python(self, value):
+        return value
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, (bytes, memoryview)):
+            return value
+
+        return self.encode(value)
+
+    def value_to_string(self, obj):
+        return json.dumps(self.value_from_object(obj))
+
+
+class PackedWordsField(CompactJSONField):
+    """Whisper word timestamps packed into float32 arrays and a string table."""
+
+    def encode(self, value):
+        return CompactCodec.encode_words(value)
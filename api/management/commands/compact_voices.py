@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import CharField, Func, IntegerField, Q, Sum
+from django.db.models.functions import Coalesce, Length
+
+from api.models import Voice
+
+
+class SqliteType(Func):
+    function = 'typeof'
+    output_field = CharField()
+
+
+class Command(BaseCommand):
+    help = "Rewrite voices whose words/analysed columns still hold JSON text in the compact binary format."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Voices converted per transaction.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        converted, before, after = 0, 0, 0
+        last_pk = None
+
+        while True:
+            legacy = self.legacy_voices()
+            if last_pk is not None:
+                legacy = legacy.filter(pk__gt=last_pk)
+            batch = list(legacy.order_by('pk').only('uuid', 'words', 'analysed')[:batch_size])
+            if not batch:
+                break
+
+            pks = [voice.pk for voice in batch]
+            before += self.stored_bytes(pks)
+
+            with transaction.atomic():
+                # update() skips Voice.save(): rollups and band scores do not change
+                for voice in batch:
+                    Voice.all_objects.filter(pk=voice.pk).update(words=voice.words, analysed=voice.analysed)
+
+            after += self.stored_bytes(pks)
+            converted += len(batch)
+            last_pk = pks[-1]
+            self.stdout.write(f"Converted {converted} voice(s)...")
+
+        self.stdout.write(f"Compacted {converted} voice(s): {before} -> {after} bytes.")
+        if converted:
+            self.stdout.write("Run VACUUM on the database to return the freed pages to the filesystem.")
+
+    @staticmethod
+    def legacy_voices():
+        return Voice.all_objects.annotate(
+            words_type=SqliteType('words'),
+            analysed_type=SqliteType('analysed'),
+        ).filter(Q(words_type='text') | Q(analysed_type='text'))
+
+    @staticmethod
+    def stored_bytes(pks) -> int:
+        sizes = Voice.all_objects.filter(pk__in=pks).aggregate(
+            total=Sum(
+                Coalesce(Length('words'), 0) + Coalesce(Length('analysed'), 0),
+                output_field=IntegerField(),
+            )
+        )
+        return sizes['total'] or 0
@@ -0,0 +1,63 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.services import timings
+from api.services.audio_probe import InvalidAudio
+from api.services.job_queue import VoiceJobQueue
+from api.services.resilience import Deadline
+from api.services.voice_processor import VoiceProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Process queued voice uploads (transcription and analysis)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is drained.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--max-jobs', type=int, default=0, help="Exit after processing this many jobs (0 = unlimited).")
+
+    def handle(self, *args, **options):
+        queue = VoiceJobQueue()
+        queue.check_lock_timeout()
+        processed = 0
+
+        while not options['max_jobs'] or processed < options['max_jobs']:
+            job = queue.claim()
+
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.run_job(queue, job)
+            processed += 1
+
+        self.stdout.write(f"Processed {processed} job(s).")
+
+    def run_job(self, queue, job):
+        voice = job.voice
+
+        if voice.deleted_at is not None:
+            queue.complete(job)
+            return
+
+        processor = VoiceProcessor(country_code=voice.request_country, analysis_mode=job.analysis_mode)
+
+        try:
+            with timings.scope(), Deadline.budget(settings.VOICE_JOB_BUDGET_S), voice.file.open('rb') as audio:
+                processor.process(voice, audio)
+        except InvalidAudio as e:
+            # Unreadable or too long audio stays that way, retrying cannot help
+            logger.warning("Voice job %s rejected the audio: %s", job.pk, e)
+            queue.fail(job, e, retry=False)
+        except Exception as e:
+            logger.exception("Voice job %s failed (attempt %s)", job.pk, job.attempts)
+            queue.fail(job, e)
+        else:
+            queue.complete(job)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from api.models import VoiceRollup
+
+
+class Command(BaseCommand):
+    help = "Recompute the /api/stats/ rollups from the voices table and report any drift."
+
+    def handle(self, *args, **options):
+        drift = VoiceRollup.rebuild()
+
+        for (dimension, key, metric), delta in sorted(drift.items()):
+            self.stdout.write(f"{dimension}[{key!r}].{metric}: {delta:+d}")
+
+        self.stdout.write(f"Rollups rebuilt, {len(drift)} value(s) corrected.")
@@ -0,0 +1,44 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from api.services.latency_report import LatencyReport
+
+
+class Command(BaseCommand):
+    help = "Print processing time percentiles per recording length, model or language from the stored voice timings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group-by', choices=sorted(LatencyReport.GROUPS), default='duration')
+        parser.add_argument('--model', help="Only voices analysed by this model.")
+        parser.add_argument('--language', help="Only voices in this language.")
+        parser.add_argument('--since', type=datetime.date.fromisoformat, help="First day (YYYY-MM-DD).")
+        parser.add_argument('--until', type=datetime.date.fromisoformat, help="Last day (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        groups = LatencyReport(
+            group_by=options['group_by'], model=options['model'], language=options['language'],
+            since=options['since'], until=options['until'],
+        ).compute()
+
+        self.stdout.write(f"{options['group_by']:<14}{'voices':>8}" + ''.join(
+            f"{stage.removesuffix('_s') + ' p50/p95/p99 s':>24}" for stage in LatencyReport.STAGES
+        ) + f"{'tokens in/out':>16}{'retried':>9}")
+
+        for group in groups:
+            stages = ''.join(f"{self.format_percentiles(group[stage]):>24}" for stage in LatencyReport.STAGES)
+            tokens = f"{self.format_mean(group['prompt_tokens_mean'])}/{self.format_mean(group['completion_tokens_mean'])}"
+            self.stdout.write(f"{group['group'] or '-':<14}{group['count']:>8}{stages}{tokens:>16}{group['retried']:>9}")
+
+        if not groups:
+            self.stdout.write("No voice timings recorded for this selection.")
+
+    @staticmethod
+    def format_percentiles(percentiles) -> str:
+        if percentiles is None:
+            return '-'
+        return '/'.join(f"{value:.1f}" for value in percentiles.values())
+
+    @staticmethod
+    def format_mean(value) -> str:
+        return '-' if value is None else f"{value:.0f}"
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_existing_voices_analysed(apps, schema_editor):
+    # Every voice stored before this migration went through the synchronous pipeline.
+    Voice = apps.get_model('api', 'Voice')
+    Voice.objects.update(status='analysed')
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_voice_request_country'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voice',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('transcribed', 'Transcribed'), ('analysed', 'Analysed'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(mark_existing_voices_analysed, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ProcessingJob',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(null=True)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('voice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='api.voice')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='api_job_status_run_after_idx')],
+            },
+        ),
+    ]
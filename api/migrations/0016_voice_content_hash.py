@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_voice_status_processingjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voice',
+            name='analysis_version',
+            field=models.CharField(max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='voice',
+            name='content_hash',
+            field=models.CharField(db_index=True, max_length=64, null=True),
+        ),
+    ]
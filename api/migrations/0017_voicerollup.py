@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:49
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    Voice = apps.get_model('api', 'Voice')
+    VoiceRollup = apps.get_model('api', 'VoiceRollup')
+
+    totals = defaultdict(lambda: [0, 0])
+    for voice in Voice.objects.filter(deleted_at__isnull=True).iterator():
+        for key in [
+            ('total', ''),
+            ('language', voice.language or ''),
+            ('country', (voice.request_country or '').upper()),
+            ('day', timezone.localdate(voice.created_at).isoformat()),
+        ]:
+            totals[key][0] += 1
+            totals[key][1] += voice.duration_s or 0
+
+    VoiceRollup.objects.bulk_create(
+        VoiceRollup(dimension=dimension, key=key, count=count, duration_s=duration_s)
+        for (dimension, key), (count, duration_s) in totals.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_voice_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoiceRollup',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('language', 'Language'), ('country', 'Country'), ('day', 'Day')], max_length=20)),
+                ('key', models.CharField(default='', max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('duration_s', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'key'), name='api_rollup_dimension_key_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:50
+
+from django.db import migrations, models
+
+BAND_SCORE_FIELDS = {
+    'fluency_band': 'fluency_and_coherence',
+    'lexical_band': 'lexical_resource',
+    'grammar_band': 'grammatical_range_and_accuracy',
+    'pronunciation_band': 'pronunciation',
+    'overall_band': 'overall_assessment',
+}
+
+
+def backfill_band_scores(apps, schema_editor):
+    Voice = apps.get_model('api', 'Voice')
+
+    batch = []
+    for voice in Voice.objects.filter(analysed__isnull=False).iterator(chunk_size=500):
+        for field, section in BAND_SCORE_FIELDS.items():
+            band_score = (voice.analysed.get(section) or {}).get('band_score')
+            setattr(voice, field, float(band_score) if band_score is not None else None)
+        voice.model_used = voice.analysed.get('model_used')
+        batch.append(voice)
+
+        if len(batch) == 500:
+            Voice.objects.bulk_update(batch, [*BAND_SCORE_FIELDS, 'model_used'])
+            batch = []
+
+    Voice.objects.bulk_update(batch, [*BAND_SCORE_FIELDS, 'model_used'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_voicerollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voice',
+            name='fluency_band',
+            field=models.FloatField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voice',
+            name='grammar_band',
+            field=models.FloatField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voice',
+            name='lexical_band',
+            field=models.FloatField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voice',
+            name='model_used',
+            field=models.CharField(db_index=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='voice',
+            name='overall_band',
+            field=models.FloatField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='voice',
+            name='pronunciation_band',
+            field=models.FloatField(db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_band_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_voice_band_scores'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='voice',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['-created_at', '-uuid'], name='api_voice_alive_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voice',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['language', '-created_at', '-uuid'], name='api_voice_alive_lang_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voice',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['request_country', '-created_at', '-uuid'], name='api_voice_alive_country_idx'),
+        ),
+    ]
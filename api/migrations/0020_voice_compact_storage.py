@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:55
+
+import api.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_voice_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='voice',
+            name='analysed',
+            field=api.fields.CompactJSONField(editable=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='voice',
+            name='words',
+            field=api.fields.PackedWordsField(editable=True, null=True),
+        ),
+    ]
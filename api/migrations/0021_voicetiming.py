@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_voice_compact_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoiceTiming',
+            fields=[
+                ('voice', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='timing', serialize=False, to='api.voice')),
+                ('asr_s', models.FloatField(null=True)),
+                ('llm_s', models.FloatField(null=True)),
+                ('storage_s', models.FloatField(null=True)),
+                ('total_s', models.FloatField()),
+                ('prompt_tokens', models.IntegerField(null=True)),
+                ('completion_tokens', models.IntegerField(null=True)),
+                ('asr_host', models.CharField(max_length=255, null=True)),
+                ('retries', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
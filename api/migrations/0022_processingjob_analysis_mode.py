@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_voicetiming'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processingjob',
+            name='analysis_mode',
+            field=models.CharField(max_length=20, null=True),
+        ),
+    ]
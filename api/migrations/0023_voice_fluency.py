@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:32
+
+import api.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_processingjob_analysis_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voice',
+            name='fluency',
+            field=api.fields.CompactJSONField(editable=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def clear_local_band_scores(apps, schema_editor):
+    # Placeholder analyses of answers too short to assess were stored with band 1 scores
+    apps.get_model('api', 'Voice').objects.filter(model_used='local').update(
+        fluency_band=None, lexical_band=None, grammar_band=None, pronunciation_band=None, overall_band=None,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_cache_tables'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_local_band_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_clear_local_band_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voice',
+            name='analysis_mode',
+            field=models.CharField(max_length=20, null=True),
+        ),
+    ]
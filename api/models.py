@@ -1,27 +1,275 @@
 import os
 
 import uuid
-from django.db import models
+from collections import Counter
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
 from uuid import uuid4
 
+from api.fields import CompactJSONField, PackedWordsField
+
 def generate_uuid4_filename(instance, filename):
     ext = filename.split('.')[-1]
     filename = "%s.%s" % (uuid.uuid4(), ext)
     return os.path.join('voices', filename)
 
+class VoiceStatus(models.TextChoices):
+    PENDING = 'pending'
+    TRANSCRIBED = 'transcribed'
+    ANALYSED = 'analysed'
+    FAILED = 'failed'
+
+class VoiceQuerySet(models.QuerySet):
+    def alive(self):
+        return self.filter(deleted_at__isnull=True)
+
+
+class AliveVoiceManager(models.Manager.from_queryset(VoiceQuerySet)):
+    """Default manager: soft-deleted voices are hidden unless `Voice.all_objects` is used."""
+
+    def get_queryset(self):
+        return super().get_queryset().alive()
+
+
 class Voice(models.Model):
     uuid = models.UUIDField(primary_key=True, default=uuid4, editable=False)
     duration_s = models.IntegerField(default=0)
     file = models.FileField(upload_to=generate_uuid4_filename, null=True)
     language = models.CharField(max_length=50, null=True)
     text = models.TextField(null=True)
-    words = models.JSONField(null=True)
-    analysed = models.JSONField(null=True)
+    words = PackedWordsField(null=True)
+    analysed = CompactJSONField(null=True)
+    # FluencyFeatures of the transcript
+    fluency = CompactJSONField(null=True)
     request_country = models.CharField(max_length=50, null=True)
+    status = models.CharField(max_length=20, choices=VoiceStatus.choices, default=VoiceStatus.PENDING)
+    content_hash = models.CharField(max_length=64, null=True, db_index=True)
+    analysis_version = models.CharField(max_length=16, null=True)
+    # LlmAnalyser mode ('single' or 'parallel') that produced `analysed`
+    analysis_mode = models.CharField(max_length=20, null=True)
+    # Denormalized from `analysed` for SQL aggregates
+    fluency_band = models.FloatField(null=True, db_index=True)
+    lexical_band = models.FloatField(null=True, db_index=True)
+    grammar_band = models.FloatField(null=True, db_index=True)
+    pronunciation_band = models.FloatField(null=True, db_index=True)
+    overall_band = models.FloatField(null=True, db_index=True)
+    model_used = models.CharField(max_length=50, null=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     deleted_at = models.DateTimeField(default=None, null=True)
 
+    objects = AliveVoiceManager()
+    all_objects = models.Manager.from_queryset(VoiceQuerySet)()
+
+    # Large JSON columns that listings skip unless asked for
+    HEAVY_FIELDS = ('words', 'analysed')
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of live voices, optionally narrowed by language or country
+            models.Index(fields=['-created_at', '-uuid'], condition=Q(deleted_at__isnull=True), name='api_voice_alive_created_idx'),
+            models.Index(fields=['language', '-created_at', '-uuid'], condition=Q(deleted_at__isnull=True), name='api_voice_alive_lang_idx'),
+            models.Index(fields=['request_country', '-created_at', '-uuid'], condition=Q(deleted_at__isnull=True), name='api_voice_alive_country_idx'),
+        ]
+
+    # Fields whose values feed VoiceRollup; their loaded values are remembered to apply deltas on save.
+    ROLLUP_FIELDS = {'duration_s', 'language', 'request_country', 'created_at', 'deleted_at'}
+
+    # `model_used` of the band 1 placeholder given to answers too short to send to the LLM; these rows keep null
+    # band columns so that analytics only aggregate real assessments
+    LOCAL_MODEL = 'local'
+
+    BAND_SCORE_FIELDS = {
+        'fluency_band': 'fluency_and_coherence',
+        'lexical_band': 'lexical_resource',
+        'grammar_band': 'grammatical_range_and_accuracy',
+        'pronunciation_band': 'pronunciation',
+        'overall_band': 'overall_assessment',
+    }
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls.ROLLUP_FIELDS.issubset(instance.__dict__):
+            instance._rollup_snapshot = VoiceRollup.contribution(instance)
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'analysed' in update_fields:
+            self.extract_band_scores()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.BAND_SCORE_FIELDS, 'model_used'}
+
+        with transaction.atomic():
+            previous = self._previous_contribution()
+            super().save(*args, **kwargs)
+            self._rollup_snapshot = VoiceRollup.contribution(self)
+            VoiceRollup.apply(previous, self._rollup_snapshot)
+
+    def extract_band_scores(self) -> None:
+        analysed = self.analysed or {}
+        self.model_used = analysed.get('model_used')
+        for field, section in self.BAND_SCORE_FIELDS.items():
+            band_score = (analysed.get(section) or {}).get('band_score') if self.model_used != self.LOCAL_MODEL else None
+            setattr(self, field, float(band_score) if band_score is not None else None)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self._previous_contribution()
+            result = super().delete(*args, **kwargs)
+            VoiceRollup.apply(previous, Counter())
+            return result
+
+    def _previous_contribution(self) -> Counter:
+        if self._state.adding:
+            return Counter()
+        if hasattr(self, '_rollup_snapshot'):
+            return self._rollup_snapshot
+        stored = type(self)._base_manager.filter(pk=self.pk).only(*self.ROLLUP_FIELDS).first()
+        return VoiceRollup.contribution(stored) if stored else Counter()
+
+
+class VoiceRollup(models.Model):
+    """Running count and duration of live voices per dimension, kept in step with Voice.save()."""
+
+    class Dimension(models.TextChoices):
+        TOTAL = 'total'
+        LANGUAGE = 'language'
+        COUNTRY = 'country'
+        DAY = 'day'
+
+    id = models.AutoField(primary_key=True)
+    dimension = models.CharField(max_length=20, choices=Dimension.choices)
+    key = models.CharField(max_length=50, default='')
+    count = models.IntegerField(default=0)
+    duration_s = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'key'], name='api_rollup_dimension_key_uniq'),
+        ]
+
+    @classmethod
+    def contribution(cls, voice: Voice) -> Counter:
+        """What a voice adds to each rollup row, as {(dimension, key, metric): amount}."""
+        if voice.deleted_at is not None:
+            return Counter()
+
+        duration = voice.duration_s or 0
+        contribution = Counter()
+        for dimension, key in cls.keys(voice):
+            contribution[(dimension, key, 'count')] += 1
+            contribution[(dimension, key, 'duration_s')] += duration
+        return contribution
+
+    @classmethod
+    def keys(cls, voice: Voice):
+        return [
+            (cls.Dimension.TOTAL, ''),
+            (cls.Dimension.LANGUAGE, voice.language or ''),
+            (cls.Dimension.COUNTRY, (voice.request_country or '').upper()),
+            (cls.Dimension.DAY, timezone.localdate(voice.created_at).isoformat()),
+        ]
+
+    @classmethod
+    def rebuild(cls) -> Counter:
+        """Recomputes every row from the voices table; returns the drift that was corrected."""
+        expected = Counter()
+        for voice in Voice._base_manager.filter(deleted_at__isnull=True).only(*Voice.ROLLUP_FIELDS).iterator():
+            expected.update(voice._rollup_snapshot)
+
+        with transaction.atomic():
+            actual = Counter()
+            for rollup in cls.objects.select_for_update():
+                actual[(rollup.dimension, rollup.key, 'count')] = rollup.count
+                actual[(rollup.dimension, rollup.key, 'duration_s')] = rollup.duration_s
+
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                cls(dimension=dimension, key=key, count=expected[(dimension, key, 'count')], duration_s=expected[(dimension, key, 'duration_s')])
+                for dimension, key in sorted({(dimension, key) for dimension, key, _ in expected})
+            )
+
+        drift = Counter(expected)
+        drift.subtract(actual)
+        return Counter({key: delta for key, delta in drift.items() if delta})
+
+    @classmethod
+    def apply(cls, previous: Counter, current: Counter) -> None:
+        deltas = {}
+        for dimension, key, metric in set(previous) | set(current):
+            delta = current[(dimension, key, metric)] - previous[(dimension, key, metric)]
+            if delta:
+                deltas.setdefault((dimension, key), {})[metric] = delta
+
+        for (dimension, key), metrics in deltas.items():
+            rollup, _ = cls.objects.get_or_create(dimension=dimension, key=key)
+            cls.objects.filter(pk=rollup.pk).update(**{
+                metric: F(metric) + delta for metric, delta in metrics.items()
+            })
+
+
+class ProcessingJob(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = 'queued'
+        RUNNING = 'running'
+        DONE = 'done'
+        FAILED = 'failed'
+
+    id = models.AutoField(primary_key=True)
+    voice = models.ForeignKey(Voice, on_delete=models.CASCADE, related_name='jobs')
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(null=True)
+    # LLM analysis mode the upload asked for; null means LLM_ANALYSIS_MODE
+    analysis_mode = models.CharField(max_length=20, null=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='api_job_status_run_after_idx'),
+        ]
+
+
+class VoiceTiming(models.Model):
+    """Where the time went while processing one voice, kept for latency analysis across deploys.
+
+    Stage times are wall-clock seconds (null when the stage did not run, e.g. on a
+    dedup or analysis cache hit); `total_s` covers the whole request or job.
+    """
+
+    voice = models.OneToOneField(Voice, on_delete=models.CASCADE, primary_key=True, related_name='timing')
+    asr_s = models.FloatField(null=True)
+    llm_s = models.FloatField(null=True)
+    storage_s = models.FloatField(null=True)
+    total_s = models.FloatField()
+    prompt_tokens = models.IntegerField(null=True)
+    completion_tokens = models.IntegerField(null=True)
+    asr_host = models.CharField(max_length=255, null=True)
+    retries = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    @classmethod
+    def record(cls, voice: Voice, timings) -> 'VoiceTiming':
+        """Stores (or, for a retried job, replaces) what `timings` gathered for `voice`."""
+        stages, facts = timings.stages, timings.facts
+        timing, _ = cls.objects.update_or_create(voice=voice, defaults={
+            'asr_s': stages.get('asr'),
+            'llm_s': stages.get('llm'),
+            'storage_s': stages.get('storage'),
+            'total_s': timings.elapsed(),
+            'prompt_tokens': facts.get('prompt_tokens'),
+            'completion_tokens': facts.get('completion_tokens'),
+            'asr_host': facts.get('asr_host'),
+            'retries': facts.get('retries', 0),
+        })
+        return timing
+
 
 class Question(models.Model):
     id = models.AutoField(primary_key=True)
-    text = models.TextField()
\ No newline at end of file
+    text = models.TextField()
@@ -0,0 +1,23 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from api.services import fast_json
+
+
+class ORJSONParser(JSONParser):
+    """JSON request bodies decoded with orjson when it is installed."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if fast_json.orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return fast_json.loads(data)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
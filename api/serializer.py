@@ -56,6 +56,25 @@ class AnalysedSerializer(serializers.Serializer):
     pronunciation = PronunciationSerializer()
     overall_assessment = OverallAssessmentSerializer()
 
+class FluencySerializer(serializers.Serializer):
+    """`FluencyFeatures` of the transcript; timing and confidence measures are null without word timestamps."""
+    word_count = serializers.IntegerField()
+    speech_s = serializers.FloatField()
+    speech_rate_wpm = serializers.FloatField(allow_null=True)
+    articulation_rate_wpm = serializers.FloatField(allow_null=True, help_text='Words per minute excluding pauses')
+    pause_count = serializers.IntegerField(allow_null=True)
+    pause_ratio = serializers.FloatField(allow_null=True, help_text='Share of the answer spent in pauses')
+    pause_mean_s = serializers.FloatField(allow_null=True)
+    pause_p90_s = serializers.FloatField(allow_null=True)
+    pause_max_s = serializers.FloatField(allow_null=True)
+    filler_count = serializers.IntegerField()
+    filler_ratio = serializers.FloatField(allow_null=True)
+    confidence_mean = serializers.FloatField(allow_null=True)
+    confidence_p10 = serializers.FloatField(allow_null=True)
+    low_confidence_ratio = serializers.FloatField(allow_null=True)
+    type_token_ratio = serializers.FloatField(allow_null=True)
+    root_type_token_ratio = serializers.FloatField(allow_null=True)
+
 # @extend_schema_serializer(
 #     examples=[
 #         OpenApiExample(
@@ -73,18 +92,212 @@ class AnalysedSerializer(serializers.Serializer):
 #     ]
 # )
 class ProcessedVoiceSerializer(serializers.ModelSerializer):
+    """Voice payload; `fields` narrows it (`analysed.<section>` picks analysis sections), `expand` adds `words`."""
+
+    EXPANDABLE = ('words',)
+
     analysed = AnalysedSerializer()
+    fluency = FluencySerializer(required=False, allow_null=True)
+    words = serializers.JSONField(required=False)
 
     class Meta:
         model = Voice
-        fields = ['uuid', 'duration_s', 'text', 'file', 'language', 'created_at', 'analysed']
+        fields = ['uuid', 'status', 'duration_s', 'text', 'file', 'language', 'created_at', 'analysed', 'fluency', 'words']
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+
+        for name in set(self.fields) - self.selected_fields(fields, expand):
+            self.fields.pop(name)
+
+        sections = {field.split('.', 1)[1] for field in fields or () if field.startswith('analysed.')}
+        if sections and 'analysed' in self.fields:
+            analysed = self.fields['analysed']
+            for name in set(analysed.fields) - sections:
+                analysed.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, fields=None, expand=()) -> set:
+        if fields:
+            selected = {field.split('.', 1)[0] for field in fields}
+        else:
+            selected = {name for name in cls.Meta.fields if name not in cls.EXPANDABLE}
+
+        return selected | set(expand)
+
+    @classmethod
+    def columns(cls, fields=None, expand=()) -> list:
+        """Model columns to load with `.only()` for the given selection."""
+        return sorted(cls.selected_fields(fields, expand) & {field.name for field in Voice._meta.get_fields()})
+
+    @classmethod
+    def field_choices(cls) -> list:
+        return [*cls.Meta.fields, *(f'analysed.{section}' for section in AnalysedSerializer().fields)]
+
+class VoiceSummarySerializer(ProcessedVoiceSerializer):
+    """Listing row; `words` and `analysed` are only serialized when named in `include`."""
+
+    class Meta(ProcessedVoiceSerializer.Meta):
+        fields = ['uuid', 'status', 'duration_s', 'text', 'file', 'language', 'request_country', 'created_at',
+                  'analysed', 'words']
+
+    def __init__(self, *args, include=(), **kwargs):
+        light = [name for name in self.Meta.fields if name not in Voice.HEAVY_FIELDS]
+        super().__init__(*args, fields=light, expand=include, **kwargs)
+
+class CommaSeparatedChoiceField(serializers.MultipleChoiceField):
+    """Accepts `?name=a,b` as well as repeated `?name=a&name=b`."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [data]
+        return super().to_internal_value([item for value in data for item in value.split(',') if item])
+
+class VoiceQuerySerializer(serializers.Serializer):
+    fields = CommaSeparatedChoiceField(choices=ProcessedVoiceSerializer.field_choices(), required=False)
+    expand = CommaSeparatedChoiceField(choices=ProcessedVoiceSerializer.EXPANDABLE, required=False)
+
+class VoiceListQuerySerializer(serializers.Serializer):
+    language = serializers.CharField(required=False)
+    country = serializers.CharField(required=False)
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+    include = CommaSeparatedChoiceField(choices=Voice.HEAVY_FIELDS, required=False)
+
+class VoiceStatusSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Voice
+        fields = ['uuid', 'status']
 
 class VoiceUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
 
+class DirectUploadRequestSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+
+class DirectUploadSerializer(serializers.Serializer):
+    uuid = serializers.UUIDField()
+    token = serializers.CharField(help_text='Pass to the completion endpoint once the upload succeeded')
+    method = serializers.CharField()
+    url = serializers.URLField()
+    fields = serializers.DictField(child=serializers.CharField(), help_text='Form fields to send before `file`')
+    expires_in = serializers.IntegerField()
+    max_bytes = serializers.IntegerField()
+
+class DirectUploadCompleteSerializer(serializers.Serializer):
+    token = serializers.CharField()
+
+class StatsBucketSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    duration_s = serializers.IntegerField()
+
 class MainStatsSerializer(serializers.Serializer):
-    # total_count = serializers.IntegerField()
+    total_count = serializers.IntegerField()
     total_duration_s = serializers.IntegerField()
+    by_language = serializers.DictField(child=StatsBucketSerializer())
+    by_country = serializers.DictField(child=StatsBucketSerializer())
+    by_day = serializers.DictField(child=StatsBucketSerializer())
+
+class CacheCounterSerializer(serializers.Serializer):
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+    hit_ratio = serializers.FloatField()
+
+class AnalysisCacheStatsSerializer(CacheCounterSerializer):
+    saved_latency_s = serializers.FloatField()
+
+class AsrNormalizationStatsSerializer(serializers.Serializer):
+    uploads = serializers.IntegerField()
+    normalized = serializers.IntegerField()
+    original_bytes = serializers.IntegerField()
+    sent_bytes = serializers.IntegerField()
+    saved_bytes = serializers.IntegerField()
+    saved_ratio = serializers.FloatField()
+    mean_normalize_s = serializers.FloatField()
+    mean_asr_normalized_s = serializers.FloatField()
+    mean_asr_original_s = serializers.FloatField()
+    asr_latency_delta_s = serializers.FloatField()
+
+class CacheStatsSerializer(serializers.Serializer):
+    analysis_cache = AnalysisCacheStatsSerializer()
+    voice_dedup = CacheCounterSerializer()
+    asr_normalization = AsrNormalizationStatsSerializer()
+
+class AsrHostStatsSerializer(serializers.Serializer):
+    url = serializers.CharField()
+    healthy = serializers.BooleanField()
+    in_flight = serializers.IntegerField()
+    max_concurrency = serializers.IntegerField()
+    requests = serializers.IntegerField()
+    failures = serializers.IntegerField()
+    latency_ewma_s = serializers.FloatField()
+    last_error = serializers.CharField(allow_blank=True)
+
+class AsrPoolStatsSerializer(serializers.Serializer):
+    queue_depth = serializers.IntegerField()
+    queue_peak = serializers.IntegerField()
+    rejected = serializers.IntegerField()
+    in_flight = serializers.IntegerField()
+    capacity = serializers.IntegerField()
+    hosts = AsrHostStatsSerializer(many=True)
+
+class UpstreamStatsSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    circuit = serializers.ChoiceField(choices=['closed', 'open', 'half_open'])
+    circuit_opened = serializers.IntegerField()
+    short_circuited = serializers.IntegerField()
+    p95_s = serializers.FloatField()
+    hedge_delay_s = serializers.FloatField()
+    calls = serializers.IntegerField()
+    retries = serializers.IntegerField()
+    hedges = serializers.IntegerField()
+    hedge_wins = serializers.IntegerField()
+    failures = serializers.IntegerField()
+
+class BandScoreQuerySerializer(serializers.Serializer):
+    criterion = serializers.ChoiceField(choices=['fluency', 'lexical', 'grammar', 'pronunciation', 'overall'], default='overall')
+    group_by = serializers.ChoiceField(choices=['none', 'language', 'country', 'model', 'day', 'week', 'month'], default='none')
+    language = serializers.CharField(required=False)
+    country = serializers.CharField(required=False)
+    model = serializers.CharField(required=False)
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+
+class BandScoreGroupSerializer(serializers.Serializer):
+    group = serializers.CharField(allow_null=True, allow_blank=True)
+    count = serializers.IntegerField()
+    mean = serializers.FloatField()
+    min = serializers.FloatField()
+    max = serializers.FloatField()
+    percentiles = serializers.DictField(child=serializers.FloatField())
+    histogram = serializers.DictField(child=serializers.IntegerField())
+
+class BandScoreAnalyticsSerializer(serializers.Serializer):
+    criterion = serializers.CharField()
+    group_by = serializers.CharField()
+    groups = BandScoreGroupSerializer(many=True)
+
+class LatencyQuerySerializer(serializers.Serializer):
+    group_by = serializers.ChoiceField(choices=['duration', 'model', 'language'], default='duration')
+    model = serializers.CharField(required=False)
+    language = serializers.CharField(required=False)
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+
+class LatencyGroupSerializer(serializers.Serializer):
+    group = serializers.CharField(allow_blank=True)
+    count = serializers.IntegerField()
+    total_s = serializers.DictField(child=serializers.FloatField(), allow_null=True)
+    asr_s = serializers.DictField(child=serializers.FloatField(), allow_null=True)
+    llm_s = serializers.DictField(child=serializers.FloatField(), allow_null=True)
+    storage_s = serializers.DictField(child=serializers.FloatField(), allow_null=True)
+    prompt_tokens_mean = serializers.FloatField(allow_null=True)
+    completion_tokens_mean = serializers.FloatField(allow_null=True)
+    retried = serializers.IntegerField()
+
+class LatencyReportSerializer(serializers.Serializer):
+    group_by = serializers.CharField()
+    groups = LatencyGroupSerializer(many=True)
 
 class QuestionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,116 @@
+import bisect
+import hashlib
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from api.services import fast_json
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """Tiered cache of LLM analyses keyed on the normalized transcript and coarse fluency hints.
+
+    The prompt itself carries per-recording detail (duration, every pause, confidence
+    to two decimals) that two recordings of the same answer never share. The key
+    takes the case- and whitespace-normalized text instead, plus the speech rate,
+    pauses and word confidence rounded by `coarse_hints`: the same words at a similar
+    pace and clarity share an entry, a halting or mumbled delivery does not.
+
+    Tiers are Django cache aliases listed in ``LLM_ANALYSIS_CACHE_TIERS``, fastest
+    first (by default an in-process LRU/TTL tier backed by a database tier). A hit
+    in a slower tier is copied into the faster ones. Keys embed the analysis schema
+    version, so changing the schema invalidates every entry.
+    """
+
+    KEY_PREFIX = 'llm-analysis'
+
+    WPM_STEP = 30
+    # Pause counts are banded as none, 1-2, 3-5 and 6 or more
+    PAUSE_BANDS = (1, 3, 6)
+
+    _lock = threading.Lock()
+    _counters = {'hits': 0, 'misses': 0, 'saved_latency_s': 0.0}
+
+    def __init__(self, schema_version: str, tiers: Optional[List[str]] = None) -> None:
+        self.schema_version = schema_version
+        self.tiers = [caches[alias] for alias in (tiers if tiers is not None else settings.LLM_ANALYSIS_CACHE_TIERS)]
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return re.sub(r'\s+', ' ', text or '').strip().casefold()
+
+    @classmethod
+    def coarse_hints(cls, features: Dict[str, Any]) -> Dict[str, Any]:
+        """`FluencyFeatures` rounded into the buckets the key distinguishes; None where not measured."""
+        wpm, pause_ratio, confidence = (features.get(name) for name in ('speech_rate_wpm', 'pause_ratio', 'confidence_mean'))
+
+        return {
+            'wpm': None if wpm is None else int(wpm // cls.WPM_STEP),
+            'pauses': bisect.bisect_right(cls.PAUSE_BANDS, features.get('pause_count') or 0),
+            'pause_ratio': None if pause_ratio is None else round(pause_ratio, 1),
+            'confidence': None if confidence is None else round(confidence, 1),
+        }
+
+    def key(self, subject: Any, model: str) -> str:
+        """`subject` is what the analysis depends on besides the model, as JSON-serializable data."""
+        digest = hashlib.sha256(fast_json.dumps(subject) + f"\x00{model}".encode()).hexdigest()
+        return f"{self.KEY_PREFIX}:{self.schema_version}:{digest}"
+
+    def get(self, subject: Any, model: str) -> Optional[Dict[str, Any]]:
+        key = self.key(subject, model)
+
+        for depth, tier in enumerate(self.tiers):
+            entry = tier.get(key)
+            if entry is None:
+                continue
+
+            for faster in self.tiers[:depth]:
+                faster.set(key, entry)
+
+            self._record_hit(key, entry['latency_s'])
+            return entry['analysis']
+
+        self._record_miss()
+        return None
+
+    def set(self, subject: Any, model: str, analysis: Dict[str, Any], latency_s: float) -> None:
+        entry = {'analysis': analysis, 'latency_s': latency_s}
+
+        for tier in self.tiers:
+            tier.set(self.key(subject, model), entry)
+
+    async def aget(self, subject: Any, model: str) -> Optional[Dict[str, Any]]:
+        return await sync_to_async(self.get)(subject, model)
+
+    async def aset(self, subject: Any, model: str, analysis: Dict[str, Any], latency_s: float) -> None:
+        await sync_to_async(self.set)(subject, model, analysis, latency_s)
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            counters = dict(cls._counters)
+
+        total = counters['hits'] + counters['misses']
+        counters['hit_ratio'] = counters['hits'] / total if total else 0.0
+
+        return counters
+
+    @classmethod
+    def _record_hit(cls, key: str, latency_s: float) -> None:
+        with cls._lock:
+            cls._counters['hits'] += 1
+            cls._counters['saved_latency_s'] += latency_s
+
+        logger.info("LLM analysis cache hit for %s, saved %.2fs", key, latency_s)
+
+    @classmethod
+    def _record_miss(cls) -> None:
+        with cls._lock:
+            cls._counters['misses'] += 1
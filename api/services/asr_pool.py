@@ -0,0 +1,283 @@
+import logging
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from api.services import timings
+from api.services.http_clients import clients
+from api.services.resilience import Deadline, DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class AsrUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Transcription capacity is exhausted, try again shortly.'
+    default_code = 'asr_unavailable'
+
+
+class AsrHost:
+    """One ASR endpoint with its concurrency cap (bulkhead) and health."""
+
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, url: str, max_concurrency: int) -> None:
+        self.url = url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.healthy = True
+        self.down_since: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self.latency_ewma_s = 0.0
+        self.last_probe_at: Optional[float] = None
+        self.last_error = ''
+
+    def available(self, now: float, cooldown_s: float) -> bool:
+        """Healthy, or down long enough that one request may find out whether it recovered."""
+        return self.healthy or now - self.down_since >= cooldown_s
+
+    def snapshot(self) -> dict:
+        return {
+            'url': self.url,
+            'healthy': self.healthy,
+            'in_flight': self.in_flight,
+            'max_concurrency': self.max_concurrency,
+            'requests': self.requests,
+            'failures': self.failures,
+            'latency_ewma_s': self.latency_ewma_s,
+            'last_error': self.last_error,
+        }
+
+
+class AsrPool:
+    """Least-outstanding-requests balancer over the ASR endpoints in ``ASR_HOSTS``.
+
+    Each host takes at most ``ASR_HOST_MAX_CONCURRENCY`` requests from this process;
+    callers beyond that wait in a queue for up to ``ASR_POOL_ACQUIRE_TIMEOUT_S`` (or
+    what is left of their deadline) and then get ``AsrUnavailable`` (503) instead of
+    piling up inside Whisper. A host that
+    fails (connection error, timeout or 5xx) is marked down and the request moves to
+    the next host. Down hosts come back through the background health probe, or
+    after ``ASR_HOST_COOLDOWN_S`` when probing is off. If every host is down the pool
+    fails open rather than rejecting everything on stale health.
+    """
+
+    _instances: Dict[tuple, 'AsrPool'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, urls: Sequence[str], max_concurrency: int) -> None:
+        self.hosts = [AsrHost(url, max_concurrency) for url in urls]
+        self._condition = threading.Condition()
+        self.waiting = 0
+        self.waiting_peak = 0
+        self.rejected = 0
+        self._prober: Optional[threading.Thread] = None
+
+    @classmethod
+    def instance(cls) -> 'AsrPool':
+        key = (tuple(settings.ASR_HOSTS), settings.ASR_HOST_MAX_CONCURRENCY)
+
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(*key)
+            pool = cls._instances[key]
+
+        pool.start_probing()
+        return pool
+
+    @classmethod
+    def reset(cls) -> None:
+        cls._instances_lock = threading.Lock()
+        cls._instances = {}
+
+    def acquire(self, exclude: Sequence[str] = ()) -> AsrHost:
+        """Reserves a slot on the least busy available host, waiting for one if all are full.
+
+        The wait is cut short by the request's `Deadline`, which then raises `DeadlineExceeded`.
+        """
+        limit = Deadline.timeout(settings.ASR_POOL_ACQUIRE_TIMEOUT_S)
+        deadline = time.monotonic() + limit
+        queued = False
+
+        with self._condition:
+            try:
+                while True:
+                    candidates = [host for host in self.hosts if host.url not in exclude]
+                    if not candidates:
+                        raise AsrUnavailable('No ASR host left to try.')
+
+                    host = self._pick(candidates)
+                    if host is not None:
+                        host.in_flight += 1
+                        return host
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise DeadlineExceeded() if limit < settings.ASR_POOL_ACQUIRE_TIMEOUT_S else AsrUnavailable()
+
+                    if not queued:
+                        queued = True
+                        self.waiting += 1
+                        self.waiting_peak = max(self.waiting_peak, self.waiting)
+                    self._condition.wait(remaining)
+            finally:
+                if queued:
+                    self.waiting -= 1
+
+    def release(self, host: AsrHost, latency_s: Optional[float] = None, error: Optional[BaseException] = None) -> None:
+        with self._condition:
+            host.in_flight -= 1
+            host.requests += 1
+
+            if error is not None:
+                host.failures += 1
+                self._mark_down(host, error)
+            elif latency_s is not None:
+                host.healthy, host.down_since = True, None
+                host.latency_ewma_s += AsrHost.LATENCY_SMOOTHING * (latency_s - host.latency_ewma_s)
+
+            self._condition.notify_all()
+
+    def call(self, send: Callable[[AsrHost], T], failover: bool = True) -> T:
+        """Runs ``send`` against a host, moving on to the next host when one fails."""
+        tried: List[str] = []
+
+        while True:
+            host = self.acquire(exclude=tried)
+            started = time.monotonic()
+            try:
+                result = send(host)
+            except Exception as exc:
+                tried.append(host.url)
+                if not self.is_host_failure(exc):
+                    self.release(host)
+                    raise
+                self.release(host, error=exc)
+                if not failover or len(tried) >= len(self.hosts):
+                    raise
+                logger.warning("ASR host %s failed (%s), failing over", host.url, exc)
+                timings.tally('retries')
+                continue
+
+            self.release(host, latency_s=time.monotonic() - started)
+            timings.note('asr_host', host.url)
+            return result
+
+    async def acall(self, send: Callable[[AsrHost], Awaitable[T]], failover: bool = True) -> T:
+        tried: List[str] = []
+
+        while True:
+            host = await sync_to_async(self.acquire, thread_sensitive=False)(tried)
+            started = time.monotonic()
+            try:
+                result = await send(host)
+            except Exception as exc:
+                tried.append(host.url)
+                if not self.is_host_failure(exc):
+                    self.release(host)
+                    raise
+                self.release(host, error=exc)
+                if not failover or len(tried) >= len(self.hosts):
+                    raise
+                logger.warning("ASR host %s failed (%s), failing over", host.url, exc)
+                timings.tally('retries')
+                continue
+
+            self.release(host, latency_s=time.monotonic() - started)
+            timings.note('asr_host', host.url)
+            return result
+
+    @staticmethod
+    def is_host_failure(exc: BaseException) -> bool:
+        """Errors that say the host is unwell, as opposed to a bad request."""
+        if isinstance(exc, (requests.ConnectionError, requests.Timeout, httpx.TransportError)):
+            return True
+        if isinstance(exc, (requests.HTTPError, httpx.HTTPStatusError)) and exc.response is not None:
+            return exc.response.status_code >= 500
+        return False
+
+    def probe(self, host: AsrHost) -> bool:
+        connect, _ = clients.timeout('whisper')
+        try:
+            response = clients.session('whisper').get(host.url + settings.ASR_HEALTH_PATH, timeout=(connect, connect))
+            healthy, error = response.status_code < 500, f'HTTP {response.status_code}'
+        except requests.RequestException as exc:
+            healthy, error = False, str(exc)
+
+        with self._condition:
+            host.last_probe_at = time.time()
+            if healthy:
+                if not host.healthy:
+                    logger.info("ASR host %s is back", host.url)
+                host.healthy, host.down_since = True, None
+                self._condition.notify_all()
+            else:
+                self._mark_down(host, error)
+
+        return healthy
+
+    def probe_all(self) -> None:
+        for host in self.hosts:
+            self.probe(host)
+
+    def start_probing(self) -> None:
+        """Background health probes, only worth running when there is another host to route to."""
+        interval = settings.ASR_HEALTH_PROBE_INTERVAL_S
+        if interval <= 0 or len(self.hosts) < 2 or (self._prober is not None and self._prober.is_alive()):
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.probe_all()
+
+        with self._condition:
+            if self._prober is None or not self._prober.is_alive():
+                self._prober = threading.Thread(target=run, name='asr-health-probe', daemon=True)
+                self._prober.start()
+
+    def stats(self) -> dict:
+        with self._condition:
+            hosts = [host.snapshot() for host in self.hosts]
+            waiting, waiting_peak, rejected = self.waiting, self.waiting_peak, self.rejected
+
+        return {
+            'queue_depth': waiting,
+            'queue_peak': waiting_peak,
+            'rejected': rejected,
+            'in_flight': sum(host['in_flight'] for host in hosts),
+            'capacity': sum(host['max_concurrency'] for host in hosts if host['healthy']),
+            'hosts': hosts,
+        }
+
+    def _pick(self, candidates: List[AsrHost]) -> Optional[AsrHost]:
+        now = time.monotonic()
+        available = [host for host in candidates if host.available(now, settings.ASR_HOST_COOLDOWN_S)] or candidates
+        free = [host for host in available if host.in_flight < host.max_concurrency]
+        if not free:
+            return None
+
+        return min(free, key=lambda host: (host.in_flight / host.max_concurrency, host.latency_ewma_s))
+
+    def _mark_down(self, host: AsrHost, error) -> None:
+        if host.healthy:
+            logger.warning("ASR host %s marked down: %s", host.url, error)
+        host.healthy = False
+        host.down_since = time.monotonic()
+        host.last_error = str(error)[:200]
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=AsrPool.reset)
@@ -0,0 +1,157 @@
+import io
+import shutil
+import subprocess
+import wave
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+
+@dataclass
+class AudioChunk:
+    offset_s: float
+    duration_s: float
+    data: bytes
+    filename: str
+
+
+class AudioChunker:
+    """Splits long recordings into ASR-sized WAV chunks, cutting in the quietest spot.
+
+    WAV is decoded natively; other containers are decoded with ``ffmpeg`` when it is
+    on the PATH. Recordings that cannot be decoded, or are shorter than the
+    threshold, are left alone (``split`` returns ``None``).
+    """
+
+    FRAME_S = 0.02
+    DECODE_RATE = 16000
+
+    def __init__(self) -> None:
+        self.window_s = settings.ASR_CHUNK_SECONDS
+        self.search_s = settings.ASR_CHUNK_SILENCE_SEARCH_S
+        self.threshold_s = settings.ASR_CHUNK_THRESHOLD_S
+
+    def split(self, audio: BinaryIO, filename: str) -> Optional[List[AudioChunk]]:
+        decoded = self.decode(audio, filename, rate=self.DECODE_RATE if settings.ASR_NORMALIZE_AUDIO else None)
+        audio.seek(0)
+
+        if decoded is None:
+            return None
+
+        samples, rate = decoded
+        if len(samples) / rate <= self.threshold_s:
+            return None
+
+        bounds = self.cut_points(samples, rate)
+        stem = filename.rsplit('.', 1)[0]
+
+        return [
+            AudioChunk(
+                offset_s=start / rate,
+                duration_s=(end - start) / rate,
+                data=self.encode_wav(samples[start:end], rate),
+                filename=f"{stem}.part{index}.wav",
+            )
+            for index, (start, end) in enumerate(zip(bounds, bounds[1:]))
+        ]
+
+    def cut_points(self, samples: np.ndarray, rate: int) -> List[int]:
+        """Sample offsets of chunk boundaries, each chunk at most ``window_s`` long."""
+        frame = max(1, int(rate * self.FRAME_S))
+        usable = len(samples) // frame * frame
+        energy = np.square(samples[:usable].reshape(-1, frame)).mean(axis=1)
+
+        bounds = [0]
+        window, search = int(self.window_s * rate), int(self.search_s * rate)
+
+        while len(samples) - bounds[-1] > window:
+            target = bounds[-1] + window
+            first, last = max(bounds[-1] + 1, target - search) // frame, target // frame
+
+            if last > first and last <= len(energy):
+                quietest = first + int(np.argmin(energy[first:last]))
+                bounds.append(quietest * frame + frame // 2)
+            else:
+                bounds.append(target)
+
+        bounds.append(len(samples))
+        return bounds
+
+    def decode(self, audio: BinaryIO, filename: str, rate: int = None) -> Optional[Tuple[np.ndarray, int]]:
+        """Mono float32 samples in [-1, 1] and their sample rate, resampled to ``rate`` if given."""
+        if filename.lower().endswith('.wav'):
+            try:
+                samples, native_rate = self._decode_wav(audio)
+                return self.resample(samples, native_rate, rate) if rate else (samples, native_rate)
+            except (wave.Error, EOFError, ValueError):
+                audio.seek(0)
+
+        decoded = self._decode_ffmpeg(audio)
+        if decoded is not None and rate:
+            return self.resample(*decoded, rate)
+        return decoded
+
+    @staticmethod
+    def resample(samples: np.ndarray, rate: int, target: int) -> Tuple[np.ndarray, int]:
+        if rate == target or not len(samples):
+            return samples, rate
+
+        if target < rate:
+            # Windowed-sinc low-pass at the new Nyquist frequency so downsampling does not alias
+            cutoff = target / rate / 2
+            taps = np.arange(-32, 33)
+            kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(len(taps))
+            samples = np.convolve(samples, kernel / kernel.sum(), mode='same')
+
+        positions = np.arange(int(len(samples) * target / rate)) * (rate / target)
+        return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32), target
+
+    @staticmethod
+    def encode_wav(samples: np.ndarray, rate: int) -> bytes:
+        buffer = io.BytesIO()
+
+        with wave.open(buffer, 'wb') as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(rate)
+            out.writeframes((np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes())
+
+        return buffer.getvalue()
+
+    @staticmethod
+    def _decode_wav(audio: BinaryIO) -> Tuple[np.ndarray, int]:
+        with wave.open(audio, 'rb') as source:
+            channels, width, rate = source.getnchannels(), source.getsampwidth(), source.getframerate()
+            raw = source.readframes(source.getnframes())
+
+        if width == 1:
+            samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+        elif width == 2:
+            samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768
+        elif width == 3:
+            padded = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+            samples = (padded[:, 0].astype(np.int32) | padded[:, 1].astype(np.int32) << 8 | padded[:, 2].astype(np.int8).astype(np.int32) << 16) / 8388608
+        elif width == 4:
+            samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648
+        else:
+            raise ValueError(f"Unsupported sample width {width}")
+
+        return samples.reshape(-1, channels).mean(axis=1).astype(np.float32), rate
+
+    def _decode_ffmpeg(self, audio: BinaryIO) -> Optional[Tuple[np.ndarray, int]]:
+        if shutil.which('ffmpeg') is None:
+            return None
+
+        result = subprocess.run(
+            ['ffmpeg', '-nostdin', '-loglevel', 'error', '-i', 'pipe:0',
+             '-f', 's16le', '-ac', '1', '-ar', str(self.DECODE_RATE), 'pipe:1'],
+            input=audio.read(),
+            capture_output=True,
+        )
+
+        if result.returncode != 0 or not result.stdout:
+            return None
+
+        return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768, self.DECODE_RATE
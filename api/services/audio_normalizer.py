@@ -0,0 +1,151 @@
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from typing import BinaryIO, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from api.services.audio_chunker import AudioChunk, AudioChunker
+
+logger = logging.getLogger(__name__)
+
+
+class AudioNormalizer:
+    """Shrinks a recording before ASR: 16 kHz mono, leading/trailing silence trimmed, re-encoded.
+
+    Whisper resamples everything to 16 kHz mono anyway, so this only drops bytes it
+    would discard. The stored upload is untouched; ``normalize`` returns an
+    ``AudioChunk`` whose ``offset_s`` is the trimmed lead-in, so ``VoiceProcessor.stitch``
+    shifts timestamps back onto the original timeline. Encodes to Ogg Opus when
+    ``ffmpeg`` is available and 16-bit WAV otherwise. Returns ``None`` when the upload
+    cannot be decoded or the result would not be smaller.
+    """
+
+    FRAME_S = 0.02
+
+    _lock = threading.Lock()
+    _counters = {
+        'uploads': 0,
+        'normalized': 0,
+        'original_bytes': 0,
+        'sent_bytes': 0,
+        'normalize_s': 0.0,
+        'asr_normalized_s': 0.0,
+        'asr_normalized_calls': 0,
+        'asr_original_s': 0.0,
+        'asr_original_calls': 0,
+    }
+
+    def __init__(self) -> None:
+        self.codec = settings.ASR_NORMALIZE_CODEC
+        self.bitrate = settings.ASR_NORMALIZE_BITRATE
+        self.silence_dbfs = settings.ASR_NORMALIZE_SILENCE_DBFS
+        self.padding_s = settings.ASR_NORMALIZE_PADDING_S
+
+    def normalize(self, audio: BinaryIO, filename: str) -> Optional[AudioChunk]:
+        started = time.monotonic()
+        audio.seek(0, os.SEEK_END)
+        size = audio.tell()
+        audio.seek(0)
+
+        decoded = AudioChunker().decode(audio, filename, rate=AudioChunker.DECODE_RATE)
+        audio.seek(0)
+        if decoded is None:
+            return None
+
+        samples, rate = decoded
+        start, end = self.speech_bounds(samples, rate)
+        data, extension = self.encode(samples[start:end], rate)
+        elapsed = time.monotonic() - started
+
+        if len(data) >= size:
+            self._record_normalize(size, size, elapsed, normalized=False)
+            logger.info("ASR audio for %s left as is, normalized %d bytes >= original %d", filename, len(data), size)
+            return None
+
+        self._record_normalize(size, len(data), elapsed, normalized=True)
+        logger.info(
+            "ASR audio for %s normalized in %.3fs: %d -> %d bytes (%.0f%% saved), %.2fs of silence trimmed",
+            filename, elapsed, size, len(data), 100 * (1 - len(data) / size) if size else 0,
+            (len(samples) - (end - start)) / rate,
+        )
+
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        return AudioChunk(offset_s=start / rate, duration_s=(end - start) / rate, data=data, filename=f"{stem}.asr.{extension}")
+
+    def speech_bounds(self, samples: np.ndarray, rate: int) -> Tuple[int, int]:
+        """Sample range from the first to the last frame above the silence floor, padded."""
+        frame = max(1, int(rate * self.FRAME_S))
+        usable = len(samples) // frame * frame
+        if not usable:
+            return 0, len(samples)
+
+        rms = np.sqrt(np.square(samples[:usable].reshape(-1, frame)).mean(axis=1))
+        loud = np.flatnonzero(rms > 10 ** (self.silence_dbfs / 20))
+        if not len(loud):
+            return 0, len(samples)
+
+        padding = int(self.padding_s * rate)
+        return max(0, int(loud[0]) * frame - padding), min(len(samples), (int(loud[-1]) + 1) * frame + padding)
+
+    def encode(self, samples: np.ndarray, rate: int) -> Tuple[bytes, str]:
+        wav = AudioChunker.encode_wav(samples, rate)
+
+        if self.codec == 'opus' and shutil.which('ffmpeg') is not None:
+            result = subprocess.run(
+                ['ffmpeg', '-nostdin', '-loglevel', 'error', '-f', 'wav', '-i', 'pipe:0',
+                 '-c:a', 'libopus', '-b:a', self.bitrate, '-f', 'ogg', 'pipe:1'],
+                input=wav,
+                capture_output=True,
+            )
+            if result.returncode == 0 and result.stdout:
+                return result.stdout, 'ogg'
+
+        return wav, 'wav'
+
+    @classmethod
+    def record_asr(cls, normalized: bool, latency_s: float) -> None:
+        group = 'normalized' if normalized else 'original'
+
+        with cls._lock:
+            cls._counters[f'asr_{group}_s'] += latency_s
+            cls._counters[f'asr_{group}_calls'] += 1
+
+        logger.info("ASR took %.2fs for %s audio", latency_s, group)
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            counters = dict(cls._counters)
+
+        def mean(total: str, count: str) -> float:
+            return counters[total] / counters[count] if counters[count] else 0.0
+
+        asr_normalized = mean('asr_normalized_s', 'asr_normalized_calls')
+        asr_original = mean('asr_original_s', 'asr_original_calls')
+
+        return {
+            'uploads': counters['uploads'],
+            'normalized': counters['normalized'],
+            'original_bytes': counters['original_bytes'],
+            'sent_bytes': counters['sent_bytes'],
+            'saved_bytes': counters['original_bytes'] - counters['sent_bytes'],
+            'saved_ratio': 1 - counters['sent_bytes'] / counters['original_bytes'] if counters['original_bytes'] else 0.0,
+            'mean_normalize_s': mean('normalize_s', 'uploads'),
+            'mean_asr_normalized_s': asr_normalized,
+            'mean_asr_original_s': asr_original,
+            'asr_latency_delta_s': asr_original - asr_normalized if asr_normalized and asr_original else 0.0,
+        }
+
+    @classmethod
+    def _record_normalize(cls, original_bytes: int, sent_bytes: int, elapsed_s: float, normalized: bool) -> None:
+        with cls._lock:
+            cls._counters['uploads'] += 1
+            cls._counters['normalized'] += int(normalized)
+            cls._counters['original_bytes'] += original_bytes
+            cls._counters['sent_bytes'] += sent_bytes
+            cls._counters['normalize_s'] += elapsed_s
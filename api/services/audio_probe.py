@@ -0,0 +1,364 @@
+import os
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Tuple
+
+from django.conf import settings
+
+
+class InvalidAudio(ValueError):
+    pass
+
+
+@dataclass
+class AudioInfo:
+    container: str
+    codec: str
+    duration_s: Optional[float]
+    sample_rate: Optional[int]
+    channels: Optional[int]
+
+
+class AudioProbe:
+    """Reads duration, sample rate and codec from container headers without decoding audio.
+
+    Supports the formats uploads come in: MP3, WAV, Ogg (Opus/Vorbis), WebM/Matroska
+    and MP4/M4A. Only a few KiB at the head (and for Ogg the tail) are read.
+    ``duration_s`` is ``None`` when the container does not record it, e.g. WebM
+    written live by MediaRecorder. Anything else raises ``InvalidAudio``.
+    """
+
+    HEAD_BYTES = 64 * 1024
+    TAIL_BYTES = 64 * 1024
+    MAX_MOOV_BYTES = 16 * 1024 * 1024
+
+    def check(self, audio: BinaryIO) -> AudioInfo:
+        """``probe`` plus the ``VOICE_MAX_DURATION_S`` limit."""
+        info = self.probe(audio)
+        limit = settings.VOICE_MAX_DURATION_S
+
+        if limit and info.duration_s is not None and info.duration_s > limit:
+            raise InvalidAudio(f"Recording is {info.duration_s:.0f}s long, the limit is {limit}s")
+
+        return info
+
+    def probe(self, audio: BinaryIO) -> AudioInfo:
+        try:
+            audio.seek(0, os.SEEK_END)
+            size = audio.tell()
+            audio.seek(0)
+            head = audio.read(self.HEAD_BYTES)
+
+            if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+                return self._wav(audio, size)
+            if head[:4] == b'OggS':
+                return self._ogg(audio, head, size)
+            if head[:4] == b'\x1a\x45\xdf\xa3':
+                return self._matroska(head)
+            if head[4:8] == b'ftyp':
+                return self._mp4(audio, size)
+            if head[:3] == b'ID3' or self._mp3_frame(head, 0) is not None:
+                return self._mp3(audio, head, size)
+        except (struct.error, IndexError, ValueError, UnicodeDecodeError) as exc:
+            if isinstance(exc, InvalidAudio):
+                raise
+            raise InvalidAudio(f"Malformed audio file: {exc}") from exc
+        finally:
+            audio.seek(0)
+
+        raise InvalidAudio("Unsupported audio format")
+
+    # WAV
+
+    WAV_CODECS = {1: 'pcm', 3: 'pcm_float', 6: 'alaw', 7: 'mulaw', 0x55: 'mp3'}
+
+    def _wav(self, audio: BinaryIO, size: int) -> AudioInfo:
+        offset, fmt = 12, None
+
+        while offset + 8 <= size:
+            audio.seek(offset)
+            chunk_id, chunk_size = struct.unpack('<4sI', audio.read(8))
+
+            if chunk_id == b'fmt ':
+                fmt = audio.read(min(chunk_size, 40))
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise InvalidAudio("WAV data chunk before fmt chunk")
+
+                tag, channels, rate, byte_rate = struct.unpack_from('<HHII', fmt)
+                if tag == 0xFFFE and len(fmt) >= 26:
+                    tag = struct.unpack_from('<H', fmt, 24)[0]
+                if not byte_rate:
+                    raise InvalidAudio("WAV with zero byte rate")
+
+                # Streaming writers leave the size at 0 or 0xFFFFFFFF
+                available = size - offset - 8
+                data_size = available if chunk_size in (0, 0xFFFFFFFF) else min(chunk_size, available)
+
+                return AudioInfo('wav', self.WAV_CODECS.get(tag, f'wav-0x{tag:04x}'), data_size / byte_rate, rate, channels)
+
+            offset += 8 + chunk_size + (chunk_size & 1)
+
+        raise InvalidAudio("WAV without data chunk")
+
+    # MP3
+
+    MP3_BITRATES = {
+        (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+        (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+        (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+        (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+        (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+        (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    }
+    MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+
+    def _mp3(self, audio: BinaryIO, head: bytes, size: int) -> AudioInfo:
+        start = 0
+        if head[:3] == b'ID3':
+            tag_size = self._syncsafe(head[6:10])
+            start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+
+        audio.seek(start)
+        data = audio.read(self.HEAD_BYTES)
+
+        for offset in range(len(data) - 4):
+            frame = self._mp3_frame(data, offset)
+            # A second frame right after the first rules out false syncs in junk bytes
+            if frame is not None and (offset + frame[4] + 4 > len(data) or self._mp3_frame(data, offset + frame[4])):
+                break
+        else:
+            raise InvalidAudio("No MPEG audio frame found")
+
+        version, layer, bitrate, sample_rate, _, channels, samples = frame
+        end = size
+        audio.seek(max(0, size - 128))
+        if audio.read(3) == b'TAG':
+            end -= 128
+
+        frames = self._mp3_frame_count(data, offset, version, channels)
+        if frames:
+            duration = frames * samples / sample_rate
+        else:
+            duration = (end - start - offset) * 8 / (bitrate * 1000)
+
+        return AudioInfo('mp3', f'mp{layer}', duration, sample_rate, channels)
+
+    def _mp3_frame(self, data: bytes, offset: int) -> Optional[Tuple]:
+        """(version, layer, kbps, sample rate, frame length, channels, samples per frame) of a valid header."""
+        if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+            return None
+
+        version = {0: 2.5, 2: 2, 3: 1}.get((data[offset + 1] >> 3) & 3)
+        layer = {1: 3, 2: 2, 3: 1}.get((data[offset + 1] >> 1) & 3)
+        bitrate_index, rate_index = data[offset + 2] >> 4, (data[offset + 2] >> 2) & 3
+        if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+            return None
+
+        bitrate = self.MP3_BITRATES[(1 if version == 1 else 2, layer)][bitrate_index]
+        sample_rate = self.MP3_SAMPLE_RATES[version][rate_index]
+        padding = (data[offset + 2] >> 1) & 1
+        channels = 1 if data[offset + 3] >> 6 == 3 else 2
+
+        if layer == 1:
+            samples, length = 384, (12 * bitrate * 1000 // sample_rate + padding) * 4
+        else:
+            samples = 576 if layer == 3 and version != 1 else 1152
+            length = samples // 8 * bitrate * 1000 // sample_rate + padding
+
+        return version, layer, bitrate, sample_rate, length, channels, samples
+
+    @staticmethod
+    def _mp3_frame_count(data: bytes, offset: int, version, channels: int) -> Optional[int]:
+        """Frame count from a Xing/Info (LAME) or VBRI header in the first frame."""
+        side_info = (32 if channels == 2 else 17) if version == 1 else (17 if channels == 2 else 9)
+        xing = offset + 4 + side_info
+
+        if data[xing:xing + 4] in (b'Xing', b'Info'):
+            flags = struct.unpack_from('>I', data, xing + 4)[0]
+            if flags & 1:
+                return struct.unpack_from('>I', data, xing + 8)[0]
+        if data[offset + 36:offset + 40] == b'VBRI':
+            return struct.unpack_from('>I', data, offset + 36 + 14)[0]
+
+        return None
+
+    @staticmethod
+    def _syncsafe(raw: bytes) -> int:
+        return raw[0] << 21 | raw[1] << 14 | raw[2] << 7 | raw[3]
+
+    # Ogg
+
+    def _ogg(self, audio: BinaryIO, head: bytes, size: int) -> AudioInfo:
+        serial = struct.unpack_from('<I', head, 14)[0]
+        segments = head[26]
+        packet = head[27 + segments:]
+
+        if packet[:8] == b'OpusHead':
+            channels, pre_skip, input_rate = struct.unpack_from('<BHI', packet, 9)
+            codec, granule_rate, sample_rate = 'opus', 48000, input_rate or 48000
+        elif packet[:7] == b'\x01vorbis':
+            channels, sample_rate = struct.unpack_from('<BI', packet, 11)
+            codec, granule_rate, pre_skip = 'vorbis', sample_rate, 0
+        else:
+            raise InvalidAudio("Unsupported Ogg codec")
+
+        audio.seek(max(0, size - self.TAIL_BYTES))
+        tail = audio.read(self.TAIL_BYTES)
+        duration = None
+
+        page = tail.rfind(b'OggS')
+        while page != -1:
+            granule, page_serial = struct.unpack_from('<qI', tail, page + 6)
+            if page_serial == serial and granule > 0:
+                duration = max(0.0, (granule - pre_skip) / granule_rate)
+                break
+            page = tail.rfind(b'OggS', 0, page)
+
+        return AudioInfo('ogg', codec, duration, sample_rate, channels)
+
+    # WebM / Matroska
+
+    EBML_MASTERS = {0x18538067, 0x1549A966, 0x1654AE6B, 0xAE, 0xE1}
+    EBML_CLUSTER = 0x1F43B675
+
+    def _matroska(self, head: bytes) -> AudioInfo:
+        found = {}
+        self._ebml_walk(head, 0, len(head), found, in_audio_track=False)
+
+        if 'codec' not in found:
+            raise InvalidAudio("Matroska file without an audio track in its header")
+
+        duration = None
+        if 'duration' in found:
+            duration = found['duration'] * found.get('timecode_scale', 1_000_000) / 1e9
+
+        codec = found['codec'].removeprefix('A_').lower()
+        sample_rate = int(found['sample_rate']) if 'sample_rate' in found else None
+
+        return AudioInfo('webm', codec, duration, sample_rate, found.get('channels'))
+
+    def _ebml_walk(self, data: bytes, position: int, end: int, found: dict, in_audio_track: bool) -> bool:
+        """Collects Info and audio track fields; returns False once the first Cluster is reached."""
+        while position < end:
+            element, position = self._vint(data, position, keep_marker=True)
+            size, position = self._vint(data, position, keep_marker=False)
+            body_end = end if size is None else min(position + size, end)
+
+            if element == self.EBML_CLUSTER:
+                return False
+            if element == 0xAE:
+                track = {}
+                self._ebml_walk(data, position, body_end, track, in_audio_track=True)
+                if track.get('track_type') == 2 and 'codec' not in found:
+                    found.update({key: value for key, value in track.items() if key != 'track_type'})
+            elif element in self.EBML_MASTERS:
+                if not self._ebml_walk(data, position, body_end, found, in_audio_track):
+                    return False
+            elif element == 0x2AD7B1:
+                found['timecode_scale'] = int.from_bytes(data[position:body_end], 'big')
+            elif element == 0x4489:
+                found['duration'] = struct.unpack('>f' if body_end - position == 4 else '>d', data[position:body_end])[0]
+            elif in_audio_track and element == 0x83:
+                found['track_type'] = int.from_bytes(data[position:body_end], 'big')
+            elif in_audio_track and element == 0x86:
+                found['codec'] = data[position:body_end].decode('ascii')
+            elif in_audio_track and element == 0xB5:
+                found['sample_rate'] = struct.unpack('>f' if body_end - position == 4 else '>d', data[position:body_end])[0]
+            elif in_audio_track and element == 0x9F:
+                found['channels'] = int.from_bytes(data[position:body_end], 'big')
+
+            if size is None:
+                return True
+            position = body_end
+
+        return True
+
+    @staticmethod
+    def _vint(data: bytes, position: int, keep_marker: bool) -> Tuple[Optional[int], int]:
+        first = data[position]
+        if first == 0:
+            raise InvalidAudio("Invalid EBML variable-length integer")
+
+        length = 9 - first.bit_length()
+        value = first if keep_marker else first & ((1 << (8 - length)) - 1)
+        for byte in data[position + 1:position + length]:
+            value = value << 8 | byte
+
+        if not keep_marker and value == (1 << (7 * length)) - 1:
+            return None, position + length  # unknown size
+
+        return value, position + length
+
+    # MP4 / M4A
+
+    MP4_CODECS = {b'mp4a': 'aac', b'alac': 'alac', b'Opus': 'opus', b'ac-3': 'ac3', b'fLaC': 'flac'}
+
+    def _mp4(self, audio: BinaryIO, size: int) -> AudioInfo:
+        moov = None
+        offset = 0
+
+        while offset + 8 <= size:
+            audio.seek(offset)
+            box_size, box_type = struct.unpack('>I4s', audio.read(8))
+            header = 8
+            if box_size == 1:
+                box_size, header = struct.unpack('>Q', audio.read(8))[0], 16
+            elif box_size == 0:
+                box_size = size - offset
+            if box_size < header:
+                raise InvalidAudio("Invalid MP4 box size")
+
+            if box_type == b'moov':
+                if box_size > self.MAX_MOOV_BYTES:
+                    raise InvalidAudio("MP4 moov box too large")
+                moov = audio.read(box_size - header)
+                break
+            offset += box_size
+
+        if moov is None:
+            raise InvalidAudio("MP4 without moov box")
+
+        for trak in self._mp4_children(moov, b'trak'):
+            mdia = next(self._mp4_children(trak, b'mdia'), None)
+            hdlr = next(self._mp4_children(mdia or b'', b'hdlr'), None)
+            if mdia is None or hdlr is None or hdlr[8:12] != b'soun':
+                continue
+
+            mdhd = self._mp4_path(mdia, [b'mdhd'])
+            if mdhd[0] == 1:
+                timescale, duration = struct.unpack_from('>IQ', mdhd, 20)
+            else:
+                timescale, duration = struct.unpack_from('>II', mdhd, 12)
+
+            stsd = self._mp4_path(mdia, [b'minf', b'stbl', b'stsd'])
+            entry_type = stsd[12:16]
+            channels, _, _, _, rate = struct.unpack_from('>HHHHI', stsd, 8 + 24)
+
+            return AudioInfo(
+                'mp4',
+                self.MP4_CODECS.get(entry_type, entry_type.decode('latin-1').strip()),
+                duration / timescale if timescale else None,
+                rate >> 16,
+                channels,
+            )
+
+        raise InvalidAudio("MP4 without an audio track")
+
+    def _mp4_path(self, box: bytes, path) -> bytes:
+        for name in path:
+            box = next(self._mp4_children(box, name), None)
+            if box is None:
+                raise InvalidAudio(f"MP4 audio track without a {name.decode('latin-1')} box")
+        return box
+
+    @staticmethod
+    def _mp4_children(box: bytes, wanted: bytes):
+        offset = 0
+        while offset + 8 <= len(box):
+            size, kind = struct.unpack_from('>I4s', box, offset)
+            if size < 8:
+                return
+            if kind == wanted:
+                yield box[offset + 8:offset + size]
+            offset += size
@@ -0,0 +1,99 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.db.models import Avg, Count, DateField, F, Max, Min, QuerySet, Value
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+
+from api.models import Voice
+from api.services import date_bounds
+
+
+class BandScoreAnalytics:
+    """Band score distributions computed from the denormalized Voice band columns.
+
+    Counts, means and extremes come from SQL aggregates; percentiles are derived
+    with NumPy from the per-value histogram, which is tiny because IELTS bands
+    move in steps of 0.5.
+    """
+
+    CRITERIA = {
+        'fluency': 'fluency_band',
+        'lexical': 'lexical_band',
+        'grammar': 'grammar_band',
+        'pronunciation': 'pronunciation_band',
+        'overall': 'overall_band',
+    }
+
+    GROUPS = {
+        'none': lambda: Value(''),
+        'language': lambda: F('language'),
+        'country': lambda: F('request_country'),
+        'model': lambda: F('model_used'),
+        'day': lambda: TruncDate('created_at'),
+        'week': lambda: TruncWeek('created_at', output_field=DateField()),
+        'month': lambda: TruncMonth('created_at', output_field=DateField()),
+    }
+
+    PERCENTILES = (10, 25, 50, 75, 90)
+
+    def __init__(self, criterion: str = 'overall', group_by: str = 'none', language: Optional[str] = None,
+                 country: Optional[str] = None, model: Optional[str] = None, since=None, until=None) -> None:
+        self.column = self.CRITERIA[criterion]
+        self.group = self.GROUPS[group_by]
+        self.filters = {
+            'language': language,
+            'request_country': country.upper() if country else None,
+            'model_used': model,
+        }
+        self.filters['created_at__gte'], self.filters['created_at__lt'] = date_bounds.day_range(since, until)
+
+    def queryset(self) -> QuerySet:
+        filters = {key: value for key, value in self.filters.items() if value is not None}
+
+        return (
+            Voice.objects
+            .filter(deleted_at__isnull=True, **{f'{self.column}__isnull': False}, **filters)
+            .annotate(group=self.group())
+        )
+
+    def compute(self) -> List[Dict[str, Any]]:
+        summaries = (
+            self.queryset()
+            .values('group')
+            .annotate(count=Count('pk'), mean=Avg(self.column), min=Min(self.column), max=Max(self.column))
+            .order_by('group')
+        )
+
+        histograms: Dict[Any, Dict[float, int]] = {}
+        for row in self.queryset().values('group', self.column).annotate(count=Count('pk')).order_by('group', self.column):
+            histograms.setdefault(row['group'], {})[row[self.column]] = row['count']
+
+        return [
+            {
+                'group': self._label(summary['group']),
+                'count': summary['count'],
+                'mean': summary['mean'],
+                'min': summary['min'],
+                'max': summary['max'],
+                'percentiles': self.percentiles(histograms[summary['group']]),
+                'histogram': {str(value): count for value, count in histograms[summary['group']].items()},
+            }
+            for summary in summaries
+            if summary['count']
+        ]
+
+    @classmethod
+    def percentiles(cls, histogram: Dict[float, int]) -> Dict[str, float]:
+        """Nearest-rank percentiles of a value -> count histogram."""
+        values = np.fromiter(histogram.keys(), dtype=float)
+        cumulative = np.cumsum(np.fromiter(histogram.values(), dtype=np.int64))
+        ranks = np.ceil(np.array(cls.PERCENTILES) / 100 * cumulative[-1])
+        picked = values[np.searchsorted(cumulative, ranks)]
+
+        return {f'p{p}': float(value) for p, value in zip(cls.PERCENTILES, picked)}
+
+    @staticmethod
+    def _label(group) -> Optional[str]:
+        if group is None:
+            return None
+        return group.isoformat() if hasattr(group, 'isoformat') else str(group)
@@ -0,0 +1,129 @@
+import struct
+import zlib
+from typing import Any, List, Optional
+
+import numpy as np
+
+from api.services import fast_json
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zlib keeps working without the wheel
+    zstandard = None
+
+
+class CompactCodec:
+    """Binary encodings for the large per-voice JSON columns.
+
+    Every blob starts with a codec byte:
+
+    - ``WORDS``: Whisper word lists as packed little-endian float32 arrays (start,
+      end, probability) plus indexes into a table of distinct word strings.
+      Timestamps are rounded to the millisecond on decode; probabilities are
+      float32 in Whisper already, so they come back unchanged.
+    - ``JSON_ZSTD`` / ``JSON_ZLIB``: compact JSON, compressed with zstd when the
+      ``zstandard`` package is installed and zlib otherwise.
+    """
+
+    WORDS = 1
+    JSON_ZSTD = 2
+    JSON_ZLIB = 3
+
+    ZSTD_LEVEL = 9
+    WORD_KEYS = {'word', 'start', 'end', 'probability'}
+    # codec, word count, string table size, index width in bytes
+    WORDS_HEADER = struct.Struct('<BIIB')
+
+    @classmethod
+    def encode_words(cls, words: Optional[List[dict]]) -> Optional[bytes]:
+        if words is None:
+            return None
+
+        if not cls._packable(words):
+            return cls.encode_json(words)
+
+        table = list(dict.fromkeys(word['word'] for word in words))
+        lookup = {text: index for index, text in enumerate(table)}
+        index_dtype = '<u2' if len(table) <= 0xFFFF else '<u4'
+
+        timings = np.array(
+            [[word['start'] for word in words], [word['end'] for word in words],
+             [word.get('probability', np.nan) for word in words]],
+            dtype='<f4',
+        ).reshape(3, len(words))
+        indexes = np.array([lookup[word['word']] for word in words], dtype=index_dtype)
+        strings = '\x00'.join(table).encode()
+
+        return b''.join([
+            cls.WORDS_HEADER.pack(cls.WORDS, len(words), len(strings), indexes.itemsize),
+            timings.tobytes(),
+            indexes.tobytes(),
+            strings,
+        ])
+
+    @classmethod
+    def encode_json(cls, value: Any) -> Optional[bytes]:
+        if value is None:
+            return None
+
+        raw = fast_json.dumps(value)
+
+        if zstandard is not None:
+            return bytes([cls.JSON_ZSTD]) + zstandard.ZstdCompressor(level=cls.ZSTD_LEVEL).compress(raw)
+
+        return bytes([cls.JSON_ZLIB]) + zlib.compress(raw, 9)
+
+    @classmethod
+    def decode(cls, blob: Optional[bytes]) -> Any:
+        if blob is None:
+            return None
+
+        blob = bytes(blob)
+        codec = blob[0]
+
+        if codec == cls.WORDS:
+            return cls._decode_words(blob)
+        if codec == cls.JSON_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd-compressed voice data")
+            return fast_json.loads(zstandard.ZstdDecompressor().decompress(blob[1:]))
+        if codec == cls.JSON_ZLIB:
+            return fast_json.loads(zlib.decompress(blob[1:]))
+
+        raise ValueError(f"Unknown compact codec {codec}")
+
+    @classmethod
+    def _decode_words(cls, blob: bytes) -> List[dict]:
+        _, count, strings_size, index_width = cls.WORDS_HEADER.unpack_from(blob)
+        offset = cls.WORDS_HEADER.size
+
+        timings = np.frombuffer(blob, dtype='<f4', count=3 * count, offset=offset).reshape(3, count)
+        offset += timings.nbytes
+        indexes = np.frombuffer(blob, dtype=f'<u{index_width}', count=count, offset=offset)
+        offset += indexes.nbytes
+        table = blob[offset:offset + strings_size].decode().split('\x00')
+
+        words = []
+        for index, start, end, probability in zip(indexes.tolist(), *(row.tolist() for row in timings)):
+            word = {'word': table[index], 'start': round(start, 3), 'end': round(end, 3)}
+            if probability == probability:  # NaN marks a missing probability
+                word['probability'] = probability
+            words.append(word)
+
+        return words
+
+    @classmethod
+    def _packable(cls, words: Any) -> bool:
+        if not isinstance(words, list):
+            return False
+
+        for word in words:
+            if not isinstance(word, dict) or not {'word', 'start', 'end'} <= word.keys() <= cls.WORD_KEYS:
+                return False
+            if not isinstance(word['word'], str) or '\x00' in word['word']:
+                return False
+            if not all(isinstance(word.get(key, 0.0), (int, float)) and not isinstance(word.get(key), bool)
+                       for key in ('start', 'end', 'probability')):
+                return False
+
+        return True
@@ -0,0 +1,19 @@
+import datetime
+from typing import Optional, Tuple
+
+from django.utils import timezone
+
+
+def day_range(since: Optional[datetime.date], until: Optional[datetime.date]) -> Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]:
+    """`(gte, lt)` datetimes covering the days `since` to `until` inclusive; None for an open bound.
+
+    Filtering a datetime column on these instead of a `__date` lookup keeps its indexes usable.
+    """
+    return (
+        start_of_day(since) if since else None,
+        start_of_day(until + datetime.timedelta(days=1)) if until else None,
+    )
+
+
+def start_of_day(day: datetime.date) -> datetime.datetime:
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
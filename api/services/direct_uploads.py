@@ -0,0 +1,83 @@
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core import signing
+from storages.utils import clean_name
+
+from api.models import Voice, generate_uuid4_filename
+
+
+@dataclass
+class PendingUpload:
+    uuid: uuid.UUID
+    key: str
+    country: str
+
+
+class DirectUploads:
+    """Presigned S3 POSTs so clients upload audio straight to the bucket.
+
+    ``initiate`` reserves a voice UUID and storage key and signs them into an opaque
+    token; ``complete`` verifies the token, so a voice can only be created for a key
+    this API handed out. Only available when the default storage is ``S3Storage``.
+    """
+
+    SALT = 'api.direct-upload'
+
+    def __init__(self) -> None:
+        self.storage = Voice._meta.get_field('file').storage
+        self.expire_s = settings.VOICE_UPLOAD_URL_EXPIRE_S
+        self.max_bytes = settings.VOICE_UPLOAD_MAX_BYTES
+
+    def supported(self) -> bool:
+        return hasattr(self.storage, 'bucket_name') and hasattr(self.storage, 'connection')
+
+    def initiate(self, filename: str, country: str) -> Dict[str, Any]:
+        voice = Voice()
+        key = generate_uuid4_filename(voice, os.path.basename(filename))
+
+        post = self.client.generate_presigned_post(
+            Bucket=self.storage.bucket_name,
+            Key=self.object_key(key),
+            Conditions=[['content-length-range', 1, self.max_bytes]],
+            ExpiresIn=self.expire_s,
+        )
+        token = signing.dumps({'uuid': str(voice.uuid), 'key': key, 'country': country}, salt=self.SALT)
+
+        return {
+            'uuid': voice.uuid,
+            'token': token,
+            'method': 'POST',
+            'url': post['url'],
+            'fields': post['fields'],
+            'expires_in': self.expire_s,
+            'max_bytes': self.max_bytes,
+        }
+
+    def resolve(self, token: str) -> PendingUpload:
+        """Raises ``signing.BadSignature`` (or ``SignatureExpired``) for tokens this API did not issue recently."""
+        # The token stays valid a little longer than the URL so slow uploads can still complete
+        payload = signing.loads(token, salt=self.SALT, max_age=2 * self.expire_s)
+
+        return PendingUpload(uuid=uuid.UUID(payload['uuid']), key=payload['key'], country=payload['country'])
+
+    def uploaded(self, upload: PendingUpload) -> bool:
+        # S3Storage.exists() always answers False when file_overwrite is on, so ask S3 directly
+        try:
+            self.client.head_object(Bucket=self.storage.bucket_name, Key=self.object_key(upload.key))
+        except ClientError:
+            return False
+
+        return True
+
+    @property
+    def client(self):
+        return self.storage.connection.meta.client
+
+    def object_key(self, name: str) -> str:
+        """Bucket key of a storage name, including the storage's `location` prefix."""
+        return self.storage._normalize_name(clean_name(name))
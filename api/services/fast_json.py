@@ -0,0 +1,32 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the stdlib path is exercised by patching `orjson` to None
+    orjson = None
+
+# Decoding and encoding of large JSON payloads (Whisper and OpenAI responses, analysis blobs,
+# API bodies). orjson is several times faster than the stdlib; without it, `json` is used.
+
+
+def engine() -> str:
+    return 'orjson' if orjson is not None else 'json'
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode()
+    return json.loads(data)
+
+
+def dumps(value: Any, default=None) -> bytes:
+    """Compact UTF-8 JSON; `default` converts types neither encoder knows (as in `json.dumps`)."""
+    if orjson is not None:
+        # Match the stdlib: non-str keys become strings and datetimes go through `default`
+        return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+
+    return json.dumps(value, default=default, separators=(',', ':'), ensure_ascii=False).encode()
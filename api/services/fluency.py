@@ -0,0 +1,116 @@
+import math
+import string
+from typing import Any, Dict, Optional
+
+import numpy as np
+from django.conf import settings
+
+
+class FluencyFeatures:
+    """Fluency measures computed locally from Whisper's word timestamps.
+
+    Words are turned into NumPy arrays once and every measure is a vectorised
+    operation on them: tens of microseconds for a few hundred words, less than
+    building the arrays from Whisper's word dicts takes. The features are stored on `Voice.fluency`, given to the LLM as hints and used
+    to skip it for answers too short to assess.
+
+    Rates are words per minute over the transcript span (speech rate) and over
+    that span minus pauses (articulation rate); a pause is a gap between words of
+    at least `pause_s`, the same threshold as the prompt's pause markers. Whisper
+    drops many hesitation sounds, so the filler ratio is a lower bound.
+    """
+
+    FILLERS = ('ah', 'eh', 'er', 'erm', 'hm', 'hmm', 'mhm', 'mm', 'uh', 'uhh', 'uhm', 'um', 'umm')
+
+    # Left as None when the transcript has no word timestamps
+    TIMED_FEATURES = (
+        'speech_rate_wpm', 'articulation_rate_wpm', 'pause_count', 'pause_ratio', 'pause_mean_s', 'pause_p90_s',
+        'pause_max_s', 'confidence_mean', 'confidence_p10', 'low_confidence_ratio',
+    )
+
+    # Word ids: punctuation-only words and hesitations get fixed ids, every other distinct word its own
+    EMPTY, FILLER = 0, 1
+
+    _STRIP = string.whitespace + string.punctuation.replace("'", '')
+
+    def __init__(self, pause_s: Optional[float] = None, low_confidence: Optional[float] = None) -> None:
+        self.pause_s = settings.LLM_PROMPT_PAUSE_S if pause_s is None else pause_s
+        self.low_confidence = settings.LLM_PROMPT_LOW_CONFIDENCE if low_confidence is None else low_confidence
+
+    def extract(self, voice_content) -> Dict[str, Any]:
+        """Features of an analyser input: one transcript dict or a list of segments."""
+        segments = voice_content if isinstance(voice_content, list) else [voice_content]
+        words = [word for segment in segments for word in segment.get('words') or []]
+        span_s = segments[-1].get('end', 0.0) - segments[0].get('start', 0.0) if segments else 0.0
+
+        if not words:
+            # Without timestamps only the text can be counted
+            return self.compute(None, None, None, self.token_ids(' '.join(segment.get('text') or '' for segment in segments).split()), span_s)
+
+        starts, ends, probabilities = np.array(
+            [[word['start'] for word in words], [word['end'] for word in words],
+             [word.get('probability', np.nan) for word in words]],
+            dtype=float,
+        ).reshape(3, len(words))
+
+        return self.compute(starts, ends, probabilities, self.token_ids(word['word'] for word in words), span_s)
+
+    @classmethod
+    def token_ids(cls, words) -> np.ndarray:
+        ids = {'': cls.EMPTY, **dict.fromkeys(cls.FILLERS, cls.FILLER)}
+        return np.array([ids.setdefault(word.strip(cls._STRIP).lower(), len(ids)) for word in words], dtype=np.intp)
+
+    def compute(self, starts: Optional[np.ndarray], ends: Optional[np.ndarray], probabilities: Optional[np.ndarray],
+                token_ids: np.ndarray, span_s: float) -> Dict[str, Any]:
+        """Features from parallel per-word arrays; `starts` is None for transcripts without timestamps."""
+        word_count = int(np.count_nonzero(token_ids != self.EMPTY))
+        filler_count = int(np.count_nonzero(token_ids == self.FILLER))
+        features = {
+            'word_count': word_count,
+            'speech_s': round(max(float(span_s), 0.0), 2),
+            'filler_count': filler_count,
+            'filler_ratio': self._round(filler_count / word_count if word_count else None),
+        }
+
+        lexical = token_ids[token_ids > self.FILLER]
+        types = np.count_nonzero(np.bincount(lexical)) if lexical.size else 0
+        features['type_token_ratio'] = self._round(types / lexical.size if lexical.size else None)
+        # Guiraud's index, less dependent on answer length than the plain ratio
+        features['root_type_token_ratio'] = self._round(types / np.sqrt(lexical.size) if lexical.size else None)
+
+        if starts is None or not starts.size:
+            return {**features, **dict.fromkeys(self.TIMED_FEATURES)}
+
+        span_s = max(float(span_s), float(ends[-1] - starts[0]), 0.0)
+        gaps = starts[1:] - ends[:-1]
+        pauses = gaps[gaps >= self.pause_s]
+        pause_total_s = float(pauses.sum())
+        articulation_s = span_s - pause_total_s
+
+        known = probabilities[~np.isnan(probabilities)]
+
+        features.update({
+            'speech_s': round(span_s, 2),
+            'speech_rate_wpm': self._round(word_count / span_s * 60 if span_s > 0 else None, 1),
+            'articulation_rate_wpm': self._round(word_count / articulation_s * 60 if articulation_s > 0 else None, 1),
+            'pause_count': int(pauses.size),
+            'pause_ratio': self._round(pause_total_s / span_s if span_s > 0 else None),
+            'pause_mean_s': self._round(pauses.mean() if pauses.size else None),
+            'pause_p90_s': self._round(self._quantile(pauses, 0.9) if pauses.size else None),
+            'pause_max_s': self._round(pauses.max() if pauses.size else None),
+            'confidence_mean': self._round(known.mean() if known.size else None),
+            'confidence_p10': self._round(self._quantile(known, 0.1) if known.size else None),
+            'low_confidence_ratio': self._round((known < self.low_confidence).mean() if known.size else None),
+        })
+
+        return features
+
+    @staticmethod
+    def _quantile(values: np.ndarray, q: float) -> float:
+        # Nearest rank; np.partition costs a fraction of np.percentile on arrays this small
+        k = max(math.ceil(q * values.size) - 1, 0)
+        return np.partition(values, k)[k]
+
+    @staticmethod
+    def _round(value, digits: int = 2) -> Optional[float]:
+        return None if value is None else round(float(value), digits)
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Dict, Tuple
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+class HttpClients:
+    """Process-wide registry of keep-alive HTTP clients for upstream services.
+
+    Each upstream named in ``OUTBOUND_HTTP`` gets one ``requests.Session`` and one
+    ``httpx.Client`` per process (plus one ``httpx.AsyncClient`` per event loop),
+    so uploads reuse pooled TCP/TLS connections.
+    Clients are dropped in forked children (e.g. gunicorn ``--preload`` workers)
+    so sockets opened by the parent are never shared.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._httpx_clients: Dict[str, httpx.Client] = {}
+        self._async_clients: Dict[str, weakref.WeakKeyDictionary] = {}
+
+    @staticmethod
+    def config(name: str) -> dict:
+        return settings.OUTBOUND_HTTP[name]
+
+    def timeout(self, name: str) -> Tuple[float, float]:
+        config = self.config(name)
+        return config['connect_timeout'], config['read_timeout']
+
+    def httpx_timeout(self, name: str) -> httpx.Timeout:
+        connect, read = self.timeout(name)
+        return httpx.Timeout(read, connect=connect)
+
+    def session(self, name: str) -> requests.Session:
+        self._check_pid()
+
+        with self._lock:
+            if name not in self._sessions:
+                self._sessions[name] = self._build_session(name)
+            return self._sessions[name]
+
+    def httpx_client(self, name: str) -> httpx.Client:
+        self._check_pid()
+
+        with self._lock:
+            if name not in self._httpx_clients:
+                self._httpx_clients[name] = self._build_httpx_client(name)
+            return self._httpx_clients[name]
+
+    def async_httpx_client(self, name: str) -> httpx.AsyncClient:
+        """Async clients are bound to the event loop they were created on."""
+        self._check_pid()
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            per_loop = self._async_clients.setdefault(name, weakref.WeakKeyDictionary())
+            if loop not in per_loop:
+                per_loop[loop] = self._build_httpx_client(name, client_class=httpx.AsyncClient)
+            return per_loop[loop]
+
+    def reset(self) -> None:
+        """Forgets every client without closing it; used in freshly forked children."""
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._sessions = {}
+        self._httpx_clients = {}
+        self._async_clients = {}
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            for client in self._httpx_clients.values():
+                client.close()
+            self._sessions = {}
+            self._httpx_clients = {}
+            self._async_clients = {}
+
+    def _check_pid(self) -> None:
+        if self._pid != os.getpid():
+            self.reset()
+
+    def _build_session(self, name: str) -> requests.Session:
+        pool_size = self.config(name)['pool_size']
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _build_httpx_client(self, name: str, client_class=httpx.Client):
+        pool_size = self.config(name)['pool_size']
+        return client_class(
+            timeout=self.httpx_timeout(name),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+
+clients = HttpClients()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=clients.reset)
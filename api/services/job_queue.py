@@ -0,0 +1,88 @@
+import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F, Q
+from django.utils import timezone
+
+from api.models import ProcessingJob, Voice, VoiceStatus
+
+
+class VoiceJobQueue:
+    """Database-backed queue of voices waiting for transcription and analysis.
+
+    Jobs are claimed with a conditional UPDATE so several workers can poll the
+    same table without a broker; a job whose worker died is picked up again
+    once its lock is older than ``VOICE_JOB_LOCK_TIMEOUT_S``.
+    """
+
+    CLAIM_BATCH = 10
+    # Time a worker needs after the job budget runs out to record the outcome and release the lock
+    LOCK_MARGIN_S = 60
+
+    def __init__(self) -> None:
+        self.max_attempts = settings.VOICE_JOB_MAX_ATTEMPTS
+        self.retry_delay_s = settings.VOICE_JOB_RETRY_DELAY_S
+        self.lock_timeout_s = settings.VOICE_JOB_LOCK_TIMEOUT_S
+
+    def check_lock_timeout(self) -> None:
+        """Locks must outlive `VOICE_JOB_BUDGET_S`; nothing refreshes them, so a shorter timeout runs slow jobs twice."""
+        if self.lock_timeout_s < settings.VOICE_JOB_BUDGET_S + self.LOCK_MARGIN_S:
+            raise ImproperlyConfigured(
+                f"VOICE_JOB_LOCK_TIMEOUT_S ({self.lock_timeout_s}s) must be at least VOICE_JOB_BUDGET_S "
+                f"({settings.VOICE_JOB_BUDGET_S:g}s) plus {self.LOCK_MARGIN_S}s"
+            )
+
+    def enqueue(self, voice: Voice, analysis_mode: Optional[str] = None) -> ProcessingJob:
+        return ProcessingJob.objects.create(voice=voice, analysis_mode=analysis_mode)
+
+    def _claimable(self, now: datetime.datetime) -> Q:
+        stale = now - datetime.timedelta(seconds=self.lock_timeout_s)
+
+        return (
+            Q(status=ProcessingJob.Status.QUEUED, run_after__lte=now)
+            | Q(status=ProcessingJob.Status.RUNNING, locked_at__lt=stale)
+        )
+
+    def claim(self) -> Optional[ProcessingJob]:
+        now = timezone.now()
+        candidates = list(
+            ProcessingJob.objects
+            .filter(self._claimable(now))
+            .order_by('run_after', 'id')
+            .values_list('id', flat=True)[:self.CLAIM_BATCH]
+        )
+
+        for job_id in candidates:
+            claimed = ProcessingJob.objects.filter(self._claimable(now), pk=job_id).update(
+                status=ProcessingJob.Status.RUNNING,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+                updated_at=now,
+            )
+            if claimed:
+                return ProcessingJob.objects.select_related('voice').get(pk=job_id)
+
+        return None
+
+    def complete(self, job: ProcessingJob) -> None:
+        job.status = ProcessingJob.Status.DONE
+        job.locked_at = None
+        job.save(update_fields=['status', 'locked_at', 'updated_at'])
+
+    def fail(self, job: ProcessingJob, error: Exception, retry: bool = True) -> None:
+        """Requeues the job with backoff, or fails it and its voice once attempts run out or `retry` is off."""
+        job.last_error = f"{type(error).__name__}: {error}"
+        job.locked_at = None
+
+        if retry and job.attempts < self.max_attempts:
+            job.status = ProcessingJob.Status.QUEUED
+            job.run_after = timezone.now() + datetime.timedelta(
+                seconds=self.retry_delay_s * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = ProcessingJob.Status.FAILED
+            Voice.all_objects.filter(pk=job.voice_id).update(status=VoiceStatus.FAILED)
+
+        job.save(update_fields=['status', 'last_error', 'locked_at', 'run_after', 'updated_at'])
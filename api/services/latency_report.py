@@ -0,0 +1,95 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.db.models import QuerySet
+
+from api.models import Voice, VoiceTiming
+from api.services import date_bounds
+
+
+class LatencyReport:
+    """Processing time percentiles from the persisted VoiceTiming rows.
+
+    Rows are grouped by recording length (`DURATION_BUCKETS_S`), by the model that
+    analysed them or by language. Stage percentiles only count voices where the
+    stage ran, so dedup and analysis cache hits do not drag them down.
+    """
+
+    DURATION_BUCKETS_S = (15, 30, 60, 120, 300, 600)
+
+    GROUPS = {
+        'duration': 'voice__duration_s',
+        'model': 'voice__model_used',
+        'language': 'voice__language',
+    }
+
+    STAGES = ('total_s', 'asr_s', 'llm_s', 'storage_s')
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, group_by: str = 'duration', model: Optional[str] = None, language: Optional[str] = None,
+                 since=None, until=None) -> None:
+        self.group_by = group_by
+        self.filters = {
+            'voice__model_used': model,
+            'voice__language': language,
+        }
+        self.filters['created_at__gte'], self.filters['created_at__lt'] = date_bounds.day_range(since, until)
+
+    def queryset(self) -> QuerySet:
+        filters = {key: value for key, value in self.filters.items() if value is not None}
+        # Short answers never reach the LLM and would show up as a model of their own
+        return VoiceTiming.objects.filter(**filters).exclude(voice__model_used=Voice.LOCAL_MODEL)
+
+    def compute(self) -> List[Dict[str, Any]]:
+        columns = (self.GROUPS[self.group_by], *self.STAGES, 'prompt_tokens', 'completion_tokens', 'retries')
+        rows = list(self.queryset().values_list(*columns))
+        if not rows:
+            return []
+
+        keys = [row[0] for row in rows]
+        # None becomes NaN, so stages that did not run drop out of their percentiles
+        values = np.array([row[1:] for row in rows], dtype=float)
+
+        if self.group_by == 'duration':
+            buckets = np.digitize(np.array(keys, dtype=float), self.DURATION_BUCKETS_S)
+            groups = {self.duration_label(bucket): buckets == bucket for bucket in np.unique(buckets)}
+        else:
+            labels = np.array(['' if key is None else str(key) for key in keys])
+            groups = {label: labels == label for label in np.unique(labels)}
+
+        return [self.summarise(group, values[selected]) for group, selected in groups.items()]
+
+    def summarise(self, group: str, values: np.ndarray) -> Dict[str, Any]:
+        stages = dict(zip(self.STAGES, values[:, :len(self.STAGES)].T))
+        prompt_tokens, completion_tokens, retries = values[:, len(self.STAGES):].T
+
+        return {
+            'group': group,
+            'count': len(values),
+            **{stage: self.percentiles(samples) for stage, samples in stages.items()},
+            'prompt_tokens_mean': self.mean(prompt_tokens),
+            'completion_tokens_mean': self.mean(completion_tokens),
+            'retried': int(np.count_nonzero(retries > 0)),
+        }
+
+    @classmethod
+    def percentiles(cls, samples: np.ndarray) -> Optional[Dict[str, float]]:
+        samples = samples[~np.isnan(samples)]
+        if not samples.size:
+            return None
+
+        picked = np.percentile(samples, cls.PERCENTILES, method='inverted_cdf')
+        return {f'p{p}': float(value) for p, value in zip(cls.PERCENTILES, picked)}
+
+    @staticmethod
+    def mean(samples: np.ndarray) -> Optional[float]:
+        samples = samples[~np.isnan(samples)]
+        return float(samples.mean()) if samples.size else None
+
+    @classmethod
+    def duration_label(cls, bucket: int) -> str:
+        bounds = (0, *cls.DURATION_BUCKETS_S)
+        if bucket >= len(cls.DURATION_BUCKETS_S):
+            return f'{bounds[-1]}s+'
+        return f'{bounds[bucket]}-{bounds[bucket + 1]}s'
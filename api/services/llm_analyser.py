@@ -1,15 +1,33 @@
+import asyncio
+import math
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 import pytz
-from typing import Dict, List, TypedDict, Any
+from typing import Dict, List, Optional, Tuple, TypedDict, Any
+import hashlib
 import json
+import logging
+import time
 from enum import Enum
 import os
+from django.conf import settings
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from api.models import Voice
+from api.services import fast_json, timings
+from api.services.analysis_cache import AnalysisCache
+from api.services.fluency import FluencyFeatures
+from api.services.http_clients import clients
+from api.services.metrics import OPENAI_TOKENS
+from api.services.prompt_builder import PromptBuilder
+from api.services.resilience import ResilientCaller
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class ModelType(Enum):
     GPT4O = "gpt-4o"
     GPT4O_MINI = "gpt-4o-mini"
@@ -222,33 +240,306 @@ class LlmAnalyser:
       }
     }
 
-    def __init__(self, voice_content: List[Dict[str, str | float]], country_code: str) -> None:
+    # Changes whenever ANALYSIS_FUNCTION changes, so stored analyses can be matched to the schema that produced them
+    SCHEMA_VERSION = hashlib.sha256(json.dumps(ANALYSIS_FUNCTION, sort_keys=True).encode()).hexdigest()[:12]
+
+    # "single" asks for the whole analysis in one call; "parallel" asks for each criterion in its own concurrent call
+    # and derives overall_assessment from them, trading a few more input tokens for a shorter wait on output
+    SINGLE, PARALLEL = 'single', 'parallel'
+    MODES = (SINGLE, PARALLEL)
+
+    CRITERIA = {
+        'fluency_and_coherence': 'Fluency and coherence',
+        'lexical_resource': 'Lexical resource',
+        'grammatical_range_and_accuracy': 'Grammatical range and accuracy',
+        'pronunciation': 'Pronunciation',
+    }
+
+    # `model_used` of analyses built without calling OpenAI
+    LOCAL_MODEL = Voice.LOCAL_MODEL
+
+    def __init__(self, voice_content: List[Dict[str, str | float]], country_code: str, cache: Optional[AnalysisCache] = None,
+                 mode: Optional[str] = None, features: Optional[Dict[str, Any]] = None) -> None:
         self.voice_content = voice_content
+        self.features = features if features is not None else FluencyFeatures().extract(voice_content)
         self.country_code = country_code.upper()
         self.model = self._determine_model()
-        self.openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.mode = self.resolve_mode(mode)
+        # The wrapper is cheap to build; the pooled httpx client underneath is shared per process
+        self.openai_client = OpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            http_client=clients.httpx_client('openai'),
+            timeout=clients.httpx_timeout('openai'),
+            # Retries, timeouts and hedging are ResilientCaller's job
+            max_retries=0,
+        )
+        self.cache = cache if cache is not None else self._default_cache()
+
+    @staticmethod
+    def resolve_mode(mode: Optional[str]) -> str:
+        return mode or settings.LLM_ANALYSIS_MODE
+
+    @classmethod
+    def _default_cache(cls) -> Optional[AnalysisCache]:
+        if not settings.LLM_ANALYSIS_CACHE_ENABLED:
+            return None
+        return AnalysisCache(schema_version=cls.SCHEMA_VERSION)
 
     def _determine_model(self) -> ModelType:
-        if self.country_code in self.EUROPEAN_COUNTRIES:
+        return self.model_for_country(self.country_code)
+
+    @classmethod
+    def model_for_country(cls, country_code: str) -> ModelType:
+        if (country_code or '').upper() in cls.EUROPEAN_COUNTRIES:
             return ModelType.GPT4O
         return ModelType.GPT4O_MINI
 
-    def _call_openai(self, prompt: str) -> str:
-        response = self.openai_client.chat.completions.create(
-            model=self.model.value,
-            messages=[{"role": "user", "content": prompt}],
-            response_format=self.ANALYSIS_FUNCTION,
+    @classmethod
+    def country_tier(cls, country_code: str) -> str:
+        """Coarse country label for metrics: the EU countries that get GPT-4o, the rest, or unknown."""
+        if not country_code:
+            return 'unknown'
+        return 'eu' if country_code.upper() in cls.EUROPEAN_COUNTRIES else 'other'
+
+    def _record_usage(self, response) -> None:
+        usage = getattr(response, 'usage', None)
+        for kind in ('prompt', 'completion'):
+            tokens = getattr(usage, f'{kind}_tokens', None)
+            if isinstance(tokens, int):
+                OPENAI_TOKENS.inc(tokens, model=self.model.value, kind=kind)
+                timings.tally(f'{kind}_tokens', tokens)
+
+        # Prompt tokens served from OpenAI's prefix cache, billed and processed at a discount
+        cached = getattr(getattr(usage, 'prompt_tokens_details', None), 'cached_tokens', None)
+        if isinstance(cached, int):
+            OPENAI_TOKENS.inc(cached, model=self.model.value, kind='cached_prompt')
+
+        prompt_tokens = getattr(usage, 'prompt_tokens', None)
+        if isinstance(prompt_tokens, int):
+            logger.debug("OpenAI %s call: %s prompt tokens (%s cached)", self.model.value, prompt_tokens, cached or 0)
+
+    @classmethod
+    def criterion_function(cls, criterion: str) -> dict:
+        """`ANALYSIS_FUNCTION` narrowed down to a single criterion's section."""
+        schema = cls.ANALYSIS_FUNCTION['json_schema']
+
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": f"ielts_{criterion}",
+                "description": schema['schema']['properties'][criterion]['description'],
+                "schema": {
+                    "type": "object",
+                    "properties": {criterion: schema['schema']['properties'][criterion]},
+                    "required": [criterion],
+                },
+            },
+        }
+
+    def _call_openai(self, messages: List[Dict[str, str]], response_format: Optional[dict] = None) -> str:
+        def attempt(timeout_s: float) -> str:
+            response = self.openai_client.chat.completions.create(
+                model=self.model.value,
+                messages=messages,
+                response_format=response_format or self.ANALYSIS_FUNCTION,
+                timeout=timeout_s,
+            )
+            self._record_usage(response)
+
+            return response.choices[0].message.content
+
+        return ResilientCaller.for_upstream('openai').call(attempt)
+
+    async def _acall_openai(self, messages: List[Dict[str, str]], response_format: Optional[dict] = None) -> str:
+        client = self._async_openai_client()
+
+        async def attempt(timeout_s: float) -> str:
+            response = await client.chat.completions.create(
+                model=self.model.value,
+                messages=messages,
+                response_format=response_format or self.ANALYSIS_FUNCTION,
+                timeout=timeout_s,
+            )
+            self._record_usage(response)
+
+            return response.choices[0].message.content
+
+        return await ResilientCaller.for_upstream('openai').acall(attempt)
+
+    def _async_openai_client(self) -> AsyncOpenAI:
+        return AsyncOpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            http_client=clients.async_httpx_client('openai'),
+            timeout=clients.httpx_timeout('openai'),
+            max_retries=0,
         )
 
-        return response.choices[0].message.content
+    def _build_messages(self, criterion: Optional[str] = None) -> List[Dict[str, str]]:
+        return PromptBuilder().messages(self.voice_content, focus=self.CRITERIA.get(criterion), features=self.features)
 
-    def analyze(self) -> any:
-        prompt = f"""
-        Analyze this speech text in detail:
-        
-        {self.voice_content}
-        """
-        response = self._call_openai(prompt)
-        analysis = json.loads(response)
+    def _parse_response(self, response: str) -> Dict[str, Any]:
+        analysis = fast_json.loads(response)
         analysis["model_used"] = self.model.value
-        return analysis
\ No newline at end of file
+        return analysis
+
+    def _requests(self) -> List[Tuple[List[Dict[str, str]], dict]]:
+        """(messages, response_format) of every call the analysis makes."""
+        if self.mode != self.PARALLEL:
+            return [(self._build_messages(), self.ANALYSIS_FUNCTION)]
+
+        return [(self._build_messages(criterion), self.criterion_function(criterion)) for criterion in self.CRITERIA]
+
+    def _cache_subject(self) -> Dict[str, Any]:
+        segments = self.voice_content if isinstance(self.voice_content, list) else [self.voice_content]
+
+        return {
+            "mode": self.mode,
+            "style": settings.LLM_PROMPT_STYLE,
+            "text": AnalysisCache.normalize(' '.join(segment.get('text') or '' for segment in segments)),
+            "hints": AnalysisCache.coarse_hints(self.features),
+        }
+
+    def _request(self, requests: List[Tuple[List[Dict[str, str]], dict]]) -> Dict[str, Any]:
+        if self.mode != self.PARALLEL:
+            return self._parse_response(self._call_openai(*requests[0]))
+
+        with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+            futures = [pool.submit(timings.in_context(self._call_openai), *request) for request in requests]
+            return self._merge({criterion: fast_json.loads(future.result()) for criterion, future in zip(self.CRITERIA, futures)})
+
+    async def _arequest(self, requests: List[Tuple[List[Dict[str, str]], dict]]) -> Dict[str, Any]:
+        if self.mode != self.PARALLEL:
+            return self._parse_response(await self._acall_openai(*requests[0]))
+
+        responses = await asyncio.gather(*(self._acall_openai(*request) for request in requests))
+        return self._merge({criterion: fast_json.loads(response) for criterion, response in zip(self.CRITERIA, responses)})
+
+    def _merge(self, responses: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        sections = {criterion: responses[criterion][criterion] for criterion in self.CRITERIA}
+        return {**sections, "overall_assessment": self.derive_overall(sections), "model_used": self.model.value}
+
+    @classmethod
+    def derive_overall(cls, sections: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """`overall_assessment` built from the criterion sections without another model call.
+
+        The band is the mean of the four criteria rounded to the nearest half band,
+        halves up, as IELTS does.
+        """
+        bands = {criterion: float(sections[criterion]['band_score']) for criterion in cls.CRITERIA}
+        overall = math.floor(sum(bands.values()) / len(bands) * 2 + 0.5) / 2
+        ranked = sorted(bands, key=bands.get, reverse=True)
+
+        strengths = [f"{cls.CRITERIA[criterion]} (band {bands[criterion]:g})" for criterion in ranked if bands[criterion] >= overall]
+        strengths += sections['fluency_and_coherence'].get('strengths', [])[:2]
+        improvements = [f"{cls.CRITERIA[criterion]} (band {bands[criterion]:g})" for criterion in reversed(ranked) if bands[criterion] < overall]
+        improvements += sections['fluency_and_coherence'].get('areas_for_improvement', [])[:2]
+        improvements += sections['grammatical_range_and_accuracy'].get('structure_analysis', {}).get('errors', [])[:2]
+
+        summary = ' '.join(
+            [f"Overall band {overall:g}."] +
+            [f"{cls.CRITERIA[criterion]} {bands[criterion]:g}: {cls._first_sentence(sections[criterion].get('detailed_feedback', ''))}"
+             for criterion in cls.CRITERIA]
+        )
+
+        return {
+            "band_score": overall,
+            "key_strengths": strengths,
+            "priority_improvements": improvements or [f"{cls.CRITERIA[ranked[-1]]} (band {bands[ranked[-1]]:g})"],
+            "summary": summary,
+        }
+
+    @staticmethod
+    def _first_sentence(text: str) -> str:
+        text = text.strip()
+        end = text.find('. ')
+        return text if end < 0 else text[:end + 1]
+
+    def is_too_short(self) -> bool:
+        return self.features['word_count'] < settings.LLM_MIN_WORDS
+
+    @classmethod
+    def short_answer_analysis(cls, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Band 1 analysis for an empty or one-word answer, which has no rateable language to send to the LLM."""
+        words = features['word_count']
+        said = f"{words} word{'' if words == 1 else 's'} in {features['speech_s']:g}s"
+        feedback = f"The answer is too short to assess ({said})."
+        advice = "Answer the question in full sentences, for at least a few seconds."
+
+        return {
+            "fluency_and_coherence": {
+                "band_score": 1.0,
+                "strengths": [],
+                "areas_for_improvement": [advice],
+                "detailed_feedback": feedback,
+            },
+            "lexical_resource": {
+                "band_score": 1.0,
+                "vocabulary_analysis": {"sophisticated_terms": [], "collocations": [], "idiomatic_expressions": []},
+                "detailed_feedback": feedback,
+            },
+            "grammatical_range_and_accuracy": {
+                "band_score": 1.0,
+                "structure_analysis": {"complex_structures": [], "errors": []},
+                "detailed_feedback": feedback,
+            },
+            "pronunciation": {
+                "band_score": 1.0,
+                "phonetic_analysis": {
+                    "clarity_score": features.get('confidence_mean') or 0.0,
+                    "problem_sounds": [],
+                    "intonation_patterns": [],
+                },
+                "detailed_feedback": feedback,
+            },
+            "overall_assessment": {
+                "band_score": 1.0,
+                "key_strengths": [],
+                "priority_improvements": [advice],
+                "summary": f"Overall band 1. {feedback}",
+            },
+            "model_used": cls.LOCAL_MODEL,
+        }
+
+    def analyze(self) -> any:
+        if self.is_too_short():
+            return self.short_answer_analysis(self.features)
+
+        subject = self._cache_subject()
+        timings.label(model=self.model.value, country_tier=self.country_tier(self.country_code))
+
+        if self.cache is not None:
+            with timings.stage('llm_cache'):
+                cached = self.cache.get(subject, self.model.value)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        with timings.stage('llm'):
+            analysis = self._request(self._requests())
+
+        if self.cache is not None:
+            self.cache.set(subject, self.model.value, analysis, time.perf_counter() - started)
+
+        return analysis
+
+    async def aanalyze(self) -> any:
+        if self.is_too_short():
+            return self.short_answer_analysis(self.features)
+
+        subject = self._cache_subject()
+        timings.label(model=self.model.value, country_tier=self.country_tier(self.country_code))
+
+        if self.cache is not None:
+            with timings.stage('llm_cache'):
+                cached = await self.cache.aget(subject, self.model.value)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        with timings.stage('llm'):
+            analysis = await self._arequest(self._requests())
+
+        if self.cache is not None:
+            await self.cache.aset(subject, self.model.value, analysis, time.perf_counter() - started)
+
+        return analysis
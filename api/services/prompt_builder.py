@@ -0,0 +1,132 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+
+class PromptBuilder:
+    """Chat messages for LlmAnalyser holding only what the IELTS rubric needs.
+
+    The system message never changes, so together with the response schema it
+    forms a stable prefix that OpenAI's prompt caching can reuse across calls.
+    Only the user message varies: duration, the transcript with pause markers
+    taken from the gaps between Whisper's word timestamps, and the words Whisper
+    was unsure of, plus a one-line summary of the `FluencyFeatures` measured
+    locally. Token ids, log probabilities and per-word timings stay out.
+
+    ``LLM_PROMPT_STYLE=legacy`` keeps the original prompt, the repr of the whole
+    transcript dict, for comparison.
+    """
+
+    COMPACT, LEGACY = 'compact', 'legacy'
+
+    SYSTEM = (
+        "You are an IELTS speaking examiner. Assess the candidate's spoken answer against the four IELTS speaking "
+        "criteria (fluency and coherence, lexical resource, grammatical range and accuracy, pronunciation) and give "
+        "an overall band.\n"
+        "The transcript comes from automatic speech recognition. Markers like [1.2s] are silences between words: "
+        "use them to judge hesitation and pacing under fluency. Words listed as low-confidence may have been "
+        "misrecognised: do not penalise grammar or vocabulary for them, treat them as a possible sign of unclear "
+        "pronunciation instead. The 'Measured' line gives speech rate, pauses, filler words, recognition confidence and "
+        "lexical diversity computed from the audio: weigh them as evidence alongside the transcript.\n"
+        "Quote the candidate's own words in strengths, errors and examples. Reply in the JSON schema provided."
+    )
+
+    _PUNCTUATION = re.compile(r"^[^\w']+|[^\w']+$")
+
+    def __init__(self, style: Optional[str] = None, pause_s: Optional[float] = None,
+                 low_confidence: Optional[float] = None) -> None:
+        self.style = style or settings.LLM_PROMPT_STYLE
+        self.pause_s = settings.LLM_PROMPT_PAUSE_S if pause_s is None else pause_s
+        self.low_confidence = settings.LLM_PROMPT_LOW_CONFIDENCE if low_confidence is None else low_confidence
+
+    def messages(self, voice_content, focus: Optional[str] = None,
+                 features: Optional[Dict[str, Any]] = None) -> List[Dict[str, str]]:
+        """`focus` names the one criterion to assess, for per-criterion calls; it goes last to keep the prefix shared.
+
+        `features` are the transcript's `FluencyFeatures`, left out of the legacy prompt.
+        """
+        suffix = f"\nAssess only: {focus}." if focus else ''
+
+        if self.style == self.LEGACY:
+            return [{"role": "user", "content": self.legacy_prompt(voice_content) + suffix}]
+
+        return [
+            {"role": "system", "content": self.SYSTEM},
+            {"role": "user", "content": self.transcript_prompt(voice_content, features) + suffix},
+        ]
+
+    @staticmethod
+    def legacy_prompt(voice_content) -> str:
+        # Byte for byte what LlmAnalyser used to send
+        return f"\n        Analyze this speech text in detail:\n        \n        {voice_content}\n        "
+
+    def transcript_prompt(self, voice_content, features: Optional[Dict[str, Any]] = None) -> str:
+        segments = voice_content if isinstance(voice_content, list) else [voice_content]
+        words = [word for segment in segments for word in segment.get('words') or []]
+        start = segments[0].get('start', 0.0) if segments else 0.0
+        end = segments[-1].get('end', 0.0) if segments else 0.0
+
+        if words:
+            text = self.marked_text(words)
+            unsure = self.low_confidence_words(words)
+        else:
+            text = ' '.join(segment.get('text', '').strip() for segment in segments)
+            unsure = []
+
+        lines = [
+            f"Duration: {max(end - start, 0.0):.1f}s, {len(words) or len(text.split())} words.",
+            f"Transcript:\n{text}",
+        ]
+        if unsure:
+            lines.append(f"Low-confidence words: {', '.join(unsure)}")
+        if features and (hints := self.feature_hints(features)):
+            lines.append(f"Measured: {hints}")
+
+        return '\n'.join(lines)
+
+    @staticmethod
+    def feature_hints(features: Dict[str, Any]) -> str:
+        """`FluencyFeatures` as one short line, skipping what could not be measured."""
+        hints = []
+
+        if features.get('speech_rate_wpm') is not None:
+            rate = f"{features['speech_rate_wpm']:.0f} wpm"
+            if features.get('articulation_rate_wpm') is not None:
+                rate += f" ({features['articulation_rate_wpm']:.0f} excluding pauses)"
+            hints.append(rate)
+        if features.get('pause_count'):
+            hints.append(
+                f"{features['pause_count']} pauses, mean {features['pause_mean_s']:.1f}s, longest {features['pause_max_s']:.1f}s, "
+                f"{features['pause_ratio']:.0%} of the time"
+            )
+        if features.get('filler_ratio') is not None:
+            hints.append(f"fillers {features['filler_ratio']:.0%}")
+        if features.get('confidence_mean') is not None:
+            hints.append(f"word confidence mean {features['confidence_mean']:.2f}, 10th percentile {features['confidence_p10']:.2f}")
+        if features.get('type_token_ratio') is not None:
+            hints.append(f"type-token ratio {features['type_token_ratio']:.2f}")
+
+        return '; '.join(hints)
+
+    def marked_text(self, words: List[Dict[str, Any]]) -> str:
+        parts, previous_end = [], None
+
+        for word in words:
+            start = word.get('start')
+            if previous_end is not None and start is not None and start - previous_end >= self.pause_s:
+                parts.append(f" [{start - previous_end:.1f}s]")
+            parts.append(word['word'] if parts else word['word'].lstrip())
+            previous_end = word.get('end', previous_end)
+
+        return ''.join(parts)
+
+    def low_confidence_words(self, words: List[Dict[str, Any]]) -> List[str]:
+        unsure = {}
+        for word in words:
+            probability = word.get('probability')
+            if probability is not None and probability < self.low_confidence:
+                cleaned = self._PUNCTUATION.sub('', word['word'].strip())
+                if cleaned:
+                    unsure.setdefault(cleaned.lower(), cleaned)
+        return list(unsure.values())
@@ -0,0 +1,394 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+import openai
+import requests
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from api.services import timings
+from api.services.http_clients import clients
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_deadline: ContextVar[Optional[float]] = ContextVar('upstream_deadline', default=None)
+
+
+class DeadlineExceeded(APIException):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    default_detail = 'The request ran out of time waiting for an upstream service.'
+    default_code = 'deadline_exceeded'
+
+
+class CircuitOpen(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'An upstream service is unavailable, try again shortly.'
+    default_code = 'circuit_open'
+
+
+class Deadline:
+    """Time budget for everything a request (or job) does upstream, carried in a context variable."""
+
+    @staticmethod
+    @contextlib.contextmanager
+    def budget(seconds: float):
+        deadline = time.monotonic() + seconds
+        outer = _deadline.get()
+        token = _deadline.set(deadline if outer is None else min(outer, deadline))
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
+    @staticmethod
+    def remaining() -> Optional[float]:
+        deadline = _deadline.get()
+        return None if deadline is None else deadline - time.monotonic()
+
+    @classmethod
+    def timeout(cls, limit: float) -> float:
+        """``limit`` cut down to what is left of the budget."""
+        remaining = cls.remaining()
+        if remaining is None:
+            return limit
+        if remaining <= 0:
+            raise DeadlineExceeded()
+        return min(limit, remaining)
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures and fails fast for ``reset_s``.
+
+    Then it lets one trial call through (half-open): success closes it, failure
+    opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, name: str, threshold: int, reset_s: float) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.reset_s = reset_s
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opened_count = 0
+        self.rejected = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_s:
+                self.state = self.HALF_OPEN
+
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+
+            self.rejected += 1
+
+        raise CircuitOpen(f'{self.name} is unavailable, try again shortly.')
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit for %s closed", self.name)
+            self.state, self.failures, self._trial_running = self.CLOSED, 0, False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.threshold):
+                logger.warning("Circuit for %s opened after %s failure(s)", self.name, self.failures)
+                self.state, self.opened_at = self.OPEN, time.monotonic()
+                self.opened_count += 1
+
+    def release(self) -> None:
+        """Ends a call that says nothing about the upstream's health."""
+        with self._lock:
+            self._trial_running = False
+
+
+class LatencyWindow:
+    """Recent successful call latencies, for the p95 hedge delay."""
+
+    def __init__(self, size: int = 200) -> None:
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, latency_s: float) -> None:
+        with self._lock:
+            self._samples.append(latency_s)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+
+class ResilientCaller:
+    """Deadlines, jittered retries, hedging and a circuit breaker around one upstream.
+
+    Configured per upstream in ``UPSTREAM_RESILIENCE``. Each attempt gets the
+    upstream's read timeout from ``OUTBOUND_HTTP``, cut down to what is left of the
+    current ``Deadline``. Connection errors, timeouts, 429 and 5xx are retried with
+    full-jitter exponential backoff and count towards the breaker. Other errors
+    pass straight through. With hedging on, a duplicate attempt starts once the
+    first has run longer than the upstream's recent p95, and the first success wins.
+    """
+
+    _instances: Dict[tuple, 'ResilientCaller'] = {}
+    _instances_lock = threading.Lock()
+    _executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+    _executor_pid: Optional[int] = None
+
+    def __init__(self, name: str, config: dict) -> None:
+        self.name = name
+        self.config = config
+        self.breaker = CircuitBreaker(name, config['breaker_failures'], config['breaker_reset_s'])
+        self.latency = LatencyWindow()
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0, 'failures': 0}
+
+    @classmethod
+    def for_upstream(cls, name: str) -> 'ResilientCaller':
+        config = settings.UPSTREAM_RESILIENCE[name]
+        key = (name, tuple(sorted(config.items())))
+
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(name, dict(config))
+            return cls._instances[key]
+
+    @classmethod
+    def reset(cls) -> None:
+        cls._instances_lock = threading.Lock()
+        cls._instances = {}
+
+    @property
+    def hedging(self) -> bool:
+        return self.config['hedge']
+
+    def hedge_delay(self) -> float:
+        if len(self.latency) < self.config['hedge_min_samples']:
+            return self.config['hedge_after_s']
+        return self.latency.percentile(95)
+
+    def call(self, attempt: Callable[[float], T], retry: bool = True, hedge: Optional[bool] = None) -> T:
+        """Runs ``attempt(timeout_s)`` until it succeeds, retries run out or the deadline passes."""
+        hedge = self.hedging if hedge is None else hedge
+        self._count('calls')
+
+        for number in range(1 + (self.config['retries'] if retry else 0)):
+            self.breaker.before_call()
+            started = time.monotonic()
+            try:
+                timeout = Deadline.timeout(clients.timeout(self.name)[1])
+                result = self._hedged(attempt, timeout) if hedge else attempt(timeout)
+            except Exception as exc:
+                if not self._failed(exc):
+                    raise
+                delay = self._retry_delay(number, retry)
+                if delay is None:
+                    raise
+                logger.warning("%s call failed (%s), retrying", self.name, exc)
+                time.sleep(delay)
+                continue
+
+            self._succeeded(time.monotonic() - started)
+            return result
+
+    async def acall(self, attempt: Callable[[float], Awaitable[T]], retry: bool = True, hedge: Optional[bool] = None) -> T:
+        hedge = self.hedging if hedge is None else hedge
+        self._count('calls')
+
+        for number in range(1 + (self.config['retries'] if retry else 0)):
+            self.breaker.before_call()
+            started = time.monotonic()
+            try:
+                timeout = Deadline.timeout(clients.timeout(self.name)[1])
+                if hedge:
+                    result = await self._ahedged(attempt, timeout)
+                else:
+                    result = await asyncio.wait_for(attempt(timeout), timeout)
+            except Exception as exc:
+                if not self._failed(exc):
+                    raise
+                delay = self._retry_delay(number, retry)
+                if delay is None:
+                    raise
+                logger.warning("%s call failed (%s), retrying", self.name, exc)
+                await asyncio.sleep(delay)
+                continue
+
+            self._succeeded(time.monotonic() - started)
+            return result
+
+    def _hedged(self, attempt: Callable[[float], T], timeout: float) -> T:
+        delay = self.hedge_delay()
+        if delay >= timeout:
+            return attempt(timeout)
+
+        # The primary gets a thread of its own: queued behind other callers in the shared pool, its wait
+        # would count towards the hedge delay and fire paid duplicates whenever the process is busy
+        pending = {self._start(timings.in_context(attempt), timeout)}
+        hedge = None
+
+        done, _ = concurrent.futures.wait(pending, timeout=delay)
+        if not done:
+            # The losing attempt cannot be interrupted; its own timeout bounds it
+            self._count('hedges')
+            hedge = self._hedge_executor().submit(timings.in_context(attempt), timeout - delay)
+            pending.add(hedge)
+
+        error = None
+        try:
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            self._count('hedge_wins')
+                        return future.result()
+                    error = future.exception()
+        finally:
+            # A hedge still waiting for a pool worker is no longer needed
+            for future in pending:
+                future.cancel()
+
+        raise error
+
+    def _start(self, fn: Callable[..., T], *args) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+        threading.Thread(target=run, name=f'{self.name}-attempt', daemon=True).start()
+        return future
+
+    async def _ahedged(self, attempt: Callable[[float], Awaitable[T]], timeout: float) -> T:
+        delay = min(self.hedge_delay(), timeout)
+        primary = asyncio.ensure_future(asyncio.wait_for(attempt(timeout), timeout))
+        pending = {primary}
+        hedge = None
+
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done:
+            self._count('hedges')
+            hedge = asyncio.ensure_future(asyncio.wait_for(attempt(timeout - delay), timeout - delay))
+            pending.add(hedge)
+
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count('hedge_wins')
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise error
+
+    def _failed(self, exc: BaseException) -> bool:
+        """Records the outcome of a failed attempt; True if it is worth retrying."""
+        if isinstance(exc, APIException):
+            self.breaker.release()
+            return False
+        if not self.is_upstream_failure(exc):
+            self.breaker.record_success()
+            return False
+
+        self._count('failures')
+        self.breaker.record_failure()
+        return True
+
+    def _succeeded(self, latency_s: float) -> None:
+        self.breaker.record_success()
+        self.latency.record(latency_s)
+
+    def _retry_delay(self, number: int, retry: bool) -> Optional[float]:
+        """Full-jitter backoff before the next attempt, or None when there is none to make."""
+        if not retry or number >= self.config['retries']:
+            return None
+
+        delay = random.uniform(0, min(self.config['backoff_cap_s'], self.config['backoff_s'] * 2 ** number))
+        remaining = Deadline.remaining()
+        if remaining is not None and remaining <= delay:
+            return None
+
+        self._count('retries')
+        timings.tally('retries')
+        return delay
+
+    @staticmethod
+    def is_upstream_failure(exc: BaseException) -> bool:
+        """Errors worth retrying: the upstream was unreachable, slow, overloaded or broken."""
+        if isinstance(exc, (requests.ConnectionError, requests.Timeout, httpx.TransportError, openai.APIConnectionError,
+                            concurrent.futures.TimeoutError, asyncio.TimeoutError)):
+            return True
+
+        response = getattr(exc, 'response', None)
+        if isinstance(exc, (requests.HTTPError, httpx.HTTPStatusError, openai.APIStatusError)) and response is not None:
+            return response.status_code == 429 or response.status_code >= 500
+
+        return False
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+
+        return {
+            'name': self.name,
+            'circuit': self.breaker.state,
+            'circuit_opened': self.breaker.opened_count,
+            'short_circuited': self.breaker.rejected,
+            'p95_s': self.latency.percentile(95) or 0.0,
+            'hedge_delay_s': self.hedge_delay() if self.hedging else 0.0,
+            **counters,
+        }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    @classmethod
+    def _hedge_executor(cls) -> concurrent.futures.ThreadPoolExecutor:
+        with cls._instances_lock:
+            if cls._executor is None or cls._executor_pid != os.getpid():
+                cls._executor = concurrent.futures.ThreadPoolExecutor(max_workers=settings.UPSTREAM_HEDGE_WORKERS, thread_name_prefix='hedge')
+                cls._executor_pid = os.getpid()
+            return cls._executor
@@ -0,0 +1,104 @@
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from api.services.metrics import STAGE_SECONDS
+
+_scope: ContextVar[Optional['Timings']] = ContextVar('timings_scope', default=None)
+_labels: ContextVar[Dict[str, str]] = ContextVar('stage_labels', default={})
+
+
+class Timings:
+    """Stage durations and facts (tokens, ASR host, retries) gathered during one request or job.
+
+    Worker threads see the same object when started through ``in_context``, so
+    what they record adds up here.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = OrderedDict()
+        self.facts: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def note(self, name: str, value: Any) -> None:
+        with self._lock:
+            self.facts[name] = value
+
+    def tally(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.facts[name] = self.facts.get(name, 0) + amount
+
+
+@contextlib.contextmanager
+def scope():
+    """Collects what is timed during a request or job, e.g. for its ``Server-Timing`` header."""
+    timings = Timings()
+    scope_token, labels_token = _scope.set(timings), _labels.set({})
+    try:
+        yield timings
+    finally:
+        _scope.reset(scope_token)
+        _labels.reset(labels_token)
+
+
+def current() -> Optional[Timings]:
+    return _scope.get()
+
+
+def in_context(fn: Callable) -> Callable:
+    """``fn`` bound to a copy of the caller's context, for running on another thread."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def label(**labels: str) -> None:
+    """Labels (``model``, ``country_tier``) attached to the stages timed from here on."""
+    _labels.set({**_labels.get(), **labels})
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    """Times a block into the stage histogram and, inside a scope, its ``Server-Timing`` entry."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def record(name: str, seconds: float) -> None:
+    labels = _labels.get()
+    STAGE_SECONDS.observe(seconds, stage=name, model=labels.get('model', ''), country_tier=labels.get('country_tier', ''))
+
+    timings = _scope.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+def note(name: str, value: Any) -> None:
+    timings = _scope.get()
+    if timings is not None:
+        timings.note(name, value)
+
+
+def tally(name: str, amount: int = 1) -> None:
+    timings = _scope.get()
+    if timings is not None:
+        timings.tally(name, amount)
+
+
+def server_timing(stages: Dict[str, float], total_s: float) -> str:
+    entries = [f'{name};dur={seconds * 1000:.1f}' for name, seconds in stages.items()]
+    return ', '.join(entries + [f'total;dur={total_s * 1000:.1f}'])
@@ -0,0 +1,119 @@
+import hashlib
+import io
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List
+
+from django.conf import settings
+from django.core.files import File
+
+from api.services import timings
+
+
+class QueueReader(io.RawIOBase):
+    """Read-only, non-seekable stream fed chunk by chunk from another thread.
+
+    The queue is bounded, so a slow consumer blocks the producer instead of
+    letting chunks pile up. Once the consumer is done (or failed) the reader is
+    abandoned and further chunks are dropped.
+    """
+
+    _EOF = object()
+    _ABORTED = object()
+
+    def __init__(self, max_chunks: int) -> None:
+        super().__init__()
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._buffer = b''
+        self._eof = False
+        self._abandoned = threading.Event()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer and not self._eof:
+            chunk = self._queue.get()
+            if chunk is self._ABORTED:
+                raise IOError("Upload stream was aborted")
+            if chunk is self._EOF:
+                self._eof = True
+            else:
+                self._buffer = chunk
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+
+        return size
+
+    def feed(self, chunk) -> None:
+        while not self._abandoned.is_set():
+            try:
+                self._queue.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def finish(self) -> None:
+        self.feed(self._EOF)
+
+    def abort(self) -> None:
+        """Makes the consumer fail rather than mistake a truncated stream for a complete one."""
+        self.feed(self._ABORTED)
+
+    def abandon(self) -> None:
+        self._abandoned.set()
+
+
+class UploadTee:
+    """Reads an upload once and streams it to several consumers concurrently, hashing it on the way.
+
+    Each consumer runs in its own thread and receives a ``QueueReader``. Memory
+    stays bounded by ``chunk_size * max_chunks`` per consumer whatever the upload size.
+    """
+
+    def __init__(self, source: File) -> None:
+        self.source = source
+        self.chunk_size = settings.VOICE_UPLOAD_TEE_CHUNK_BYTES
+        self.max_chunks = settings.VOICE_UPLOAD_TEE_MAX_CHUNKS
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    @property
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+    def run(self, *consumers: Callable[[QueueReader], Any]) -> List[Any]:
+        """Results of the consumers, in order; a failed consumer yields its exception instead."""
+        readers = [QueueReader(self.max_chunks) for _ in consumers]
+
+        with ThreadPoolExecutor(max_workers=len(consumers)) as pool:
+            futures = [
+                pool.submit(timings.in_context(self._consume), consumer, reader)
+                for consumer, reader in zip(consumers, readers)
+            ]
+
+            try:
+                for chunk in self.source.chunks(self.chunk_size):
+                    self.digest.update(chunk)
+                    self.size += len(chunk)
+                    for reader in readers:
+                        reader.feed(chunk)
+            except BaseException:
+                for reader in readers:
+                    reader.abort()
+                raise
+
+            for reader in readers:
+                reader.finish()
+
+            return [future.exception() or future.result() for future in futures]
+
+    @staticmethod
+    def _consume(consumer: Callable[[QueueReader], Any], reader: QueueReader) -> Any:
+        try:
+            return consumer(reader)
+        finally:
+            reader.abandon()
@@ -0,0 +1,117 @@
+import datetime
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Q
+from django.core.files import File
+from django.utils import timezone
+
+from api.models import Voice, VoiceStatus
+from api.services.llm_analyser import LlmAnalyser
+
+logger = logging.getLogger(__name__)
+
+
+def hash_upload(file: File) -> str:
+    """SHA-256 of the uploaded bytes, read once in storage-sized chunks."""
+    digest = hashlib.sha256()
+
+    for chunk in file.chunks():
+        digest.update(chunk)
+
+    file.seek(0)
+
+    return digest.hexdigest()
+
+
+class VoiceDedup:
+    """Reuses the transcript and analysis of an identical, already analysed upload.
+
+    A match requires the same audio bytes, the same country-derived model and analysis
+    mode (or the short-answer placeholder, which depends on neither) and the same
+    analysis schema version, so a schema, model or mode change never serves stale results.
+    """
+
+    HIT = 'hit'
+    MISS = 'miss'
+    DISABLED = 'off'
+
+    # What copy_into reads from the match
+    COPIED_FIELDS = ('uuid', 'duration_s', 'language', 'text', 'words', 'fluency', 'analysed', 'analysis_version', 'analysis_mode')
+
+    _lock = threading.Lock()
+    _counters = {HIT: 0, MISS: 0}
+
+    def __init__(self) -> None:
+        self.enabled = settings.VOICE_DEDUP_ENABLED
+        self.max_age_days = settings.VOICE_DEDUP_MAX_AGE_DAYS
+
+    def lookup(self, content_hash: str, country_code: str, analysis_mode: Optional[str] = None) -> Optional[Voice]:
+        if not self.enabled:
+            return None
+
+        model = LlmAnalyser.model_for_country(country_code)
+        candidates = Voice.objects.filter(
+            # Short answers are matched too: their placeholder analysis depends on neither the model nor the mode,
+            # and reusing it still saves the transcription
+            Q(model_used=model.value, analysis_mode=LlmAnalyser.resolve_mode(analysis_mode)) | Q(model_used=Voice.LOCAL_MODEL),
+            content_hash=content_hash,
+            analysis_version=LlmAnalyser.SCHEMA_VERSION,
+            status=VoiceStatus.ANALYSED,
+            deleted_at__isnull=True,
+        ).only(*self.COPIED_FIELDS).order_by('-created_at')
+
+        if self.max_age_days:
+            candidates = candidates.filter(
+                created_at__gte=timezone.now() - datetime.timedelta(days=self.max_age_days)
+            )
+
+        match = candidates.first()
+        self._record(self.HIT if match else self.MISS, content_hash, match)
+
+        return match
+
+    def outcome(self, match: Optional[Voice]) -> str:
+        if not self.enabled:
+            return self.DISABLED
+        return self.HIT if match is not None else self.MISS
+
+    @staticmethod
+    def copy_into(source: Voice, voice: Voice) -> None:
+        voice.duration_s = source.duration_s
+        voice.language = source.language
+        voice.text = source.text
+        voice.words = source.words
+        voice.fluency = source.fluency
+        voice.analysed = source.analysed
+        voice.analysis_version = source.analysis_version
+        voice.analysis_mode = source.analysis_mode
+        voice.status = VoiceStatus.ANALYSED
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            hits, misses = cls._counters[cls.HIT], cls._counters[cls.MISS]
+
+        total = hits + misses
+
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0,
+        }
+
+    @classmethod
+    def _record(cls, outcome: str, content_hash: str, match: Optional[Voice]) -> None:
+        with cls._lock:
+            cls._counters[outcome] += 1
+
+        logger.info(
+            "Voice dedup %s for %s%s",
+            outcome,
+            content_hash[:12],
+            f" (reusing {match.pk})" if match else '',
+        )
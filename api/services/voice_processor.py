@@ -0,0 +1,347 @@
+import asyncio
+import datetime
+import io
+import mimetypes
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from api.models import Voice, VoiceStatus, VoiceTiming
+from api.services import fast_json, timings
+from api.services.audio_chunker import AudioChunk, AudioChunker
+from api.services.audio_probe import AudioProbe
+from api.services.asr_pool import AsrHost, AsrPool
+from api.services.audio_normalizer import AudioNormalizer
+from api.services.fluency import FluencyFeatures
+from api.services.http_clients import clients
+from api.services.llm_analyser import LlmAnalyser
+from api.services.resilience import ResilientCaller
+from api.services.voice_dedup import VoiceDedup, hash_upload
+
+
+class VoiceProcessor:
+    """Runs the ASR + LLM pipeline for a single voice upload."""
+
+    ASR_PARAMS = {
+        "encode": "true",
+        "task": "transcribe",
+        "word_timestamps": "true",
+        "output": "json"
+    }
+
+    def __init__(self, country_code: str, analysis_mode: Optional[str] = None) -> None:
+        self.country_code = country_code or ''
+        self.analysis_mode = analysis_mode
+
+    def transcribe(self, audio: BinaryIO, duration_s: float = None) -> Dict[str, Any]:
+        """Whisper JSON for the whole recording, fanning long recordings out in chunks.
+
+        A known `duration_s` (from the header probe) skips decoding short recordings.
+        """
+        with timings.stage('audio_prep'):
+            chunks = self._split(audio, duration_s=duration_s)
+            normalized = None if chunks else self._normalize(audio)
+        started = time.monotonic()
+
+        with timings.stage('asr'):
+            if normalized is not None:
+                whisper = self.stitch([normalized], [self._transcribe_once(io.BytesIO(normalized.data), normalized.filename)])
+            elif not chunks:
+                whisper = self._transcribe_once(audio)
+            else:
+                with ThreadPoolExecutor(max_workers=settings.ASR_CHUNK_MAX_WORKERS) as pool:
+                    futures = [
+                        pool.submit(timings.in_context(self._transcribe_once), io.BytesIO(chunk.data), chunk.filename)
+                        for chunk in chunks
+                    ]
+                    results = [future.result() for future in futures]
+                whisper = self.stitch(chunks, results)
+
+        self._record_asr(normalized is not None, time.monotonic() - started)
+        return whisper
+
+    async def atranscribe(self, audio: BinaryIO, filename: str, duration_s: float = None) -> Dict[str, Any]:
+        with timings.stage('audio_prep'):
+            chunks = await sync_to_async(self._split, thread_sensitive=False)(audio, filename, duration_s)
+            normalized = None if chunks else await sync_to_async(self._normalize, thread_sensitive=False)(audio, filename)
+        started = time.monotonic()
+
+        with timings.stage('asr'):
+            if normalized is not None:
+                whisper = self.stitch([normalized], [await self._atranscribe_once(io.BytesIO(normalized.data), normalized.filename)])
+            elif not chunks:
+                whisper = await self._atranscribe_once(audio, filename)
+            else:
+                results = await asyncio.gather(*(
+                    self._atranscribe_once(io.BytesIO(chunk.data), chunk.filename) for chunk in chunks
+                ))
+                whisper = self.stitch(chunks, list(results))
+
+        self._record_asr(normalized is not None, time.monotonic() - started)
+        return whisper
+
+    def _split(self, audio: BinaryIO, filename: str = None, duration_s: float = None) -> List[AudioChunk]:
+        if not settings.ASR_CHUNKING_ENABLED:
+            return []
+        if duration_s is not None and duration_s <= settings.ASR_CHUNK_THRESHOLD_S:
+            return []
+
+        filename = os.path.basename(filename or getattr(audio, 'name', None) or 'audio')
+        return AudioChunker().split(audio, filename) or []
+
+    def _normalize(self, audio: BinaryIO, filename: str = None) -> Optional[AudioChunk]:
+        if not settings.ASR_NORMALIZE_AUDIO:
+            return None
+
+        filename = os.path.basename(filename or getattr(audio, 'name', None) or 'audio')
+        return AudioNormalizer().normalize(audio, filename)
+
+    @staticmethod
+    def _record_asr(normalized: bool, latency_s: float) -> None:
+        if settings.ASR_NORMALIZE_AUDIO:
+            AudioNormalizer.record_asr(normalized, latency_s)
+
+    def _transcribe_once(self, audio: BinaryIO, filename: str = None) -> Dict[str, Any]:
+        guard = ResilientCaller.for_upstream('whisper')
+        filename = os.path.basename(filename or getattr(audio, 'name', None) or 'audio')
+        connect_timeout, _ = clients.timeout('whisper')
+
+        if guard.hedging:
+            # Hedged attempts read concurrently, so each gets its own copy of the audio
+            audio.seek(0)
+            payload = audio.read()
+            open_audio = lambda: io.BytesIO(payload)
+        else:
+            open_audio = lambda: audio
+
+        def attempt(timeout_s: float) -> Dict[str, Any]:
+            source = open_audio()
+
+            def send(host: AsrHost) -> Dict[str, Any]:
+                source.seek(0)
+                response = clients.session('whisper').post(
+                    url=host.url + '/asr',
+                    params=self.ASR_PARAMS,
+                    files={
+                        "audio_file": (filename, source)
+                    },
+                    timeout=(connect_timeout, timeout_s),
+                )
+                response.raise_for_status()
+
+                return fast_json.loads(response.content)
+
+            return AsrPool.instance().call(send)
+
+        return guard.call(attempt)
+
+    def transcribe_stream(self, stream: BinaryIO, filename: str) -> Dict[str, Any]:
+        """Whisper JSON for a recording streamed as it is read, without buffering or chunking it."""
+        boundary = uuid.uuid4().hex
+        connect_timeout, _ = clients.timeout('whisper')
+
+        def attempt(timeout_s: float) -> Dict[str, Any]:
+            def send(host: AsrHost) -> Dict[str, Any]:
+                response = clients.session('whisper').post(
+                    url=host.url + '/asr',
+                    params=self.ASR_PARAMS,
+                    data=self._multipart_body(stream, filename, boundary),
+                    headers={'Content-Type': f'multipart/form-data; boundary={boundary}'},
+                    timeout=(connect_timeout, timeout_s),
+                )
+                response.raise_for_status()
+
+                return fast_json.loads(response.content)
+
+            return AsrPool.instance().call(send, failover=False)
+
+        # The stream can only be read once, so there is nothing to retry, hedge or fail over with
+        with timings.stage('asr'):
+            return ResilientCaller.for_upstream('whisper').call(attempt, retry=False, hedge=False)
+
+    @staticmethod
+    def _multipart_body(stream: BinaryIO, filename: str, boundary: str) -> Iterator[bytes]:
+        """`audio_file` form part sent with chunked transfer encoding."""
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        filename = os.path.basename(filename).replace('"', '')
+
+        yield (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="audio_file"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode()
+        yield from iter(lambda: stream.read(64 * 1024), b'')
+        yield f'\r\n--{boundary}--\r\n'.encode()
+
+    async def _atranscribe_once(self, audio: BinaryIO, filename: str) -> Dict[str, Any]:
+        guard = ResilientCaller.for_upstream('whisper')
+        connect_timeout, _ = clients.timeout('whisper')
+
+        if guard.hedging:
+            audio.seek(0)
+            payload = audio.read()
+            open_audio = lambda: io.BytesIO(payload)
+        else:
+            open_audio = lambda: audio
+
+        async def attempt(timeout_s: float) -> Dict[str, Any]:
+            source = open_audio()
+
+            async def send(host: AsrHost) -> Dict[str, Any]:
+                source.seek(0)
+                response = await clients.async_httpx_client('whisper').post(
+                    url=host.url + '/asr',
+                    params=self.ASR_PARAMS,
+                    files={
+                        "audio_file": (filename, source)
+                    },
+                    timeout=httpx.Timeout(timeout_s, connect=connect_timeout),
+                )
+                response.raise_for_status()
+
+                return fast_json.loads(response.content)
+
+            return await AsrPool.instance().acall(send)
+
+        return await guard.acall(attempt)
+
+    @staticmethod
+    def stitch(chunks: List[AudioChunk], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merges per-chunk Whisper responses, shifting timestamps by each chunk's offset."""
+        segments = []
+
+        for chunk, result in zip(chunks, results):
+            for segment in result.get('segments', []):
+                segments.append({
+                    **segment,
+                    "id": len(segments),
+                    "start": segment['start'] + chunk.offset_s,
+                    "end": segment['end'] + chunk.offset_s,
+                    "words": [
+                        {**word, "start": word['start'] + chunk.offset_s, "end": word['end'] + chunk.offset_s}
+                        for word in segment.get('words', [])
+                    ],
+                })
+
+        return {
+            "text": ''.join(result.get('text', '') for result in results),
+            "segments": segments,
+            "language": next((result['language'] for result in results if result.get('language')), None),
+        }
+
+    @staticmethod
+    def transcript(whisper: Dict[str, Any]) -> Dict[str, Any]:
+        """Collapses every Whisper segment into the single transcript the analyser reads."""
+        segments = whisper['segments']
+
+        return {
+            "text": whisper['text'],
+            "start": segments[0]['start'] if segments else 0.0,
+            "end": segments[-1]['end'] if segments else 0.0,
+            "words": [word for segment in segments for word in segment.get('words', [])],
+        }
+
+    def analyse(self, segment: Dict[str, Any]) -> Dict[str, Any]:
+        analyser = LlmAnalyser(
+            voice_content=segment,
+            country_code=self.country_code,
+            mode=self.analysis_mode,
+        )
+
+        return analyser.analyze()
+
+    async def aanalyse(self, segment: Dict[str, Any]) -> Dict[str, Any]:
+        analyser = LlmAnalyser(
+            voice_content=segment,
+            country_code=self.country_code,
+            mode=self.analysis_mode,
+        )
+
+        return await analyser.aanalyze()
+
+    @classmethod
+    def apply_transcript(cls, voice: Voice, whisper: Dict[str, Any]) -> None:
+        transcript = cls.transcript(whisper)
+        # Keep the duration read from the audio headers, the transcript only spans the speech
+        if not voice.duration_s:
+            voice.duration_s = (datetime.timedelta(seconds=transcript['end']) - datetime.timedelta(seconds=transcript['start'])).seconds
+        voice.language = whisper['language']
+        voice.text = transcript['text']
+        voice.words = transcript['words']
+        voice.fluency = FluencyFeatures().extract(transcript)
+
+    def apply_analysis(self, voice: Voice, analysed: Dict[str, Any]) -> None:
+        voice.analysed = analysed
+        voice.analysis_version = LlmAnalyser.SCHEMA_VERSION
+        voice.analysis_mode = LlmAnalyser.resolve_mode(self.analysis_mode)
+        voice.status = VoiceStatus.ANALYSED
+
+    @staticmethod
+    def stored_segment(voice: Voice) -> Dict[str, Any]:
+        """Rebuilds the analyser input for a voice whose transcript is already persisted."""
+        words = voice.words or []
+
+        return {
+            "text": voice.text,
+            "start": words[0]['start'] if words else 0.0,
+            "end": words[-1]['end'] if words else float(voice.duration_s),
+            "words": words,
+        }
+
+    def process(self, voice: Voice, audio: BinaryIO) -> Voice:
+        """Transcribes and analyses an already stored voice, persisting each step.
+
+        Voices queued without their audio being read (direct uploads) go through `admit` first.
+        """
+        if voice.content_hash is None and self.admit(voice, audio):
+            return voice
+
+        if voice.status != VoiceStatus.TRANSCRIBED:
+            whisper = self.transcribe(audio, duration_s=voice.duration_s or None)
+            self.apply_transcript(voice, whisper)
+            voice.status = VoiceStatus.TRANSCRIBED
+            voice.save(update_fields=['duration_s', 'language', 'text', 'words', 'fluency', 'status'])
+            segment = self.transcript(whisper)
+        else:
+            segment = self.stored_segment(voice)
+
+        self.apply_analysis(voice, self.analyse(segment))
+        voice.save(update_fields=['analysed', 'analysis_version', 'analysis_mode', 'status'])
+
+        if (scope := timings.current()) is not None:
+            VoiceTiming.record(voice, scope)
+
+        return voice
+
+    def admit(self, voice: Voice, audio: BinaryIO) -> bool:
+        """Probes, hashes and dedups a queued voice; True when an identical voice's results were copied into it.
+
+        Raises `InvalidAudio` for audio the upload endpoints would have rejected.
+        """
+        with timings.stage('probe'):
+            info = AudioProbe().check(audio)
+        if info.duration_s is not None:
+            voice.duration_s = round(info.duration_s)
+        with timings.stage('hash'):
+            voice.content_hash = hash_upload(audio)
+
+        dedup = VoiceDedup()
+        with timings.stage('dedup'):
+            duplicate = dedup.lookup(voice.content_hash, voice.request_country, self.analysis_mode)
+
+        if duplicate is None:
+            voice.save(update_fields=['duration_s', 'content_hash'])
+            return False
+
+        dedup.copy_into(duplicate, voice)
+        voice.save()
+        if (scope := timings.current()) is not None:
+            VoiceTiming.record(voice, scope)
+
+        return True
@@ -0,0 +1,129 @@
+import hashlib
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+
+from api.models import Voice, VoiceStatus
+from api.renderers import ORJSONRenderer
+from api.serializer import ProcessedVoiceSerializer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RenderedVoice:
+    body: bytes
+    etag: str
+    expires_at: float
+    cacheable: bool
+
+    @property
+    def max_age_s(self) -> int:
+        return max(0, int(self.expires_at - time.time()))
+
+
+class VoiceResponseCache:
+    """Rendered JSON bodies of GET /api/voices/<uuid>/, cached per UUID and expansion.
+
+    Only finished voices are cached: after analysis the payload changes only when the
+    voice is deleted, which calls ``invalidate``. Entries live in the tiers listed in
+    ``VOICE_RESPONSE_CACHE_TIERS`` (fastest first) and never outlive the presigned
+    ``file`` URL they embed. A tier whose database is unavailable (say, a missing
+    cache table) counts as a miss rather than failing the request.
+    """
+
+    KEY_PREFIX = 'voice-response'
+    FINAL_STATUSES = {VoiceStatus.ANALYSED, VoiceStatus.FAILED}
+    # Presigned URLs are handed out with at least this much validity left
+    URL_EXPIRY_MARGIN_S = 60
+
+    def __init__(self, tiers: Optional[List[str]] = None) -> None:
+        self.enabled = settings.VOICE_RESPONSE_CACHE_ENABLED
+        self.tiers = [caches[alias] for alias in (tiers if tiers is not None else settings.VOICE_RESPONSE_CACHE_TIERS)]
+
+    @staticmethod
+    def _call(tier, method: str, *args, **kwargs):
+        try:
+            return getattr(tier, method)(*args, **kwargs)
+        except DatabaseError:
+            logger.warning("Voice response cache %s failed, skipping the tier", method, exc_info=True)
+            return None
+
+    def key(self, uuid, expand: Iterable[str] = ()) -> str:
+        return f"{self.KEY_PREFIX}:{uuid}:{','.join(sorted(expand))}"
+
+    def get(self, uuid, expand: Iterable[str] = ()) -> Optional[RenderedVoice]:
+        if not self.enabled:
+            return None
+
+        key = self.key(uuid, expand)
+
+        for depth, tier in enumerate(self.tiers):
+            entry = self._call(tier, 'get', key)
+            if entry is None or entry.max_age_s <= 0:
+                continue
+
+            for faster in self.tiers[:depth]:
+                self._call(faster, 'set', key, entry, timeout=entry.max_age_s)
+
+            return entry
+
+        return None
+
+    def render(self, voice: Voice, expand: Iterable[str] = ()) -> RenderedVoice:
+        body = ORJSONRenderer().render(ProcessedVoiceSerializer(voice, expand=expand).data)
+        entry = RenderedVoice(
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            expires_at=time.time() + self.lifetime_s(),
+            cacheable=voice.status in self.FINAL_STATUSES,
+        )
+
+        if self.enabled and entry.cacheable:
+            for tier in self.tiers:
+                self._call(tier, 'set', self.key(voice.uuid, expand), entry, timeout=entry.max_age_s)
+
+        return entry
+
+    def invalidate(self, uuid) -> None:
+        expandable = ProcessedVoiceSerializer.EXPANDABLE
+        keys = [
+            self.key(uuid, expand)
+            for size in range(len(expandable) + 1) for expand in itertools.combinations(expandable, size)
+        ]
+
+        for tier in self.tiers:
+            self._call(tier, 'delete_many', keys)
+
+    @classmethod
+    def lifetime_s(cls) -> int:
+        storage = Voice._meta.get_field('file').storage
+        lifetime = settings.VOICE_RESPONSE_CACHE_MAX_AGE_S
+
+        if getattr(storage, 'querystring_auth', False):
+            lifetime = min(lifetime, storage.querystring_expire - cls.URL_EXPIRY_MARGIN_S)
+
+        return max(0, lifetime)
+
+    @staticmethod
+    def respond(entry: RenderedVoice, if_none_match: Optional[str], outcome: str) -> HttpResponse:
+        if if_none_match and (entry.etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(entry.body, content_type='application/json')
+
+        response['ETag'] = entry.etag
+        # Clients revalidate with the ETag on every use, so a deleted voice stops being served (304s stay cheap); shared
+        # caches do not store the body at all, as it embeds a presigned URL
+        response['Cache-Control'] = 'private, no-cache' if entry.cacheable else 'no-cache'
+        response['X-Voice-Cache'] = outcome
+
+        return response
@@ -0,0 +1,55 @@
+import json
+from unittest.mock import MagicMock
+
+WHISPER_HI_THERE = json.loads('{"text": " Hi there!", "segments": [{"id": 0, "seek": 0, "start": 0.0, "end": 0.54, "text": " Hi there!", "tokens": [50364, 2421, 456, 0, 50414], "temperature": 0.0, "avg_logprob": -0.6894392967224121, "compression_ratio": 0.5294117647058824, "no_speech_prob": 0.08031938970088959, "words": [{"word": " Hi", "start": 0.0, "end": 0.32, "probability": 0.5562068223953247}, {"word": " there!", "start": 0.32, "end": 0.54, "probability": 0.9154007434844971}]}], "language": "en"}')
+
+LLM_ANALYSIS = {
+    "fluency_and_coherence": {
+        "band_score": 7.0,
+        "strengths": ["Good flow"],
+        "areas_for_improvement": ["Pausing"],
+        "detailed_feedback": "Good overall fluency"
+    },
+    "lexical_resource": {
+        "band_score": 6.5,
+        "vocabulary_analysis": {
+            "sophisticated_terms": ["term1"],
+            "collocations": ["coll1"],
+            "idiomatic_expressions": ["idiom1"]
+        },
+        "detailed_feedback": "Good vocabulary usage"
+    },
+    "grammatical_range_and_accuracy": {
+        "band_score": 7.0,
+        "structure_analysis": {
+            "complex_structures": ["structure1"],
+            "errors": ["error1"]
+        },
+        "detailed_feedback": "Good grammar"
+    },
+    "pronunciation": {
+        "band_score": 6.5,
+        "phonetic_analysis": {
+            "clarity_score": 0.8,
+            "problem_sounds": ["sound1"],
+            "intonation_patterns": ["pattern1"]
+        },
+        "detailed_feedback": "Clear pronunciation"
+    },
+    "overall_assessment": {
+        "band_score": 6.5,
+        "key_strengths": ["strength1"],
+        "priority_improvements": ["improvement1"],
+        "summary": "Good overall performance"
+    }
+}
+
+
+def mock_openai_client(analysis: dict) -> MagicMock:
+    mock_client = MagicMock()
+    mock_completion = MagicMock()
+    mock_choice = MagicMock()
+    mock_choice.message.content = json.dumps(analysis)
+    mock_completion.choices = [mock_choice]
+    mock_client.chat.completions.create.return_value = mock_completion
+    return mock_client
@@ -0,0 +1,63 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+
+class StubServer:
+    """Local HTTP upstream that answers from a script of (delay_s, status, json body) replies.
+
+    Replies are used in order of arrival; once the script runs out every request gets ``default``.
+    """
+
+    def __init__(self, script: List[Tuple[float, int, Optional[dict]]] = (), default=(0.0, 200, {})) -> None:
+        self.script = list(script)
+        self.default = default
+        self.requests = []
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.reply()
+
+            def do_POST(self):
+                self.reply()
+
+            def reply(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                delay, status, payload = stub.next_reply(self.path, body)
+                time.sleep(delay)
+
+                data = json.dumps(payload or {}).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up waiting
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+
+    def next_reply(self, path: str, body: bytes):
+        with self._lock:
+            self.requests.append((path, body))
+            return self.script.pop(0) if self.script else self.default
+
+    def __enter__(self) -> 'StubServer':
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,108 @@
+import datetime
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import Voice
+from api.tests.fixtures import LLM_ANALYSIS
+from api.tests.test_setup import TestSetUp
+
+
+class TestAnalyticsViews(TestSetUp):
+    def voice(self, overall, language='en', country='FR', model='gpt-4o', **kwargs):
+        analysed = {**LLM_ANALYSIS, "overall_assessment": {**LLM_ANALYSIS["overall_assessment"], "band_score": overall}, "model_used": model}
+        voice = Voice(language=language, request_country=country, analysed=analysed, **kwargs)
+        voice.save()
+        return voice
+
+    def test_band_scores_are_extracted_on_save(self):
+        voice = self.voice(7.5)
+
+        voice.refresh_from_db()
+        self.assertEqual(7.5, voice.overall_band)
+        self.assertEqual(7.0, voice.fluency_band)
+        self.assertEqual(6.5, voice.pronunciation_band)
+        self.assertEqual('gpt-4o', voice.model_used)
+
+    def test_band_scores_follow_partial_saves(self):
+        voice = Voice(language='en')
+        voice.save()
+
+        voice.analysed = {**LLM_ANALYSIS, "model_used": "gpt-4o-mini"}
+        voice.save(update_fields=['analysed'])
+
+        voice.refresh_from_db()
+        self.assertEqual(6.5, voice.overall_band)
+        self.assertEqual('gpt-4o-mini', voice.model_used)
+
+    def test_overall_distribution(self):
+        for band in [5.0, 6.0, 6.0, 6.5, 8.0]:
+            self.voice(band)
+        self.voice(9.0, deleted_at=timezone.now())
+        Voice(language='en').save()
+
+        res = self.client.get(path="/api/analytics/band-scores/")
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(1, len(res.data['groups']))
+        group = res.data['groups'][0]
+        self.assertEqual(5, group['count'])
+        self.assertAlmostEqual(6.3, group['mean'])
+        self.assertEqual((5.0, 8.0), (group['min'], group['max']))
+        self.assertEqual({'p10': 5.0, 'p25': 6.0, 'p50': 6.0, 'p75': 6.5, 'p90': 8.0}, group['percentiles'])
+        self.assertEqual({'5.0': 1, '6.0': 2, '6.5': 1, '8.0': 1}, group['histogram'])
+
+    def test_short_answer_placeholders_are_left_out(self):
+        self.voice(6.0)
+        placeholder = self.voice(1.0, model=Voice.LOCAL_MODEL)
+
+        placeholder.refresh_from_db()
+        self.assertIsNone(placeholder.overall_band)
+        self.assertEqual(Voice.LOCAL_MODEL, placeholder.model_used)
+
+        res = self.client.get(path="/api/analytics/band-scores/", data={'group_by': 'model'})
+
+        self.assertEqual({'gpt-4o': 1}, {group['group']: group['count'] for group in res.data['groups']})
+
+    def test_grouped_and_filtered_distribution(self):
+        self.voice(6.0, language='en', model='gpt-4o-mini')
+        self.voice(7.0, language='en')
+        self.voice(8.0, language='de')
+        self.voice(4.0, language='de', country='US')
+
+        res = self.client.get(path="/api/analytics/band-scores/", data={'group_by': 'language', 'country': 'fr'})
+
+        self.assertEqual(['de', 'en'], [group['group'] for group in res.data['groups']])
+        self.assertEqual([8.0, 6.5], [group['mean'] for group in res.data['groups']])
+
+        res = self.client.get(path="/api/analytics/band-scores/", data={'group_by': 'model', 'criterion': 'fluency'})
+
+        self.assertEqual({'gpt-4o': 3, 'gpt-4o-mini': 1}, {group['group']: group['count'] for group in res.data['groups']})
+
+    def test_time_buckets(self):
+        self.voice(6.0)
+        today = timezone.localdate()
+
+        res = self.client.get(path="/api/analytics/band-scores/", data={'group_by': 'month', 'since': today.isoformat()})
+
+        self.assertEqual([today.replace(day=1).isoformat()], [group['group'] for group in res.data['groups']])
+
+        res = self.client.get(path="/api/analytics/band-scores/", data={'until': (today - datetime.timedelta(days=1)).isoformat()})
+
+        self.assertEqual([], res.data['groups'])
+
+    def test_day_bounds_compare_created_at_directly(self):
+        self.voice(6.0)
+        today = timezone.localdate()
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(path="/api/analytics/band-scores/", data={'since': today.isoformat(), 'until': today.isoformat()})
+
+        self.assertEqual(1, res.data['groups'][0]['count'])
+        self.assertFalse([query for query in queries.captured_queries if 'django_datetime_cast_date' in query['sql']])
+
+    def test_rejects_unknown_criterion(self):
+        res = self.client.get(path="/api/analytics/band-scores/", data={'criterion': 'charisma'})
+
+        self.assertEqual(400, res.status_code)
@@ -0,0 +1,123 @@
+import io
+import threading
+import time
+
+import requests
+import responses
+from django.test import SimpleTestCase, override_settings
+
+from api.services.asr_pool import AsrPool, AsrUnavailable
+from api.services.resilience import Deadline, DeadlineExceeded, ResilientCaller
+from api.services.voice_processor import VoiceProcessor
+from api.tests.fixtures import WHISPER_HI_THERE
+from api.tests.test_setup import TestSetUp
+
+FIRST, SECOND = 'http://asr-1:9000', 'http://asr-2:9000'
+
+
+@override_settings(ASR_HOSTS=[FIRST, SECOND], ASR_HOST_MAX_CONCURRENCY=1, ASR_HEALTH_PROBE_INTERVAL_S=0,
+                   ASR_POOL_ACQUIRE_TIMEOUT_S=0.05, ASR_HOST_COOLDOWN_S=60)
+class TestAsrPool(SimpleTestCase):
+    def setUp(self):
+        AsrPool.reset()
+        ResilientCaller.reset()
+        self.pool = AsrPool.instance()
+
+    def test_requests_go_to_the_least_busy_host(self):
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+
+        self.assertNotEqual(first.url, second.url)
+
+    def test_full_hosts_queue_callers_then_reject_them(self):
+        self.pool.acquire(), self.pool.acquire()
+
+        with self.assertRaises(AsrUnavailable):
+            self.pool.acquire()
+
+        stats = self.pool.stats()
+        self.assertEqual((1, 1, 2), (stats['queue_peak'], stats['rejected'], stats['in_flight']))
+
+    def test_callers_that_get_a_slot_right_away_are_not_queued(self):
+        self.pool.acquire(), self.pool.acquire()
+
+        self.assertEqual((0, 0), (self.pool.stats()['queue_depth'], self.pool.stats()['queue_peak']))
+
+    @override_settings(ASR_POOL_ACQUIRE_TIMEOUT_S=5)
+    def test_wait_is_bounded_by_the_deadline(self):
+        self.pool.acquire(), self.pool.acquire()
+
+        started = time.monotonic()
+        with Deadline.budget(0.05), self.assertRaises(DeadlineExceeded):
+            self.pool.acquire()
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(1, self.pool.stats()['rejected'])
+
+    @override_settings(ASR_POOL_ACQUIRE_TIMEOUT_S=5)
+    def test_queued_caller_gets_the_released_slot(self):
+        hosts = [self.pool.acquire(), self.pool.acquire()]
+        threading.Timer(0.05, self.pool.release, args=(hosts[1],)).start()
+
+        started = time.monotonic()
+        self.assertEqual(hosts[1].url, self.pool.acquire().url)
+        self.assertLess(time.monotonic() - started, 1)
+
+    @responses.activate
+    def test_fails_over_and_routes_around_the_down_host(self):
+        responses.add(responses.POST, FIRST + '/asr', status=502)
+        responses.add(responses.POST, SECOND + '/asr', json=WHISPER_HI_THERE)
+        processor = VoiceProcessor(country_code='')
+
+        self.assertEqual(WHISPER_HI_THERE, processor._transcribe_once(io.BytesIO(b'audio'), 'answer.mp3'))
+        self.assertEqual(WHISPER_HI_THERE, processor._transcribe_once(io.BytesIO(b'audio'), 'answer.mp3'))
+
+        self.assertEqual([FIRST, SECOND, SECOND], [call.request.url.rsplit('/asr', 1)[0] for call in responses.calls])
+        self.assertEqual(b'audio', responses.calls[1].request.body.split(b'\r\n\r\n')[1][:5])
+        self.assertFalse(self.pool.hosts[0].healthy)
+
+    @responses.activate
+    def test_client_errors_do_not_fail_over(self):
+        responses.add(responses.POST, FIRST + '/asr', status=422)
+
+        with self.assertRaises(requests.HTTPError):
+            VoiceProcessor(country_code='')._transcribe_once(io.BytesIO(b'audio'), 'answer.mp3')
+
+        self.assertEqual(1, len(responses.calls))
+        self.assertTrue(self.pool.hosts[0].healthy)
+
+    @responses.activate
+    def test_every_host_down_raises_the_last_error(self):
+        responses.add(responses.POST, FIRST + '/asr', body=requests.ConnectionError('refused'))
+        responses.add(responses.POST, SECOND + '/asr', status=500)
+
+        with self.assertRaises(requests.HTTPError):
+            VoiceProcessor(country_code='')._transcribe_once(io.BytesIO(b'audio'), 'answer.mp3')
+
+        self.assertEqual([False, False], [host.healthy for host in self.pool.hosts])
+        self.assertIsNotNone(self.pool.acquire(), "fails open when every host is down")
+
+    @responses.activate
+    def test_health_probe_takes_hosts_out_and_back_in(self):
+        responses.add(responses.GET, FIRST + '/docs', status=503)
+        responses.add(responses.GET, SECOND + '/docs', status=200)
+
+        self.pool.probe_all()
+        self.assertEqual([False, True], [host.healthy for host in self.pool.hosts])
+        self.assertEqual(SECOND, self.pool.acquire().url)
+
+        responses.replace(responses.GET, FIRST + '/docs', status=200)
+        self.pool.probe(self.pool.hosts[0])
+        self.assertTrue(self.pool.hosts[0].healthy)
+
+
+@override_settings(ASR_HOSTS=[FIRST, SECOND], ASR_HEALTH_PROBE_INTERVAL_S=0)
+class TestAsrPoolStats(TestSetUp):
+    def test_can_get_asr_pool_stats(self):
+        AsrPool.reset()
+
+        res = self.client.get('/api/stats/asr/')
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(0, res.data['queue_depth'])
+        self.assertEqual([FIRST, SECOND], [host['url'] for host in res.data['hosts']])
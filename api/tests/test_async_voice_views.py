@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import httpx
+from django.core.files import File
+
+from api.models import Voice, VoiceStatus
+from api.services.http_clients import clients
+from api.services.llm_analyser import ModelType
+from api.tests.fixtures import WHISPER_HI_THERE, LLM_ANALYSIS
+from api.tests.test_setup import TestSetUp
+
+
+def mock_async_openai_client(analysis: dict) -> MagicMock:
+    mock_client = MagicMock()
+    mock_completion = MagicMock()
+    mock_completion.choices[0].message.content = json.dumps(analysis)
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
+    return mock_client
+
+
+class TestAsyncVoiceViews(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.asr_requests = []
+
+        def asr(request: httpx.Request) -> httpx.Response:
+            self.asr_requests.append(request)
+            return httpx.Response(200, json=WHISPER_HI_THERE)
+
+        whisper_client = httpx.AsyncClient(transport=httpx.MockTransport(asr))
+        patcher = patch.object(clients, 'async_httpx_client', return_value=whisper_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self):
+        return {'file': File(open(Path(__file__).absolute().parent / "assets/hi-there.mp3", mode="rb"))}
+
+    @patch('api.services.llm_analyser.AsyncOpenAI')
+    async def test_can_submit_voice(self, mock_openai_class):
+        mock_client = mock_async_openai_client(LLM_ANALYSIS)
+        mock_openai_class.return_value = mock_client
+
+        res = await self.async_client.post("/api/async/voices/", self.upload(), headers={'CF-IPCountry': 'FR'})
+
+        self.assertEqual(201, res.status_code)
+        self.assertEqual(1, len(self.asr_requests))
+        self.assertIn(b'name="audio_file"', self.asr_requests[0].read())
+
+        voice = await Voice.objects.aget(pk=res.json()['uuid'])
+        self.assertEqual(VoiceStatus.ANALYSED, voice.status)
+        self.assertEqual('FR', voice.request_country)
+        self.assertEqual(' Hi there!', voice.text)
+        self.assertTrue(bool(voice.file))
+        self.assertEqual(6.5, res.json()['analysed']['overall_assessment']['band_score'])
+
+        mock_client.chat.completions.create.assert_awaited_once()
+        self.assertEqual(ModelType.GPT4O.value, mock_client.chat.completions.create.call_args[1]['model'])
+
+    async def test_submit_requires_file(self):
+        res = await self.async_client.post("/api/async/voices/", {})
+
+        self.assertEqual(400, res.status_code)
+
+    async def test_can_get_voice(self):
+        voice = Voice(duration_s=30, text='Hi', status=VoiceStatus.ANALYSED)
+        await voice.asave()
+
+        res = await self.async_client.get(f"/api/async/voices/{voice.uuid}/")
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(str(voice.uuid), res.json()['uuid'])
+        self.assertEqual('analysed', res.json()['status'])
+
+    async def test_can_not_get_deleted_voice(self):
+        voice = Voice(duration_s=30, file=None, deleted_at='2024-01-01T00:00:00Z')
+        await voice.asave()
+
+        res = await self.async_client.get(f"/api/async/voices/{voice.uuid}/")
+
+        self.assertEqual(404, res.status_code)
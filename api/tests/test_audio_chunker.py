@@ -0,0 +1,100 @@
+import io
+import json
+import wave
+from unittest.mock import patch
+
+import numpy as np
+import responses
+from django.test import SimpleTestCase, override_settings
+
+from api.services.audio_chunker import AudioChunker
+from api.services.voice_processor import VoiceProcessor
+
+from langomine.settings import OPEN_AI_WHISPERER_HOST
+
+RATE = 8000
+
+
+def make_wav(seconds: float, silences=(), channels: int = 1) -> io.BytesIO:
+    """A 220 Hz tone with silent gaps given as (start_s, end_s)."""
+    t = np.arange(int(seconds * RATE)) / RATE
+    samples = 0.5 * np.sin(2 * np.pi * 220 * t)
+    for start, end in silences:
+        samples[int(start * RATE):int(end * RATE)] = 0
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as out:
+        out.setnchannels(channels)
+        out.setsampwidth(2)
+        out.setframerate(RATE)
+        out.writeframes(np.repeat((samples * 32767).astype('<i2'), channels).tobytes())
+    buffer.seek(0)
+    buffer.name = 'answer.wav'
+    return buffer
+
+
+@override_settings(ASR_CHUNK_SECONDS=30, ASR_CHUNK_THRESHOLD_S=40, ASR_CHUNK_SILENCE_SEARCH_S=5, ASR_CHUNK_MAX_WORKERS=3)
+class TestAudioChunker(SimpleTestCase):
+    def test_short_recording_is_not_split(self):
+        self.assertIsNone(AudioChunker().split(make_wav(20), 'answer.wav'))
+
+    @patch('api.services.audio_chunker.shutil.which', return_value=None)
+    def test_undecodable_audio_is_not_split(self, _):
+        audio = io.BytesIO(b'ID3 not really audio')
+
+        self.assertIsNone(AudioChunker().split(audio, 'answer.mp3'))
+        self.assertEqual(0, audio.tell())
+
+    def test_cuts_in_silence_near_window(self):
+        chunks = AudioChunker().split(make_wav(75, silences=[(27, 28), (55, 56)], channels=2), 'answer.wav')
+
+        self.assertEqual(3, len(chunks))
+        self.assertAlmostEqual(27.5, chunks[1].offset_s, delta=0.5)
+        self.assertAlmostEqual(55.5, chunks[2].offset_s, delta=0.5)
+        self.assertAlmostEqual(75, sum(chunk.duration_s for chunk in chunks), places=2)
+        self.assertTrue(all(chunk.duration_s <= 30 for chunk in chunks))
+        with wave.open(io.BytesIO(chunks[0].data)) as first:
+            self.assertEqual((1, RATE), (first.getnchannels(), first.getframerate()))
+
+    def test_falls_back_to_fixed_windows_without_silence(self):
+        chunks = AudioChunker().split(make_wav(65), 'answer.wav')
+
+        self.assertTrue(all(chunk.duration_s <= 30 for chunk in chunks))
+        self.assertAlmostEqual(65, sum(chunk.duration_s for chunk in chunks), places=2)
+
+    @responses.activate
+    def test_long_recording_is_transcribed_in_parallel_and_stitched(self):
+        def asr(request):
+            body = request.body if isinstance(request.body, bytes) else request.body.read()
+            part = int(body.split(b'.part')[1][:1])
+            return 200, {}, json.dumps({
+                "text": f" part {part}.",
+                "language": "en",
+                "segments": [{
+                    "id": 0, "start": 1.0, "end": 2.0, "text": f" part {part}.",
+                    "words": [{"word": " part", "start": 1.0, "end": 1.5, "probability": 0.9}],
+                }],
+            })
+
+        responses.add_callback(responses.POST, OPEN_AI_WHISPERER_HOST + '/asr', callback=asr)
+
+        whisper = VoiceProcessor('FR').transcribe(make_wav(75, silences=[(27, 28), (55, 56)]))
+
+        self.assertEqual(3, len(responses.calls))
+        self.assertEqual(" part 0. part 1. part 2.", whisper['text'])
+        self.assertEqual([0, 1, 2], [segment['id'] for segment in whisper['segments']])
+        self.assertAlmostEqual(1.0 + 27.5, whisper['segments'][1]['start'], delta=0.5)
+        self.assertAlmostEqual(1.5 + 55.5, whisper['segments'][2]['words'][0]['end'], delta=0.5)
+
+        transcript = VoiceProcessor.transcript(whisper)
+        self.assertEqual(3, len(transcript['words']))
+        self.assertAlmostEqual(55.5 + 2.0, transcript['end'], delta=0.5)
+
+    @override_settings(ASR_CHUNKING_ENABLED=False)
+    @responses.activate
+    def test_chunking_can_be_disabled(self):
+        responses.add(responses.POST, OPEN_AI_WHISPERER_HOST + '/asr', json={"text": "", "segments": [], "language": "en"})
+
+        VoiceProcessor('FR').transcribe(make_wav(75))
+
+        self.assertEqual(1, len(responses.calls))
@@ -0,0 +1,92 @@
+import io
+import wave
+from unittest.mock import patch
+
+import numpy as np
+import responses
+from django.test import SimpleTestCase, override_settings
+
+from api.services.audio_chunker import AudioChunker
+from api.services.audio_normalizer import AudioNormalizer
+from api.services.resilience import ResilientCaller
+from api.services.voice_processor import VoiceProcessor
+from api.tests.fixtures import WHISPER_HI_THERE
+
+from langomine.settings import OPEN_AI_WHISPERER_HOST
+
+
+def make_wav(seconds: float, rate: int = 48000, channels: int = 2, silence=(0, 0)) -> io.BytesIO:
+    """A 440 Hz tone padded with (leading, trailing) seconds of silence."""
+    t = np.arange(int(seconds * rate)) / rate
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+    samples = np.concatenate([np.zeros(int(silence[0] * rate)), tone, np.zeros(int(silence[1] * rate))])
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as out:
+        out.setnchannels(channels)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(np.repeat((samples * 32767).astype('<i2'), channels).tobytes())
+    buffer.seek(0)
+    buffer.name = 'answer.wav'
+    return buffer
+
+
+@override_settings(ASR_NORMALIZE_AUDIO=True, ASR_NORMALIZE_CODEC='wav', ASR_NORMALIZE_PADDING_S=0.1)
+class TestAudioNormalizer(SimpleTestCase):
+    def setUp(self):
+        ResilientCaller.reset()
+
+    def test_downmixes_resamples_and_trims(self):
+        audio = make_wav(2, silence=(1.5, 1))
+        original = len(audio.getvalue())
+
+        chunk = AudioNormalizer().normalize(audio, 'answer.wav')
+
+        self.assertEqual(0, audio.tell())
+        self.assertEqual('answer.asr.wav', chunk.filename)
+        self.assertAlmostEqual(1.4, chunk.offset_s, delta=0.03)
+        self.assertAlmostEqual(2.2, chunk.duration_s, delta=0.05)
+        with wave.open(io.BytesIO(chunk.data)) as out:
+            self.assertEqual((1, 16000), (out.getnchannels(), out.getframerate()))
+        self.assertLess(len(chunk.data), original / 10)
+
+    def test_resampling_keeps_the_tone_and_drops_what_16k_cannot_carry(self):
+        rate = 48000
+        t = np.arange(rate) / rate
+        tone, hiss = np.sin(2 * np.pi * 440 * t), np.sin(2 * np.pi * 12000 * t)
+
+        kept, _ = AudioChunker.resample(tone.astype(np.float32), rate, 16000)
+        aliased, _ = AudioChunker.resample(hiss.astype(np.float32), rate, 16000)
+
+        self.assertEqual(16000, len(kept))
+        self.assertGreater(np.sqrt(np.mean(kept[100:-100] ** 2)), 0.6)
+        self.assertLess(np.sqrt(np.mean(aliased[100:-100] ** 2)), 0.1)
+
+    def test_leaves_already_compact_audio_alone(self):
+        audio = make_wav(1, rate=8000, channels=1)
+
+        self.assertIsNone(AudioNormalizer().normalize(audio, 'answer.wav'))
+
+    def test_undecodable_audio_is_skipped(self):
+        with patch.object(AudioChunker, '_decode_ffmpeg', return_value=None):
+            self.assertIsNone(AudioNormalizer().normalize(io.BytesIO(b'ID3 not really'), 'answer.mp3'))
+
+    @responses.activate
+    def test_asr_gets_the_reduced_audio_and_timestamps_stay_on_the_original_timeline(self):
+        responses.add(responses.POST, OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE)
+        audio = make_wav(1, silence=(2, 0))
+        before = AudioNormalizer.stats()
+
+        whisper = VoiceProcessor(country_code='').transcribe(audio, duration_s=3)
+
+        body = responses.calls[0].request.body
+        self.assertIn(b'filename="answer.asr.wav"', body)
+        self.assertLess(len(body), len(audio.getvalue()) / 10)
+        self.assertAlmostEqual(1.9, whisper['segments'][0]['start'], delta=0.03)
+        self.assertAlmostEqual(1.9 + 0.32, whisper['segments'][0]['words'][1]['start'], delta=0.03)
+        self.assertEqual(' Hi there!', whisper['text'])
+
+        after = AudioNormalizer.stats()
+        self.assertEqual(before['normalized'] + 1, after['normalized'])
+        self.assertGreater(after['saved_bytes'], before['saved_bytes'])
@@ -0,0 +1,184 @@
+import io
+import struct
+import wave
+from pathlib import Path
+from unittest.mock import patch
+
+import responses
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+
+from api.models import Voice
+from api.services.audio_probe import AudioProbe, InvalidAudio
+from api.tests.fixtures import WHISPER_HI_THERE, LLM_ANALYSIS, mock_openai_client
+from api.tests.test_setup import TestSetUp
+
+from langomine.settings import OPEN_AI_WHISPERER_HOST
+
+AUDIO = Path(__file__).absolute().parent / "assets/hi-there.mp3"
+
+
+def make_wav(seconds: float, rate: int = 16000, channels: int = 1) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as out:
+        out.setnchannels(channels)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(b'\x00\x00' * channels * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def ogg_page(packet: bytes, granule: int, sequence: int, serial: int = 7) -> bytes:
+    lacing = bytes([255] * (len(packet) // 255) + [len(packet) % 255])
+    return struct.pack('<4sBBqIIIB', b'OggS', 0, 0, granule, serial, sequence, 0, len(lacing)) + lacing + packet
+
+
+def make_opus(seconds: float, pre_skip: int = 312) -> bytes:
+    head = b'OpusHead' + struct.pack('<BBHIhB', 1, 1, pre_skip, 16000, 0, 0)
+    return (
+        ogg_page(head, 0, 0)
+        + ogg_page(b'OpusTags' + b'\x00' * 8, 0, 1)
+        + ogg_page(b'\x00' * 400, int(seconds * 48000) + pre_skip, 2)
+    )
+
+
+def ebml(element_id: int, body: bytes) -> bytes:
+    size = len(body) | 0x01 << 56
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, 'big') + size.to_bytes(8, 'big') + body
+
+
+def make_webm(duration_ms: float = None) -> bytes:
+    info = ebml(0x2AD7B1, (1_000_000).to_bytes(3, 'big'))
+    if duration_ms is not None:
+        info += ebml(0x4489, struct.pack('>f', duration_ms))
+    video = ebml(0xAE, ebml(0x83, b'\x01') + ebml(0x86, b'V_VP8'))
+    audio = ebml(0xAE, ebml(0x83, b'\x02') + ebml(0x86, b'A_OPUS') + ebml(0xE1, ebml(0xB5, struct.pack('>f', 48000)) + ebml(0x9F, b'\x01')))
+    segment = ebml(0x1549A966, info) + ebml(0x1654AE6B, video + audio) + ebml(0x1F43B675, b'\x00' * 64)
+    return ebml(0x1A45DFA3, ebml(0x4282, b'webm')) + ebml(0x18538067, segment)
+
+
+def box(kind: bytes, body: bytes) -> bytes:
+    return struct.pack('>I4s', len(body) + 8, kind) + body
+
+
+def make_m4a(seconds: float, rate: int = 44100, without: bytes = None) -> bytes:
+    """`without` leaves out one box of the audio track (mdhd, minf, stbl or stsd)."""
+    def part(kind: bytes, body: bytes) -> bytes:
+        return b'' if kind == without else box(kind, body)
+
+    mdhd = part(b'mdhd', struct.pack('>BxxxIIII', 0, 0, 0, rate, int(seconds * rate)) + b'\x00' * 4)
+    hdlr = box(b'hdlr', b'\x00' * 8 + b'soun' + b'\x00' * 12)
+    entry = box(b'mp4a', b'\x00' * 16 + struct.pack('>HHxxxxI', 2, 16, rate << 16))
+    stsd = part(b'stsd', b'\x00' * 4 + struct.pack('>I', 1) + entry)
+    trak = box(b'trak', box(b'mdia', mdhd + hdlr + part(b'minf', part(b'stbl', stsd))))
+    return box(b'ftyp', b'M4A \x00\x00\x00\x00') + box(b'mdat', b'\x00' * 256) + box(b'moov', trak)
+
+
+class TestAudioProbe(SimpleTestCase):
+    def probe(self, data: bytes):
+        return AudioProbe().probe(io.BytesIO(data))
+
+    def test_mp3(self):
+        with open(AUDIO, 'rb') as audio:
+            info = AudioProbe().probe(audio)
+            self.assertEqual(0, audio.tell())
+
+        self.assertEqual(('mp3', 'mp3', 44100, 2), (info.container, info.codec, info.sample_rate, info.channels))
+        self.assertAlmostEqual(1.04, info.duration_s, delta=0.05)
+
+    def test_wav(self):
+        info = self.probe(make_wav(2.5, rate=8000, channels=2))
+
+        self.assertEqual(('wav', 'pcm', 8000, 2), (info.container, info.codec, info.sample_rate, info.channels))
+        self.assertAlmostEqual(2.5, info.duration_s)
+
+    def test_ogg_opus_duration_comes_from_the_last_granule(self):
+        info = self.probe(make_opus(3.25))
+
+        self.assertEqual(('ogg', 'opus', 16000, 1), (info.container, info.codec, info.sample_rate, info.channels))
+        self.assertAlmostEqual(3.25, info.duration_s)
+
+    def test_webm(self):
+        info = self.probe(make_webm(duration_ms=4200))
+
+        self.assertEqual(('webm', 'opus', 48000, 1), (info.container, info.codec, info.sample_rate, info.channels))
+        self.assertAlmostEqual(4.2, info.duration_s, places=3)
+
+    def test_live_webm_has_no_duration(self):
+        self.assertIsNone(self.probe(make_webm()).duration_s)
+
+    def test_m4a(self):
+        info = self.probe(make_m4a(6))
+
+        self.assertEqual(('mp4', 'aac', 44100, 2), (info.container, info.codec, info.sample_rate, info.channels))
+        self.assertAlmostEqual(6, info.duration_s)
+
+    def test_rejects_unknown_and_truncated_files(self):
+        for data in (b'', b'not audio at all', make_wav(1)[:30], make_m4a(1)[:40], make_opus(1)[:60]):
+            with self.subTest(data=data[:12]):
+                with self.assertRaises(InvalidAudio):
+                    self.probe(data)
+
+    def test_rejects_mp4_audio_tracks_with_missing_boxes(self):
+        for missing in (b'mdhd', b'minf', b'stbl', b'stsd'):
+            with self.subTest(missing=missing):
+                with self.assertRaisesMessage(InvalidAudio, missing.decode()):
+                    self.probe(make_m4a(1, without=missing))
+
+    @override_settings(VOICE_MAX_DURATION_S=5)
+    def test_check_enforces_the_duration_limit(self):
+        self.assertAlmostEqual(4, AudioProbe().check(io.BytesIO(make_wav(4))).duration_s)
+
+        with self.assertRaisesRegex(InvalidAudio, 'limit is 5s'):
+            AudioProbe().check(io.BytesIO(make_wav(6)))
+
+
+class TestStorePreflight(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        responses.start()
+        self.addCleanup(responses.stop)
+        self.addCleanup(responses.reset)
+        responses.add(responses.POST, OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE)
+
+        patcher = patch('api.services.llm_analyser.OpenAI')
+        patcher.start().return_value = mock_openai_client(LLM_ANALYSIS)
+        self.addCleanup(patcher.stop)
+
+    def upload(self, name: str, data: bytes):
+        return self.client.post('/api/voices/', {'file': SimpleUploadedFile(name, data)})
+
+    def test_invalid_audio_is_rejected_before_any_upstream_call(self):
+        res = self.upload('answer.mp3', b'definitely not audio' * 100)
+
+        self.assertEqual(400, res.status_code)
+        self.assertIn('file', res.json())
+        self.assertEqual(0, len(responses.calls))
+        self.assertFalse(Voice.all_objects.exists())
+
+    def test_malformed_m4a_is_a_bad_request(self):
+        res = self.upload('answer.m4a', make_m4a(1, without=b'mdhd'))
+
+        self.assertEqual(400, res.status_code)
+        self.assertEqual(0, len(responses.calls))
+
+    @override_settings(VOICE_MAX_DURATION_S=2)
+    def test_too_long_audio_is_rejected(self):
+        res = self.upload('answer.wav', make_wav(3))
+
+        self.assertEqual(400, res.status_code)
+        self.assertEqual(0, len(responses.calls))
+
+    def test_duration_comes_from_the_audio_headers(self):
+        res = self.upload('answer.wav', make_wav(7))
+
+        self.assertEqual(201, res.status_code)
+        self.assertEqual(7, res.json()['duration_s'])
+
+    @override_settings(VOICE_UPLOAD_STREAMING=True, ASR_CHUNK_THRESHOLD_S=5)
+    def test_long_recordings_skip_the_streaming_path(self):
+        with patch('api.views.voices.VoiceView.store_streaming') as streaming:
+            res = self.upload('answer.wav', make_wav(7))
+
+        self.assertEqual(201, res.status_code)
+        streaming.assert_not_called()
@@ -0,0 +1,90 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.db import connection
+
+from api.models import Voice
+from api.services.compact_codec import CompactCodec
+from api.tests.fixtures import LLM_ANALYSIS, WHISPER_HI_THERE
+from api.tests.test_setup import TestSetUp
+
+WORDS = WHISPER_HI_THERE['segments'][0]['words']
+
+
+class TestCompactCodec(TestSetUp):
+    def test_whisper_words_are_packed(self):
+        words = WORDS * 50
+        blob = CompactCodec.encode_words(words)
+
+        self.assertEqual(CompactCodec.WORDS, blob[0])
+        self.assertLess(len(blob), len(json.dumps(words)) / 3)
+        self.assertEqual(words, CompactCodec.decode(blob))
+
+    def test_timestamps_are_rounded_to_the_millisecond(self):
+        words = [{"word": " long", "start": 1234.567, "end": 1234.91, "probability": 0.5}]
+
+        self.assertEqual(words, CompactCodec.decode(CompactCodec.encode_words(words)))
+
+    def test_irregular_words_fall_back_to_json(self):
+        words = [{"word": "hi", "start": 0.0, "end": 0.3, "speaker": "A"}]
+        blob = CompactCodec.encode_words(words)
+
+        self.assertNotEqual(CompactCodec.WORDS, blob[0])
+        self.assertEqual(words, CompactCodec.decode(blob))
+
+    def test_analysis_is_compressed(self):
+        blob = CompactCodec.encode_json(LLM_ANALYSIS)
+
+        self.assertLess(len(blob), len(json.dumps(LLM_ANALYSIS)))
+        self.assertEqual(LLM_ANALYSIS, CompactCodec.decode(blob))
+
+
+class TestCompactStorage(TestSetUp):
+    def legacy_voice(self):
+        voice = Voice(language='en')
+        voice.save()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE api_voice SET words = %s, analysed = %s WHERE uuid = %s',
+                [json.dumps(WORDS), json.dumps(LLM_ANALYSIS), voice.uuid.hex],
+            )
+
+        return voice
+
+    def stored_types(self, voice):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT typeof(words), typeof(analysed) FROM api_voice WHERE uuid = %s', [voice.uuid.hex])
+            return cursor.fetchone()
+
+    def test_voice_round_trips_through_compact_columns(self):
+        voice = Voice(words=WORDS, analysed=LLM_ANALYSIS)
+        voice.save()
+
+        self.assertEqual(('blob', 'blob'), self.stored_types(voice))
+        voice = Voice.objects.get(pk=voice.pk)
+        self.assertEqual(WORDS, voice.words)
+        self.assertEqual(LLM_ANALYSIS, voice.analysed)
+
+    def test_legacy_json_rows_are_readable(self):
+        voice = self.legacy_voice()
+
+        self.assertEqual(('text', 'text'), self.stored_types(voice))
+        voice = Voice.objects.get(pk=voice.pk)
+        self.assertEqual(WORDS, voice.words)
+        self.assertEqual(LLM_ANALYSIS, voice.analysed)
+
+    def test_compact_voices_converts_legacy_rows_in_batches(self):
+        voices = [self.legacy_voice() for _ in range(3)]
+        out = io.StringIO()
+
+        call_command('compact_voices', batch_size=2, stdout=out)
+
+        self.assertIn('Compacted 3 voice(s)', out.getvalue())
+        for voice in voices:
+            self.assertEqual(('blob', 'blob'), self.stored_types(voice))
+            self.assertEqual(LLM_ANALYSIS, Voice.objects.get(pk=voice.pk).analysed)
+
+        call_command('compact_voices', stdout=out)
+        self.assertIn('Compacted 0 voice(s)', out.getvalue())
@@ -0,0 +1,50 @@
+import io
+from unittest.mock import patch
+
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Voice
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from api.serializer import ProcessedVoiceSerializer
+from api.services import fast_json
+from api.tests.fixtures import LLM_ANALYSIS, WHISPER_HI_THERE
+from api.tests.test_setup import TestSetUp
+
+
+class TestFastJson(TestSetUp):
+    def payload(self):
+        voice = Voice(duration_s=30, text='Hi there!   ünïcode', words=WHISPER_HI_THERE['segments'][0]['words'],
+                      analysed={**LLM_ANALYSIS, "model_used": "gpt-4o"})
+        voice.save()
+        return ProcessedVoiceSerializer(voice, expand=['words']).data
+
+    def test_renderer_matches_drf_output(self):
+        data = self.payload()
+
+        self.assertEqual(JSONRenderer().render(data), ORJSONRenderer().render(data))
+
+    def test_renderer_falls_back_without_orjson(self):
+        data = self.payload()
+
+        with patch('api.services.fast_json.orjson', None):
+            self.assertEqual('json', fast_json.engine())
+            self.assertEqual(JSONRenderer().render(data), ORJSONRenderer().render(data))
+
+    def test_parser(self):
+        body = fast_json.dumps(LLM_ANALYSIS)
+
+        self.assertEqual(LLM_ANALYSIS, ORJSONParser().parse(io.BytesIO(body)))
+        with patch('api.services.fast_json.orjson', None):
+            self.assertEqual(LLM_ANALYSIS, ORJSONParser().parse(io.BytesIO(body)))
+
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"broken":'))
+
+    def test_loads_and_dumps_fall_back_to_stdlib(self):
+        with patch('api.services.fast_json.orjson', None):
+            self.assertEqual(WHISPER_HI_THERE, fast_json.loads(fast_json.dumps(WHISPER_HI_THERE)))
+            self.assertEqual({"1": 2}, fast_json.loads(fast_json.dumps({1: 2})))
+
+        self.assertEqual({"1": 2}, fast_json.loads(fast_json.dumps({1: 2})))
@@ -0,0 +1,136 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+import responses
+from django.core.cache import caches
+from django.core.files import File
+from django.test import SimpleTestCase, override_settings
+
+from api.models import Voice
+from api.serializer import AnalysedSerializer
+from api.services.fluency import FluencyFeatures
+from api.services.llm_analyser import LlmAnalyser
+from api.services.prompt_builder import PromptBuilder
+from api.tests.fixtures import WHISPER_HI_THERE, LLM_ANALYSIS, mock_openai_client
+from api.tests.test_prompt_builder import SEGMENT
+from api.tests.test_setup import TestSetUp
+
+from langomine.settings import OPEN_AI_WHISPERER_HOST
+
+
+class TestFluencyFeatures(SimpleTestCase):
+    def test_measures_rates_pauses_and_confidence(self):
+        features = FluencyFeatures(pause_s=0.5, low_confidence=0.5).extract(SEGMENT)
+
+        self.assertEqual(6, features['word_count'])
+        self.assertEqual(4.1, features['speech_s'])
+        self.assertEqual(87.8, features['speech_rate_wpm'])
+        # 4.1s minus the 1.2s and 0.6s pauses
+        self.assertEqual(156.5, features['articulation_rate_wpm'])
+        self.assertEqual((2, 0.9, 1.2), (features['pause_count'], features['pause_mean_s'], features['pause_max_s']))
+        self.assertEqual(0.76, features['confidence_mean'])
+        self.assertEqual(0.31, features['confidence_p10'])
+        self.assertEqual(0.33, features['low_confidence_ratio'])
+        self.assertEqual(1.0, features['type_token_ratio'])
+
+    def test_fillers_are_counted_but_not_as_vocabulary(self):
+        words = [
+            {"word": word, "start": index * 0.4, "end": index * 0.4 + 0.3, "probability": 0.9}
+            for index, word in enumerate([" Um,", " the", " city,", " uh", " the", " city."])
+        ]
+
+        features = FluencyFeatures().extract({"text": "", "start": 0.0, "end": 2.3, "words": words})
+
+        self.assertEqual((2, 0.33), (features['filler_count'], features['filler_ratio']))
+        self.assertEqual(0.5, features['type_token_ratio'])
+        self.assertEqual(0, features['pause_count'])
+        self.assertIsNone(features['pause_mean_s'])
+
+    def test_text_without_timestamps_only_gets_counts(self):
+        content = [{"text": "Hello there", "start": 0.0, "end": 1.5}, {"text": "How are you", "start": 1.5, "end": 2.5}]
+
+        features = FluencyFeatures().extract(content)
+
+        self.assertEqual(5, features['word_count'])
+        self.assertIsNone(features['speech_rate_wpm'])
+        self.assertIsNone(features['confidence_mean'])
+
+    def test_empty_transcript(self):
+        features = FluencyFeatures().extract({"text": "", "start": 0.0, "end": 0.0, "words": []})
+
+        self.assertEqual(0, features['word_count'])
+        self.assertIsNone(features['filler_ratio'])
+
+
+@override_settings(LLM_ANALYSIS_CACHE_ENABLED=False, LLM_PROMPT_STYLE='compact', LLM_MIN_WORDS=2)
+class TestFluencyHints(SimpleTestCase):
+    def test_prompt_ends_with_the_measured_line(self):
+        features = FluencyFeatures(pause_s=0.5).extract(SEGMENT)
+
+        _, user = PromptBuilder(style='compact', pause_s=0.5).messages(SEGMENT, features=features)
+
+        self.assertEqual(
+            "Measured: 88 wpm (156 excluding pauses); 2 pauses, mean 0.9s, longest 1.2s, 44% of the time; fillers 0%; "
+            "word confidence mean 0.76, 10th percentile 0.31; type-token ratio 1.00",
+            user['content'].splitlines()[-1],
+        )
+
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_analyser_sends_the_hints(self, mock_openai_class):
+        mock_client = mock_openai_client(LLM_ANALYSIS)
+        mock_openai_class.return_value = mock_client
+
+        LlmAnalyser(SEGMENT, 'US').analyze()
+
+        self.assertIn('\nMeasured: ', mock_client.chat.completions.create.call_args[1]['messages'][1]['content'])
+
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_short_answers_skip_the_llm(self, mock_openai_class):
+        mock_client = mock_openai_client(LLM_ANALYSIS)
+        mock_openai_class.return_value = mock_client
+        one_word = {"text": " Yes.", "start": 0.0, "end": 0.4, "words": [{"word": " Yes.", "start": 0.0, "end": 0.4, "probability": 0.9}]}
+
+        for content in (one_word, {"text": "", "start": 0.0, "end": 0.0, "words": []}):
+            analysis = LlmAnalyser(content, 'FR').analyze()
+
+            self.assertTrue(AnalysedSerializer(data=analysis).is_valid())
+            self.assertEqual(LlmAnalyser.LOCAL_MODEL, analysis['model_used'])
+            self.assertEqual(1.0, analysis['overall_assessment']['band_score'])
+
+        self.assertEqual(1, asyncio.run(LlmAnalyser(one_word, 'US', mode=LlmAnalyser.PARALLEL).aanalyze())['pronunciation']['band_score'])
+        mock_client.chat.completions.create.assert_not_called()
+
+    @override_settings(LLM_ANALYSIS_CACHE_ENABLED=True, LLM_ANALYSIS_CACHE_TIERS=['analysis-memory'])
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_rounded_confidence_is_part_of_the_cache_key(self, mock_openai_class):
+        caches['analysis-memory'].clear()
+        mock_client = mock_openai_client(LLM_ANALYSIS)
+        mock_openai_class.return_value = mock_client
+        # Both are above the low-confidence threshold, so only the mean confidence tells them apart
+        clear = {**SEGMENT, "words": [{**word, "probability": 0.99} for word in SEGMENT['words']]}
+        mumbled = {**SEGMENT, "words": [{**word, "probability": 0.6} for word in SEGMENT['words']]}
+
+        LlmAnalyser(clear, 'FR').analyze()
+        LlmAnalyser(mumbled, 'FR').analyze()
+        LlmAnalyser(mumbled, 'FR').analyze()
+
+        self.assertEqual(2, mock_client.chat.completions.create.call_count)
+
+
+@override_settings(LLM_ANALYSIS_CACHE_ENABLED=False)
+class TestVoiceFluency(TestSetUp):
+    @responses.activate
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_upload_stores_and_returns_the_features(self, mock_openai_class):
+        mock_openai_class.return_value = mock_openai_client(LLM_ANALYSIS)
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE, status=200)
+
+        res = self.client.post(
+            path="/api/voices/",
+            data={'file': File(open(Path(__file__).absolute().parent / "assets/hi-there.mp3", mode="rb"))},
+        )
+
+        self.assertEqual(201, res.status_code)
+        self.assertEqual(2, res.data['fluency']['word_count'])
+        self.assertEqual(res.data['fluency'], Voice.objects.get(pk=res.data['uuid']).fluency)
@@ -0,0 +1,47 @@
+import os
+from unittest.mock import patch
+
+import httpx
+from django.test import SimpleTestCase, override_settings
+
+from api.services.http_clients import HttpClients, clients
+from api.services.llm_analyser import LlmAnalyser
+
+OUTBOUND_HTTP = {
+    'whisper': {'pool_size': 3, 'connect_timeout': 1.5, 'read_timeout': 30},
+    'openai': {'pool_size': 4, 'connect_timeout': 2, 'read_timeout': 60},
+}
+
+
+@override_settings(OUTBOUND_HTTP=OUTBOUND_HTTP)
+class TestHttpClients(SimpleTestCase):
+    def setUp(self):
+        self.registry = HttpClients()
+        self.addCleanup(self.registry.close)
+
+    def test_session_is_reused_with_configured_pool(self):
+        session = self.registry.session('whisper')
+
+        self.assertIs(session, self.registry.session('whisper'))
+        self.assertEqual(3, session.get_adapter('http://whisper')._pool_maxsize)
+        self.assertEqual((1.5, 30), self.registry.timeout('whisper'))
+
+    def test_httpx_client_is_reused_with_configured_timeouts(self):
+        client = self.registry.httpx_client('openai')
+
+        self.assertIs(client, self.registry.httpx_client('openai'))
+        self.assertEqual(httpx.Timeout(60, connect=2), client.timeout)
+
+    def test_clients_are_rebuilt_in_forked_child(self):
+        session = self.registry.session('whisper')
+
+        with patch('api.services.http_clients.os.getpid', return_value=os.getpid() + 1):
+            self.assertIsNot(session, self.registry.session('whisper'))
+
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_llm_analyser_uses_shared_pool(self, mock_openai_class):
+        LlmAnalyser({"text": "Hi"}, "FR")
+        LlmAnalyser({"text": "Hi"}, "US")
+
+        pools = {call.kwargs['http_client'] for call in mock_openai_class.call_args_list}
+        self.assertEqual({clients.httpx_client('openai')}, pools)
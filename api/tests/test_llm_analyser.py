@@ -1,7 +1,9 @@
 import json
 from unittest.mock import patch, MagicMock
+from django.core.cache import caches
 from django.test import TestCase, override_settings
 
+from api.services.analysis_cache import AnalysisCache
 from api.services.llm_analyser import LlmAnalyser, ModelType
 from unittest.mock import patch, MagicMock
 from django.test import TestCase
@@ -10,6 +12,8 @@ import json
 
 class TestLlmAnalyser(TestCase):
     def setUp(self):
+        for cache in caches.all():
+            cache.clear()
         self.voice_content = [
             {"text": "Hello there", "start": 0.0, "end": 1.5},
             {"text": "How are you", "start": 1.5, "end": 2.5}
@@ -62,7 +66,7 @@ class TestLlmAnalyser(TestCase):
         mock_completion = MagicMock()
         mock_choice = MagicMock()
         mock_message = MagicMock()
-        mock_message.function_call.arguments = json.dumps(self.mock_response)
+        mock_message.content = json.dumps(self.mock_response)
         mock_choice.message = mock_message
         mock_completion.choices = [mock_choice]
         mock_client.chat.completions.create.return_value = mock_completion
@@ -85,7 +89,7 @@ class TestLlmAnalyser(TestCase):
         mock_completion = MagicMock()
         mock_choice = MagicMock()
         mock_message = MagicMock()
-        mock_message.function_call.arguments = json.dumps(self.mock_response)
+        mock_message.content = json.dumps(self.mock_response)
         mock_choice.message = mock_message
         mock_completion.choices = [mock_choice]
         mock_client.chat.completions.create.return_value = mock_completion
@@ -100,3 +104,100 @@ class TestLlmAnalyser(TestCase):
         mock_client.chat.completions.create.assert_called_once()
         call_args = mock_client.chat.completions.create.call_args[1]
         self.assertEqual(call_args["model"], ModelType.GPT4O_MINI.value)
+
+
+class TestLlmAnalyserCache(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.voice_content = {"text": " Hi there!", "start": 0.0, "end": 0.54}
+        self.mock_response = {"overall_assessment": {"band_score": 6.5}}
+
+    def mock_client(self, mock_openai_class):
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value.choices = [MagicMock()]
+        mock_client.chat.completions.create.return_value.choices[0].message.content = json.dumps(self.mock_response)
+        mock_openai_class.return_value = mock_client
+        return mock_client
+
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_same_transcript_is_served_from_cache(self, mock_openai_class):
+        mock_client = self.mock_client(mock_openai_class)
+
+        first = LlmAnalyser(self.voice_content, "FR").analyze()
+        second = LlmAnalyser(dict(self.voice_content), "DE").analyze()
+
+        self.assertEqual(first, second)
+        mock_client.chat.completions.create.assert_called_once()
+
+    @staticmethod
+    def recording(text, gap_s, probability):
+        words = [
+            {"word": " Hi", "start": 0.0, "end": 0.3, "probability": probability},
+            {"word": " there!", "start": 0.3 + gap_s, "end": 0.6 + gap_s, "probability": probability},
+        ]
+        return {"text": text, "start": 0.0, "end": 0.6 + gap_s, "words": words}
+
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_different_recordings_of_the_same_text_are_served_from_cache(self, mock_openai_class):
+        mock_client = self.mock_client(mock_openai_class)
+
+        first = LlmAnalyser(self.recording(" Hi there!", 0.0, 0.95), "FR").analyze()
+        second = LlmAnalyser(self.recording("hi  THERE! ", 0.04, 0.91), "FR").analyze()
+
+        self.assertEqual(first, second)
+        mock_client.chat.completions.create.assert_called_once()
+
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_same_text_spoken_differently_is_not_served_from_cache(self, mock_openai_class):
+        mock_client = self.mock_client(mock_openai_class)
+
+        LlmAnalyser(self.recording(" Hi there!", 0.0, 0.95), "FR").analyze()
+        LlmAnalyser(self.recording(" Hi there!", 2.2, 0.2), "FR").analyze()
+
+        self.assertEqual(2, mock_client.chat.completions.create.call_count)
+
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_different_model_is_not_served_from_cache(self, mock_openai_class):
+        mock_client = self.mock_client(mock_openai_class)
+
+        LlmAnalyser(self.voice_content, "FR").analyze()
+        result = LlmAnalyser(self.voice_content, "US").analyze()
+
+        self.assertEqual(ModelType.GPT4O_MINI.value, result["model_used"])
+        self.assertEqual(2, mock_client.chat.completions.create.call_count)
+
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_schema_change_invalidates_cache(self, mock_openai_class):
+        mock_client = self.mock_client(mock_openai_class)
+
+        LlmAnalyser(self.voice_content, "FR").analyze()
+        with patch.object(LlmAnalyser, 'SCHEMA_VERSION', 'changed'):
+            LlmAnalyser(self.voice_content, "FR").analyze()
+
+        self.assertEqual(2, mock_client.chat.completions.create.call_count)
+
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_persistent_tier_refills_memory_tier(self, mock_openai_class):
+        mock_client = self.mock_client(mock_openai_class)
+
+        LlmAnalyser(self.voice_content, "FR").analyze()
+        caches['analysis-memory'].clear()
+        before = AnalysisCache.stats()
+        LlmAnalyser(self.voice_content, "FR").analyze()
+
+        mock_client.chat.completions.create.assert_called_once()
+        self.assertEqual(before['hits'] + 1, AnalysisCache.stats()['hits'])
+        analyser = LlmAnalyser(self.voice_content, "FR")
+        key = AnalysisCache(LlmAnalyser.SCHEMA_VERSION).key(analyser._cache_subject(), ModelType.GPT4O.value)
+        self.assertIsNotNone(caches['analysis-memory'].get(key))
+
+    @override_settings(LLM_ANALYSIS_CACHE_ENABLED=False)
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_cache_can_be_disabled(self, mock_openai_class):
+        mock_client = self.mock_client(mock_openai_class)
+
+        LlmAnalyser(self.voice_content, "FR").analyze()
+        LlmAnalyser(self.voice_content, "FR").analyze()
+
+        self.assertEqual(2, mock_client.chat.completions.create.call_count)
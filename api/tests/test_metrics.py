@@ -0,0 +1,119 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import responses
+from django.core.files import File
+from django.test import SimpleTestCase, override_settings
+
+from api.models import Voice
+from api.services import timings
+from api.services.llm_analyser import LlmAnalyser
+from api.services.metrics import MetricsRegistry, OPENAI_TOKENS, STAGE_SECONDS
+from api.tests.fixtures import WHISPER_HI_THERE, LLM_ANALYSIS, mock_openai_client
+from api.tests.test_setup import TestSetUp
+
+from langomine.settings import OPEN_AI_WHISPERER_HOST
+
+
+def stage_names(header: str):
+    return [entry.split(';')[0] for entry in header.split(', ')]
+
+
+class TestServerTiming(TestSetUp):
+    @responses.activate
+    @patch('api.services.llm_analyser.OpenAI')
+    @override_settings(LLM_ANALYSIS_CACHE_ENABLED=False)
+    def test_store_reports_each_stage(self, mock_openai_class):
+        mock_client = mock_openai_client(LLM_ANALYSIS)
+        mock_client.chat.completions.create.return_value.usage = MagicMock(prompt_tokens=120, completion_tokens=80)
+        mock_openai_class.return_value = mock_client
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE, status=200)
+        asr_before = STAGE_SECONDS.count(stage='asr', model='gpt-4o', country_tier='eu')
+        prompt_before = OPENAI_TOKENS.value(model='gpt-4o', kind='prompt')
+
+        res = self.client.post(
+            path="/api/voices/",
+            data={'file': File(open(Path(__file__).absolute().parent / "assets/hi-there.mp3", mode="rb"))},
+            HTTP_CF_IPCOUNTRY='FR',
+        )
+
+        self.assertEqual(201, res.status_code)
+        stages = stage_names(res['Server-Timing'])
+        for stage in ('parse', 'probe', 'hash', 'dedup', 'asr', 'llm', 'storage', 'save', 'serialize', 'render'):
+            self.assertIn(stage, stages)
+        self.assertEqual('total', stages[-1])
+
+        self.assertEqual(asr_before + 1, STAGE_SECONDS.count(stage='asr', model='gpt-4o', country_tier='eu'))
+        self.assertEqual(prompt_before + 120, OPENAI_TOKENS.value(model='gpt-4o', kind='prompt'))
+
+    def test_show_reports_cache_and_db(self):
+        voice = Voice(duration_s=30)
+        voice.save()
+
+        res = self.client.get(path=f"/api/voices/{voice.uuid}/")
+
+        self.assertEqual(200, res.status_code)
+        # The cached payload is rendered while it is built, so render is part of serialize here
+        self.assertEqual(['cache', 'db', 'render', 'serialize', 'total'], stage_names(res['Server-Timing']))
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_header_can_be_turned_off(self):
+        res = self.client.get(path="/api/stats/")
+
+        self.assertEqual(200, res.status_code)
+        self.assertFalse(res.has_header('Server-Timing'))
+
+    def test_metrics_endpoint_exposes_histograms(self):
+        voice = Voice(duration_s=30)
+        voice.save()
+        self.client.get(path=f"/api/voices/{voice.uuid}/")
+
+        res = self.client.get(path="/api/metrics/")
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(MetricsRegistry.CONTENT_TYPE, res['Content-Type'])
+        body = res.content.decode()
+        self.assertIn('# TYPE langomine_request_duration_seconds histogram', body)
+        self.assertIn('method="GET",endpoint="/api/voices/<uuid:uuid>/",status="200"', body)
+        self.assertIn('langomine_stage_duration_seconds_count{stage="db"', body)
+        self.assertIn('# TYPE langomine_openai_tokens_total counter', body)
+
+
+class TestMetricsRegistry(SimpleTestCase):
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency_seconds', 'Latency.', ('stage',), buckets=(0.1, 1))
+
+        histogram.observe(0.05, stage='asr')
+        histogram.observe(0.5, stage='asr')
+        histogram.observe(3, stage='asr')
+
+        self.assertEqual([
+            '# HELP latency_seconds Latency.',
+            '# TYPE latency_seconds histogram',
+            'latency_seconds_bucket{stage="asr",le="0.1"} 1',
+            'latency_seconds_bucket{stage="asr",le="1"} 2',
+            'latency_seconds_bucket{stage="asr",le="+Inf"} 3',
+            'latency_seconds_sum{stage="asr"} 3.550000',
+            'latency_seconds_count{stage="asr"} 3',
+        ], registry.render().splitlines())
+
+    def test_duplicate_names_are_rejected(self):
+        registry = MetricsRegistry()
+        registry.counter('calls_total', 'Calls.')
+
+        with self.assertRaises(ValueError):
+            registry.counter('calls_total', 'Calls.')
+
+    def test_stages_add_up_within_a_request(self):
+        with timings.scope() as scope:
+            timings.record('db', 0.25)
+            timings.record('db', 0.5)
+
+        self.assertEqual({'db': 0.75}, dict(scope.stages))
+        self.assertEqual('db;dur=750.0, total;dur=1000.0', timings.server_timing(scope.stages, 1))
+
+    def test_country_tier(self):
+        self.assertEqual('eu', LlmAnalyser.country_tier('fr'))
+        self.assertEqual('other', LlmAnalyser.country_tier('US'))
+        self.assertEqual('unknown', LlmAnalyser.country_tier(''))
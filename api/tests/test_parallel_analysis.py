@@ -0,0 +1,147 @@
+import asyncio
+import json
+from io import StringIO
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import responses
+from django.core.cache import caches
+from django.core.files import File
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from api.models import ProcessingJob, Voice
+from api.serializer import AnalysedSerializer
+from api.services.llm_analyser import LlmAnalyser
+from api.tests.fixtures import WHISPER_HI_THERE, LLM_ANALYSIS
+from api.tests.test_setup import TestSetUp
+from api.views.voices import VoiceView
+
+from langomine.settings import OPEN_AI_WHISPERER_HOST
+
+SEGMENT = {"text": " Hi there!", "start": 0.0, "end": 0.54, "words": []}
+
+
+def completion_for(response_format) -> MagicMock:
+    """Answers a per-criterion call with that criterion's fixture section (or the whole fixture)."""
+    properties = response_format['json_schema']['schema']['properties']
+    content = {key: LLM_ANALYSIS[key] for key in properties}
+
+    completion = MagicMock()
+    completion.choices = [MagicMock()]
+    completion.choices[0].message.content = json.dumps(content)
+    return completion
+
+
+def sectioned_openai_client() -> MagicMock:
+    client = MagicMock()
+    client.chat.completions.create.side_effect = lambda **kwargs: completion_for(kwargs['response_format'])
+    return client
+
+
+@override_settings(LLM_ANALYSIS_CACHE_ENABLED=False)
+class TestParallelAnalysis(SimpleTestCase):
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_criteria_are_requested_separately_and_merged(self, mock_openai_class):
+        mock_client = sectioned_openai_client()
+        mock_openai_class.return_value = mock_client
+
+        analysis = LlmAnalyser(SEGMENT, 'FR', mode=LlmAnalyser.PARALLEL).analyze()
+
+        calls = mock_client.chat.completions.create.call_args_list
+        self.assertEqual(
+            sorted(LlmAnalyser.CRITERIA),
+            sorted(call[1]['response_format']['json_schema']['name'].removeprefix('ielts_') for call in calls),
+        )
+        self.assertTrue(all('Assess only:' in call[1]['messages'][-1]['content'] for call in calls))
+
+        serializer = AnalysedSerializer(data=analysis)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual('gpt-4o', analysis['model_used'])
+        for criterion in LlmAnalyser.CRITERIA:
+            self.assertEqual(LLM_ANALYSIS[criterion], analysis[criterion])
+
+    @patch('api.services.llm_analyser.AsyncOpenAI')
+    def test_async_analysis_gathers_the_criteria(self, mock_async_openai_class):
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(side_effect=lambda **kwargs: completion_for(kwargs['response_format']))
+        mock_async_openai_class.return_value = mock_client
+
+        analysis = asyncio.run(LlmAnalyser(SEGMENT, 'US', mode=LlmAnalyser.PARALLEL).aanalyze())
+
+        self.assertEqual(4, mock_client.chat.completions.create.await_count)
+        self.assertTrue(AnalysedSerializer(data=analysis).is_valid())
+
+    @override_settings(LLM_ANALYSIS_CACHE_ENABLED=True, LLM_ANALYSIS_CACHE_TIERS=['analysis-memory'])
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_modes_are_cached_separately(self, mock_openai_class):
+        caches['analysis-memory'].clear()
+        mock_client = sectioned_openai_client()
+        mock_openai_class.return_value = mock_client
+
+        LlmAnalyser(SEGMENT, 'FR', mode=LlmAnalyser.SINGLE).analyze()
+        LlmAnalyser(SEGMENT, 'FR', mode=LlmAnalyser.PARALLEL).analyze()
+        self.assertEqual(5, mock_client.chat.completions.create.call_count)
+
+        LlmAnalyser(SEGMENT, 'FR', mode=LlmAnalyser.PARALLEL).analyze()
+        LlmAnalyser(SEGMENT, 'FR', mode=LlmAnalyser.SINGLE).analyze()
+        self.assertEqual(5, mock_client.chat.completions.create.call_count)
+
+    def test_overall_band_is_the_mean_rounded_to_half_bands(self):
+        def sections(*bands):
+            return {
+                criterion: {**LLM_ANALYSIS[criterion], 'band_score': band}
+                for criterion, band in zip(LlmAnalyser.CRITERIA, bands)
+            }
+
+        self.assertEqual(6.5, LlmAnalyser.derive_overall(sections(6, 6.5, 6.5, 6))['band_score'])
+        self.assertEqual(7.0, LlmAnalyser.derive_overall(sections(7, 7, 7, 6.5))['band_score'])
+        self.assertEqual(6.0, LlmAnalyser.derive_overall(sections(6, 6, 6, 6.5))['band_score'])
+
+        overall = LlmAnalyser.derive_overall(sections(8, 6, 7, 7))
+        self.assertEqual('Lexical resource (band 6)', overall['priority_improvements'][0])
+        self.assertTrue(overall['summary'].startswith('Overall band 7.'))
+
+
+@override_settings(LLM_ANALYSIS_CACHE_ENABLED=False, LLM_ANALYSIS_MODE='single')
+class TestAnalysisModePreference(TestSetUp):
+    def submit(self, **headers):
+        return self.client.post(
+            path="/api/voices/",
+            data={'file': File(open(Path(__file__).absolute().parent / "assets/hi-there.mp3", mode="rb"))},
+            **headers
+        )
+
+    @responses.activate
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_prefer_header_switches_to_parallel(self, mock_openai_class):
+        mock_client = sectioned_openai_client()
+        mock_openai_class.return_value = mock_client
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE, status=200)
+
+        res = self.submit(HTTP_PREFER='analysis=parallel')
+
+        self.assertEqual(201, res.status_code)
+        self.assertEqual(4, mock_client.chat.completions.create.call_count)
+        self.assertEqual(LLM_ANALYSIS['pronunciation'], Voice.objects.get(pk=res.data['uuid']).analysed['pronunciation'])
+
+    @override_settings(VOICE_PROCESSING_MODE='async')
+    @responses.activate
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_queued_job_keeps_the_requested_mode(self, mock_openai_class):
+        mock_client = sectioned_openai_client()
+        mock_openai_class.return_value = mock_client
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE, status=200)
+
+        uuid = self.submit(HTTP_PREFER='respond-async, analysis=parallel').data['uuid']
+        self.assertEqual('parallel', ProcessingJob.objects.get(voice_id=uuid).analysis_mode)
+
+        call_command('process_voice_jobs', once=True, stdout=StringIO())
+
+        self.assertEqual(4, mock_client.chat.completions.create.call_count)
+        self.assertEqual('analysed', Voice.objects.get(pk=uuid).status)
+
+    def test_unknown_modes_are_ignored(self):
+        request = MagicMock(headers={'Prefer': 'analysis=turbo'})
+
+        self.assertIsNone(VoiceView.analysis_mode(request))
@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from api.services.llm_analyser import LlmAnalyser
+from api.services.metrics import OPENAI_TOKENS
+from api.services.prompt_builder import PromptBuilder
+from api.tests.fixtures import LLM_ANALYSIS, mock_openai_client
+
+SEGMENT = {
+    "text": " I think, the city has changed.",
+    "start": 0.0,
+    "end": 4.1,
+    "words": [
+        {"word": " I", "start": 0.0, "end": 0.2, "probability": 0.99},
+        {"word": " think,", "start": 0.2, "end": 0.5, "probability": 0.95},
+        {"word": " the", "start": 1.7, "end": 1.8, "probability": 0.9},
+        {"word": " city", "start": 1.8, "end": 2.1, "probability": 0.31},
+        {"word": " has", "start": 2.2, "end": 2.4, "probability": 0.97},
+        {"word": " changed.", "start": 3.0, "end": 4.1, "probability": 0.42},
+    ],
+}
+
+
+@override_settings(LLM_PROMPT_PAUSE_S=0.5, LLM_PROMPT_LOW_CONFIDENCE=0.5)
+class TestPromptBuilder(SimpleTestCase):
+    def test_compact_prompt_marks_pauses_and_unsure_words(self):
+        system, user = PromptBuilder(style='compact').messages(SEGMENT)
+
+        self.assertEqual({"role": "system", "content": PromptBuilder.SYSTEM}, system)
+        self.assertEqual(
+            "Duration: 4.1s, 6 words.\n"
+            "Transcript:\n"
+            "I think, [1.2s] the city has [0.6s] changed.\n"
+            "Low-confidence words: city, changed",
+            user['content'],
+        )
+
+    def test_prefix_does_not_depend_on_the_transcript(self):
+        builder = PromptBuilder(style='compact')
+        other = {"text": " Hello.", "start": 0.0, "end": 0.5, "words": []}
+
+        self.assertEqual(builder.messages(SEGMENT)[0], builder.messages(other)[0])
+
+    def test_segments_without_words_fall_back_to_text(self):
+        content = [{"text": "Hello there", "start": 0.0, "end": 1.5}, {"text": "How are you", "start": 1.5, "end": 2.5}]
+
+        _, user = PromptBuilder(style='compact').messages(content)
+
+        self.assertEqual("Duration: 2.5s, 5 words.\nTranscript:\nHello there How are you", user['content'])
+
+    def test_legacy_style_sends_the_dict_repr(self):
+        (message,) = PromptBuilder(style='legacy').messages(SEGMENT)
+
+        self.assertEqual('user', message['role'])
+        self.assertIn("'probability': 0.99", message['content'])
+
+
+@override_settings(LLM_ANALYSIS_CACHE_ENABLED=False, LLM_PROMPT_STYLE='compact')
+class TestAnalyserPrompt(SimpleTestCase):
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_analyser_sends_compact_messages_and_counts_cached_tokens(self, mock_openai_class):
+        mock_client = mock_openai_client(LLM_ANALYSIS)
+        mock_client.chat.completions.create.return_value.usage = MagicMock(
+            prompt_tokens=1400, completion_tokens=500, prompt_tokens_details=MagicMock(cached_tokens=1024),
+        )
+        mock_openai_class.return_value = mock_client
+        cached_before = OPENAI_TOKENS.value(model='gpt-4o-mini', kind='cached_prompt')
+
+        LlmAnalyser(SEGMENT, 'US').analyze()
+
+        messages = mock_client.chat.completions.create.call_args[1]['messages']
+        self.assertEqual(['system', 'user'], [message['role'] for message in messages])
+        self.assertNotIn('probability', messages[1]['content'])
+        self.assertEqual(cached_before + 1024, OPENAI_TOKENS.value(model='gpt-4o-mini', kind='cached_prompt'))
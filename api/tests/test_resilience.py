@@ -0,0 +1,181 @@
+import asyncio
+import concurrent.futures
+import io
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from api.services.asr_pool import AsrPool
+from api.services.llm_analyser import LlmAnalyser
+from api.services.resilience import CircuitOpen, Deadline, DeadlineExceeded, ResilientCaller
+from api.services.voice_processor import VoiceProcessor
+from api.tests.fixtures import WHISPER_HI_THERE, LLM_ANALYSIS, mock_openai_client
+from api.tests.stubs import StubServer
+
+FAST = {
+    'retries': 2, 'backoff_s': 0.01, 'backoff_cap_s': 0.02,
+    'hedge': False, 'hedge_after_s': 0.1, 'hedge_min_samples': 20,
+    'breaker_failures': 3, 'breaker_reset_s': 0.2,
+}
+
+
+def resilience(whisper=None, openai=None):
+    return override_settings(UPSTREAM_RESILIENCE={'whisper': {**FAST, **(whisper or {})}, 'openai': {**FAST, **(openai or {})}})
+
+
+class ResilienceTestCase(SimpleTestCase):
+    def setUp(self):
+        ResilientCaller.reset()
+        AsrPool.reset()
+
+    def transcribe(self, stub: StubServer):
+        with override_settings(ASR_HOSTS=[stub.url], ASR_HEALTH_PROBE_INTERVAL_S=0):
+            return VoiceProcessor(country_code='')._transcribe_once(io.BytesIO(b'audio'), 'answer.mp3')
+
+
+@resilience()
+class TestRetriesAndDeadlines(ResilienceTestCase):
+    def test_transient_failures_are_retried(self):
+        with StubServer([(0, 503, None), (0, 502, None)], default=(0, 200, WHISPER_HI_THERE)) as stub:
+            self.assertEqual(WHISPER_HI_THERE, self.transcribe(stub))
+
+        self.assertEqual(3, len(stub.requests))
+        self.assertEqual(2, ResilientCaller.for_upstream('whisper').stats()['retries'])
+
+    def test_client_errors_are_not_retried(self):
+        with StubServer(default=(0, 422, {'detail': 'bad audio'})) as stub:
+            with self.assertRaises(requests.HTTPError):
+                self.transcribe(stub)
+
+        self.assertEqual(1, len(stub.requests))
+
+    def test_slow_upstream_is_cut_off_at_the_deadline(self):
+        with StubServer(default=(2, 200, WHISPER_HI_THERE)) as stub:
+            started = time.monotonic()
+            with Deadline.budget(0.3), self.assertRaises((requests.Timeout, DeadlineExceeded)):
+                self.transcribe(stub)
+
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_spent_budget_fails_before_calling_upstream(self):
+        with StubServer() as stub, Deadline.budget(0):
+            with self.assertRaises(DeadlineExceeded):
+                self.transcribe(stub)
+
+        self.assertEqual([], stub.requests)
+
+    def test_nested_budget_cannot_extend_the_outer_one(self):
+        with Deadline.budget(1), Deadline.budget(60):
+            self.assertLessEqual(Deadline.timeout(300), 1)
+        self.assertIsNone(Deadline.remaining())
+
+
+@resilience(whisper={'retries': 0})
+class TestCircuitBreaker(ResilienceTestCase):
+    def test_opens_after_consecutive_failures_then_recovers(self):
+        with StubServer([(0, 500, None)] * 3, default=(0, 200, WHISPER_HI_THERE)) as stub:
+            for _ in range(3):
+                with self.assertRaises(requests.HTTPError):
+                    self.transcribe(stub)
+
+            with self.assertRaises(CircuitOpen):
+                self.transcribe(stub)
+            self.assertEqual(3, len(stub.requests), "an open circuit fails fast")
+
+            time.sleep(0.25)
+            self.assertEqual(WHISPER_HI_THERE, self.transcribe(stub))
+
+        stats = ResilientCaller.for_upstream('whisper').stats()
+        self.assertEqual(('closed', 1, 1), (stats['circuit'], stats['circuit_opened'], stats['short_circuited']))
+
+    def test_failed_trial_reopens_the_circuit(self):
+        with StubServer(default=(0, 500, None)) as stub:
+            for _ in range(3):
+                with self.assertRaises(requests.HTTPError):
+                    self.transcribe(stub)
+            time.sleep(0.25)
+
+            with self.assertRaises(requests.HTTPError):
+                self.transcribe(stub)
+            with self.assertRaises(CircuitOpen):
+                self.transcribe(stub)
+
+
+@resilience(whisper={'hedge': True, 'hedge_after_s': 0.1}, openai={'hedge': True, 'hedge_after_s': 0.1})
+class TestHedging(ResilienceTestCase):
+    def test_slow_request_is_hedged_and_the_fast_reply_wins(self):
+        with StubServer([(1.5, 200, WHISPER_HI_THERE)], default=(0, 200, WHISPER_HI_THERE)) as stub:
+            started = time.monotonic()
+            self.assertEqual(WHISPER_HI_THERE, self.transcribe(stub))
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 1)
+        self.assertEqual(2, len(stub.requests))
+        self.assertEqual(b'audio', stub.requests[1][1].split(b'\r\n\r\n')[1][:5], "the hedge sends the whole upload")
+        stats = ResilientCaller.for_upstream('whisper').stats()
+        self.assertEqual((1, 1), (stats['hedges'], stats['hedge_wins']))
+
+    def test_fast_request_is_not_hedged(self):
+        with StubServer(default=(0, 200, WHISPER_HI_THERE)) as stub:
+            self.transcribe(stub)
+
+        self.assertEqual(1, len(stub.requests))
+
+    def test_primary_does_not_queue_behind_a_saturated_hedge_pool(self):
+        busy = threading.Event()
+        saturated = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        saturated.submit(busy.wait, 2)
+        self.addCleanup(saturated.shutdown)
+        self.addCleanup(busy.set)
+
+        with patch.object(ResilientCaller, '_hedge_executor', return_value=saturated), \
+                StubServer([(0.05, 200, WHISPER_HI_THERE)]) as stub:
+            started = time.monotonic()
+            self.assertEqual(WHISPER_HI_THERE, self.transcribe(stub))
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(1, len(stub.requests))
+        self.assertEqual(0, ResilientCaller.for_upstream('whisper').stats()['hedges'])
+
+    def test_hedge_delay_follows_the_observed_p95(self):
+        caller = ResilientCaller.for_upstream('whisper')
+        for latency in [0.01 * n for n in range(1, 101)]:
+            caller.latency.record(latency)
+
+        self.assertAlmostEqual(0.96, caller.hedge_delay())
+
+    def test_async_hedge_cancels_the_slow_request(self):
+        with StubServer([(1.5, 200, WHISPER_HI_THERE)], default=(0, 200, WHISPER_HI_THERE)) as stub:
+            async def transcribe():
+                with override_settings(ASR_HOSTS=[stub.url], ASR_HEALTH_PROBE_INTERVAL_S=0):
+                    return await VoiceProcessor(country_code='')._atranscribe_once(io.BytesIO(b'audio'), 'answer.mp3')
+
+            started = time.monotonic()
+            self.assertEqual(WHISPER_HI_THERE, asyncio.run(transcribe()))
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(2, len(stub.requests))
+
+    @override_settings(LLM_ANALYSIS_CACHE_ENABLED=False)
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_openai_calls_are_hedged_with_a_deadline_bound_timeout(self, mock_openai_class):
+        mock_client = mock_openai_client(LLM_ANALYSIS)
+        completion = mock_client.chat.completions.create.return_value
+        replies = iter([lambda: time.sleep(1) or completion, lambda: completion])
+        mock_client.chat.completions.create.side_effect = lambda **kwargs: next(replies)()
+        mock_openai_class.return_value = mock_client
+
+        analyser = LlmAnalyser(voice_content={'text': 'hi there'}, country_code='US')
+        started = time.monotonic()
+        with Deadline.budget(5):
+            analyser.analyze()
+
+        self.assertLess(time.monotonic() - started, 0.9)
+        timeouts = [call.kwargs['timeout'] for call in mock_client.chat.completions.create.call_args_list]
+        self.assertEqual(2, len(timeouts))
+        self.assertTrue(all(timeout <= 5 for timeout in timeouts))
+        self.assertEqual(0, mock_openai_class.call_args.kwargs['max_retries'])
@@ -1,6 +1,10 @@
+from django.core.cache import caches
 from django.test import override_settings
 from rest_framework.test import APITestCase
 
+from api.services.asr_pool import AsrPool
+from api.services.resilience import ResilientCaller
+
 @override_settings(STORAGES={
     "default": {
         "BACKEND": "django.core.files.storage.memory.InMemoryStorage",
@@ -8,6 +12,11 @@ from rest_framework.test import APITestCase
 })
 class TestSetUp(APITestCase):
     def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        # Breakers, latency windows and host health are per process; start every test from scratch
+        ResilientCaller.reset()
+        AsrPool.reset()
         return super().setUp()
     
     def tearDown(self):
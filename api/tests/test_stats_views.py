@@ -6,7 +6,10 @@ from dateutil.parser import ParserError
 from django.core.files import File
 import responses
 
-from api.models import Voice
+from io import StringIO
+from django.core.management import call_command
+
+from api.models import Voice, VoiceRollup
 from api.tests.test_setup import TestSetUp
 from django.utils import timezone
 
@@ -30,3 +33,69 @@ class TestStatsViews(TestSetUp):
         self.assertEqual(200, res.status_code)
         # self.assertEqual(2, res.data['total_count'])
         self.assertEqual(780, res.data['total_duration_s'])
+
+    def test_can_get_cache_stats(self):
+        res = self.client.get(path=f"/api/stats/cache/", content_type='application/json')
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual({'hits', 'misses', 'hit_ratio', 'saved_latency_s'}, set(res.data['analysis_cache']))
+        self.assertEqual({'hits', 'misses', 'hit_ratio'}, set(res.data['voice_dedup']))
+        self.assertIn('asr_latency_delta_s', res.data['asr_normalization'])
+
+    def test_can_get_upstream_stats(self):
+        res = self.client.get(path=f"/api/stats/upstreams/", content_type='application/json')
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(['whisper', 'openai'], [upstream['name'] for upstream in res.data])
+        self.assertEqual('closed', res.data[0]['circuit'])
+
+    def test_stats_break_down_by_language_country_and_day(self):
+        Voice(duration_s=30, language='en', request_country='fr').save()
+        Voice(duration_s=20, language='en', request_country='US').save()
+        Voice(duration_s=10, language='de', request_country='FR').save()
+
+        res = self.client.get(path=f"/api/stats/", content_type='application/json')
+
+        self.assertEqual(3, res.data['total_count'])
+        self.assertEqual(60, res.data['total_duration_s'])
+        self.assertEqual({'count': 2, 'duration_s': 50}, res.data['by_language']['en'])
+        self.assertEqual({'count': 2, 'duration_s': 40}, res.data['by_country']['FR'])
+        self.assertEqual({'count': 3, 'duration_s': 60}, res.data['by_day'][timezone.localdate().isoformat()])
+
+    def test_stats_follow_updates_and_soft_deletes(self):
+        voice = Voice(duration_s=0, language=None)
+        voice.save()
+
+        voice.duration_s = 40
+        voice.language = 'en'
+        voice.save(update_fields=['duration_s', 'language'])
+        deleted = Voice(duration_s=15)
+        deleted.save()
+        self.client.delete(path=f"/api/voices/{deleted.uuid}/")
+
+        res = self.client.get(path=f"/api/stats/", content_type='application/json')
+
+        self.assertEqual(1, res.data['total_count'])
+        self.assertEqual(40, res.data['total_duration_s'])
+        self.assertEqual({'en': {'count': 1, 'duration_s': 40}}, res.data['by_language'])
+
+    def test_stats_are_empty_without_voices(self):
+        res = self.client.get(path=f"/api/stats/", content_type='application/json')
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(0, res.data['total_count'])
+        self.assertEqual(0, res.data['total_duration_s'])
+
+    def test_reconcile_command_repairs_drift(self):
+        Voice(duration_s=30, language='en').save()
+        Voice(duration_s=12, language='en').save()
+        Voice.objects.update(duration_s=10)
+        VoiceRollup.objects.filter(dimension=VoiceRollup.Dimension.COUNTRY).delete()
+
+        out = StringIO()
+        call_command('reconcile_voice_stats', stdout=out)
+
+        self.assertIn("total[''].duration_s: -22", out.getvalue())
+        res = self.client.get(path=f"/api/stats/", content_type='application/json')
+        self.assertEqual(20, res.data['total_duration_s'])
+        self.assertEqual({'': {'count': 2, 'duration_s': 20}}, res.data['by_country'])
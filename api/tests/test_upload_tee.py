@@ -0,0 +1,111 @@
+import hashlib
+import io
+import json
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import requests
+import responses
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.test import override_settings
+
+from api.models import Voice
+from api.services.upload_tee import UploadTee
+from api.tests.fixtures import WHISPER_HI_THERE, LLM_ANALYSIS, mock_openai_client
+from api.tests.test_setup import TestSetUp
+
+from langomine.settings import OPEN_AI_WHISPERER_HOST
+
+AUDIO = Path(__file__).absolute().parent / "assets/hi-there.mp3"
+
+
+class BrokenSource(io.BytesIO):
+    def chunks(self, chunk_size):
+        yield b'first chunk'
+        raise IOError("client went away")
+
+
+@override_settings(VOICE_UPLOAD_TEE_CHUNK_BYTES=1024, VOICE_UPLOAD_TEE_MAX_CHUNKS=2)
+class TestUploadTee(TestSetUp):
+    def test_every_consumer_reads_the_whole_upload_once(self):
+        data = AUDIO.read_bytes()
+        source = File(io.BytesIO(data))
+
+        def slow(stream):
+            received = b''
+            while chunk := stream.read(300):
+                time.sleep(0.001)
+                received += chunk
+            return received
+
+        tee = UploadTee(source)
+        with patch.object(source, 'chunks', wraps=source.chunks) as chunks:
+            fast, slow_result = tee.run(lambda stream: stream.read(), slow)
+
+        self.assertEqual(data, fast)
+        self.assertEqual(data, slow_result)
+        self.assertEqual(hashlib.sha256(data).hexdigest(), tee.hexdigest)
+        self.assertEqual(len(data), tee.size)
+        chunks.assert_called_once_with(1024)
+
+    def test_failed_consumer_does_not_block_the_others(self):
+        def failing(stream):
+            raise ValueError("ASR down")
+
+        error, stored = UploadTee(File(open(AUDIO, 'rb'))).run(failing, lambda stream: len(stream.read()))
+
+        self.assertIsInstance(error, ValueError)
+        self.assertEqual(len(AUDIO.read_bytes()), stored)
+
+    def test_source_failure_aborts_consumers(self):
+        with self.assertRaises(IOError):
+            UploadTee(BrokenSource()).run(lambda stream: stream.read())
+
+
+@override_settings(VOICE_UPLOAD_STREAMING=True)
+class TestStreamingStore(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.asr_bodies = []
+        responses.start()
+        self.addCleanup(responses.stop)
+        self.addCleanup(responses.reset)
+
+        patcher = patch('api.services.llm_analyser.OpenAI')
+        patcher.start().return_value = mock_openai_client(LLM_ANALYSIS)
+        self.addCleanup(patcher.stop)
+
+    def asr(self, status=200):
+        def callback(request):
+            self.asr_bodies.append(b''.join(request.body))
+            return status, {}, '{}' if status != 200 else json.dumps(WHISPER_HI_THERE)
+
+        responses.add_callback(responses.POST, OPEN_AI_WHISPERER_HOST + '/asr', callback=callback)
+
+    def submit(self):
+        return self.client.post(path="/api/voices/", data={'file': File(open(AUDIO, mode="rb"))})
+
+    def test_upload_is_streamed_to_whisper_and_storage(self):
+        self.asr()
+
+        res = self.submit()
+
+        self.assertEqual(201, res.status_code)
+        voice = Voice.objects.get(pk=res.data['uuid'])
+        data = AUDIO.read_bytes()
+        self.assertEqual('analysed', voice.status)
+        self.assertEqual(hashlib.sha256(data).hexdigest(), voice.content_hash)
+        self.assertEqual(data, voice.file.read())
+        self.assertIn(b'name="audio_file"; filename="hi-there.mp3"', self.asr_bodies[0])
+        self.assertIn(data, self.asr_bodies[0])
+
+    def test_stored_audio_is_removed_when_asr_fails(self):
+        self.asr(status=500)
+
+        with self.assertRaises(requests.HTTPError):
+            self.submit()
+
+        self.assertFalse(Voice.all_objects.exists())
+        self.assertEqual([], default_storage.listdir('voices')[1])
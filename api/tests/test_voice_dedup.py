@@ -0,0 +1,128 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import responses
+from django.core.files import File
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Voice, VoiceStatus
+from api.services.voice_dedup import VoiceDedup
+from api.tests.fixtures import WHISPER_HI_THERE, LLM_ANALYSIS, mock_openai_client
+from api.tests.test_setup import TestSetUp
+
+from langomine.settings import OPEN_AI_WHISPERER_HOST
+
+
+class TestVoiceDedup(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        responses.start()
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE, status=200)
+        self.addCleanup(responses.stop)
+        self.addCleanup(responses.reset)
+
+        patcher = patch('api.services.llm_analyser.OpenAI')
+        self.mock_client = mock_openai_client(LLM_ANALYSIS)
+        patcher.start().return_value = self.mock_client
+        self.addCleanup(patcher.stop)
+
+    def submit(self, country='FR'):
+        return self.client.post(
+            path="/api/voices/",
+            data={'file': File(open(Path(__file__).absolute().parent / "assets/hi-there.mp3", mode="rb"))},
+            HTTP_CF_IPCOUNTRY=country,
+        )
+
+    def test_identical_upload_reuses_transcript_and_analysis(self):
+        first = self.submit()
+        second = self.submit()
+
+        self.assertEqual('miss', first['X-Voice-Dedup'])
+        self.assertEqual('hit', second['X-Voice-Dedup'])
+        self.assertEqual(201, second.status_code)
+        self.assertEqual(1, len(responses.calls))
+        self.mock_client.chat.completions.create.assert_called_once()
+
+        original, copy = Voice.objects.get(pk=first.data['uuid']), Voice.objects.get(pk=second.data['uuid'])
+        self.assertNotEqual(original.pk, copy.pk)
+        self.assertEqual(original.content_hash, copy.content_hash)
+        self.assertEqual(original.words, copy.words)
+        self.assertEqual(original.analysed, copy.analysed)
+        self.assertEqual(VoiceStatus.ANALYSED, copy.status)
+        self.assertTrue(bool(copy.file))
+
+    def test_different_model_is_a_miss(self):
+        self.submit(country='FR')
+        res = self.submit(country='US')
+
+        self.assertEqual('miss', res['X-Voice-Dedup'])
+        self.assertEqual(2, len(responses.calls))
+
+    def test_lookup_filters_on_the_model_in_sql(self):
+        self.submit(country='US')
+        self.submit(country='US')
+        uuid = self.submit(country='FR').data['uuid']
+        content_hash = Voice.objects.get(pk=uuid).content_hash
+
+        with CaptureQueriesContext(connection) as queries:
+            match = VoiceDedup().lookup(content_hash, 'FR')
+
+        self.assertEqual(uuid, str(match.pk))
+        self.assertEqual(1, len(queries))
+        self.assertIn('"model_used" =', queries[0]['sql'])
+        self.assertIn('"analysis_mode" =', queries[0]['sql'])
+        self.assertIn('LIMIT 1', queries[0]['sql'])
+
+    def test_different_analysis_mode_is_a_miss(self):
+        self.submit()
+        res = self.client.post(
+            path="/api/voices/",
+            data={'file': File(open(Path(__file__).absolute().parent / "assets/hi-there.mp3", mode="rb"))},
+            HTTP_CF_IPCOUNTRY='FR',
+            HTTP_PREFER='analysis=parallel',
+        )
+
+        self.assertEqual('miss', res['X-Voice-Dedup'])
+        self.assertEqual('parallel', Voice.objects.get(pk=res.data['uuid']).analysis_mode)
+        self.assertEqual('hit', self.submit()['X-Voice-Dedup'])
+
+    @override_settings(LLM_MIN_WORDS=3)
+    def test_short_answers_are_reused_across_models(self):
+        first = self.submit(country='FR')
+        second = self.submit(country='US')
+
+        self.assertEqual(Voice.LOCAL_MODEL, Voice.objects.get(pk=first.data['uuid']).model_used)
+        self.assertEqual('hit', second['X-Voice-Dedup'])
+        self.assertEqual(1, len(responses.calls))
+        self.mock_client.chat.completions.create.assert_not_called()
+
+    def test_schema_change_is_a_miss(self):
+        self.submit()
+        Voice.objects.update(analysis_version='outdated')
+
+        self.assertEqual('miss', self.submit()['X-Voice-Dedup'])
+
+    def test_deleted_voice_is_not_reused(self):
+        uuid = self.submit().data['uuid']
+        self.client.delete(path=f"/api/voices/{uuid}/")
+
+        self.assertEqual('miss', self.submit()['X-Voice-Dedup'])
+
+    @override_settings(VOICE_DEDUP_ENABLED=False)
+    def test_disabled_dedup_always_processes(self):
+        self.submit()
+        res = self.submit()
+
+        self.assertEqual('off', res['X-Voice-Dedup'])
+        self.assertEqual(2, len(responses.calls))
+
+    def test_stats_report_hit_ratio(self):
+        before = VoiceDedup.stats()
+        self.submit()
+        self.submit()
+        after = VoiceDedup.stats()
+
+        self.assertEqual(before['hits'] + 1, after['hits'])
+        self.assertEqual(before['misses'] + 1, after['misses'])
@@ -0,0 +1,122 @@
+import datetime
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import responses
+from django.core.files import File
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from api.models import Voice, VoiceStatus, ProcessingJob
+from api.services.job_queue import VoiceJobQueue
+from api.tests.fixtures import WHISPER_HI_THERE, LLM_ANALYSIS, mock_openai_client
+from api.tests.test_setup import TestSetUp
+
+from langomine.settings import OPEN_AI_WHISPERER_HOST
+
+
+@override_settings(VOICE_PROCESSING_MODE='async', VOICE_JOB_MAX_ATTEMPTS=2, VOICE_JOB_RETRY_DELAY_S=0)
+class TestVoiceJobs(TestSetUp):
+    def submit(self, **headers):
+        return self.client.post(
+            path="/api/voices/",
+            data={'file': File(open(Path(__file__).absolute().parent / "assets/hi-there.mp3", mode="rb"))},
+            **headers
+        )
+
+    @responses.activate
+    def test_async_submit_returns_202_without_calling_upstreams(self):
+        res = self.submit(HTTP_CF_IPCOUNTRY='FR')
+
+        self.assertEqual(202, res.status_code)
+        self.assertEqual('pending', res.data['status'])
+        self.assertEqual(0, len(responses.calls))
+
+        voice = Voice.objects.get(pk=res.data['uuid'])
+        self.assertEqual(VoiceStatus.PENDING, voice.status)
+        self.assertTrue(bool(voice.file))
+        self.assertEqual(1, ProcessingJob.objects.filter(voice=voice, status=ProcessingJob.Status.QUEUED).count())
+
+        res = self.client.get(path=f"/api/voices/{voice.uuid}/")
+        self.assertEqual(200, res.status_code)
+        self.assertEqual('pending', res.json()['status'])
+        self.assertIsNone(res.json()['analysed'])
+
+    @override_settings(VOICE_PROCESSING_MODE='sync')
+    @responses.activate
+    def test_prefer_header_switches_to_async(self):
+        res = self.submit(HTTP_PREFER='respond-async')
+
+        self.assertEqual(202, res.status_code)
+        self.assertEqual(0, len(responses.calls))
+
+    @responses.activate
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_worker_processes_queued_voice(self, mock_openai_class):
+        mock_openai_class.return_value = mock_openai_client(LLM_ANALYSIS)
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE, status=200)
+
+        uuid = self.submit(HTTP_CF_IPCOUNTRY='FR').data['uuid']
+        call_command('process_voice_jobs', once=True, stdout=StringIO())
+
+        voice = Voice.objects.get(pk=uuid)
+        self.assertEqual(VoiceStatus.ANALYSED, voice.status)
+        self.assertEqual(' Hi there!', voice.text)
+        self.assertEqual('gpt-4o', voice.analysed['model_used'])
+        self.assertEqual(ProcessingJob.Status.DONE, voice.jobs.get().status)
+
+        res = self.client.get(path=f"/api/voices/{uuid}/")
+        self.assertEqual('analysed', res.json()['status'])
+        self.assertEqual(6.5, res.json()['analysed']['overall_assessment']['band_score'])
+
+    @responses.activate
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_worker_resumes_transcribed_voice_without_asr(self, mock_openai_class):
+        mock_openai_class.return_value = mock_openai_client(LLM_ANALYSIS)
+
+        uuid = self.submit().data['uuid']
+        Voice.objects.filter(pk=uuid).update(
+            status=VoiceStatus.TRANSCRIBED,
+            text=WHISPER_HI_THERE['text'],
+            words=WHISPER_HI_THERE['segments'][0]['words'],
+        )
+        call_command('process_voice_jobs', once=True, stdout=StringIO())
+
+        self.assertEqual(0, len(responses.calls))
+        self.assertEqual(VoiceStatus.ANALYSED, Voice.objects.get(pk=uuid).status)
+
+    @responses.activate
+    def test_worker_marks_voice_failed_after_max_attempts(self):
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', status=500, body='boom')
+
+        uuid = self.submit().data['uuid']
+        call_command('process_voice_jobs', once=True, stdout=StringIO())
+
+        job = ProcessingJob.objects.get(voice_id=uuid)
+        self.assertEqual(ProcessingJob.Status.FAILED, job.status)
+        self.assertEqual(2, job.attempts)
+        self.assertIsNotNone(job.last_error)
+
+        res = self.client.get(path=f"/api/voices/{uuid}/")
+        self.assertEqual('failed', res.json()['status'])
+
+    @override_settings(VOICE_JOB_BUDGET_S=900, VOICE_JOB_LOCK_TIMEOUT_S=600)
+    def test_worker_refuses_locks_shorter_than_the_job_budget(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, 'VOICE_JOB_LOCK_TIMEOUT_S'):
+            call_command('process_voice_jobs', once=True, stdout=StringIO())
+
+    @override_settings(VOICE_JOB_BUDGET_S=900, VOICE_JOB_LOCK_TIMEOUT_S=960)
+    def test_job_still_within_its_budget_is_not_reclaimed(self):
+        uuid = self.submit().data['uuid']
+        job = ProcessingJob.objects.get(voice_id=uuid)
+        ProcessingJob.objects.filter(pk=job.pk).update(
+            status=ProcessingJob.Status.RUNNING, locked_at=timezone.now() - datetime.timedelta(seconds=700),
+        )
+
+        self.assertIsNone(VoiceJobQueue().claim())
+
+        ProcessingJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - datetime.timedelta(seconds=1000))
+        self.assertEqual(job.pk, VoiceJobQueue().claim().pk)
@@ -0,0 +1,73 @@
+import datetime
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import Voice
+from api.tests.fixtures import LLM_ANALYSIS
+from api.tests.test_setup import TestSetUp
+
+
+class TestVoiceListViews(TestSetUp):
+    def voice(self, created_at, language='en', country='FR', **kwargs):
+        voice = Voice(language=language, request_country=country, text='hi there', words=[{"word": "hi"}],
+                      analysed={**LLM_ANALYSIS, "model_used": "gpt-4o"}, **kwargs)
+        voice.save()
+        Voice.all_objects.filter(pk=voice.pk).update(created_at=created_at)
+        return voice
+
+    def test_pages_through_every_voice_newest_first(self):
+        now = timezone.now()
+        # Two voices share a timestamp so the uuid tie-breaker is exercised
+        voices = [self.voice(now - datetime.timedelta(minutes=minutes)) for minutes in [0, 1, 1, 2, 3]]
+        self.voice(now, deleted_at=now)
+
+        seen, url = [], "/api/voices/?page_size=2"
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(200, res.status_code)
+            self.assertLessEqual(len(res.data['results']), 2)
+            seen += [row['uuid'] for row in res.data['results']]
+            url = res.data['next']
+
+        expected = sorted(voices, key=lambda voice: (Voice.objects.get(pk=voice.pk).created_at, voice.uuid), reverse=True)
+        self.assertEqual([str(voice.uuid) for voice in expected], seen)
+
+    def test_heavy_fields_are_opt_in(self):
+        self.voice(timezone.now())
+
+        res = self.client.get("/api/voices/")
+        self.assertNotIn('words', res.data['results'][0])
+        self.assertNotIn('analysed', res.data['results'][0])
+
+        res = self.client.get("/api/voices/?include=words,analysed")
+        self.assertEqual([{"word": "hi"}], res.data['results'][0]['words'])
+        self.assertEqual(LLM_ANALYSIS['overall_assessment'], res.data['results'][0]['analysed']['overall_assessment'])
+
+    def test_heavy_columns_are_not_selected(self):
+        self.voice(timezone.now())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/voices/")
+
+        select = next(query['sql'] for query in queries if 'FROM "api_voice"' in query['sql'])
+        self.assertNotIn('"words"', select)
+        self.assertNotIn('"analysed"', select)
+
+    def test_filters(self):
+        now = timezone.now()
+        match = self.voice(now - datetime.timedelta(days=1), language='de', country='DE')
+        self.voice(now - datetime.timedelta(days=1), language='en', country='DE')
+        self.voice(now - datetime.timedelta(days=10), language='de', country='DE')
+
+        day = timezone.localdate(now - datetime.timedelta(days=1)).isoformat()
+        res = self.client.get(f"/api/voices/?language=de&country=DE&since={day}&until={day}")
+
+        self.assertEqual([str(match.uuid)], [row['uuid'] for row in res.data['results']])
+        self.assertIsNone(res.data['next'])
+
+    def test_invalid_cursor(self):
+        res = self.client.get("/api/voices/?cursor=not-a-cursor")
+
+        self.assertEqual(400, res.status_code)
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.db import connection
+
+from api.models import Voice, VoiceStatus
+from api.services.voice_response_cache import VoiceResponseCache
+from api.tests.fixtures import LLM_ANALYSIS
+from api.tests.test_setup import TestSetUp
+
+
+class TestVoiceResponseCache(TestSetUp):
+    def voice(self, status=VoiceStatus.ANALYSED):
+        voice = Voice(duration_s=30, text='hi there', status=status, analysed={**LLM_ANALYSIS, "model_used": "gpt-4o"})
+        voice.save()
+        return voice
+
+    def test_finished_voice_is_served_from_cache(self):
+        voice = self.voice()
+
+        first = self.client.get(f"/api/voices/{voice.uuid}/")
+        self.assertEqual('miss', first['X-Voice-Cache'])
+        self.assertEqual('private, no-cache', first['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            second = self.client.get(f"/api/voices/{voice.uuid}/")
+
+        self.assertEqual('hit', second['X-Voice-Cache'])
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(6.5, second.json()['analysed']['overall_assessment']['band_score'])
+
+    def test_matching_etag_returns_304(self):
+        voice = self.voice()
+        etag = self.client.get(f"/api/voices/{voice.uuid}/")['ETag']
+
+        res = self.client.get(f"/api/voices/{voice.uuid}/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, res.status_code)
+        self.assertEqual(b'', res.content)
+        self.assertEqual(etag, res['ETag'])
+
+        res = self.client.get(f"/api/voices/{voice.uuid}/", HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(200, res.status_code)
+
+    def test_expansions_are_cached_separately(self):
+        voice = self.voice()
+        self.client.get(f"/api/voices/{voice.uuid}/")
+
+        res = self.client.get(f"/api/voices/{voice.uuid}/?expand=words")
+
+        self.assertEqual('miss', res['X-Voice-Cache'])
+        self.assertIn('words', res.json())
+
+    def test_unfinished_voice_is_not_cached(self):
+        voice = self.voice(status=VoiceStatus.PENDING)
+
+        self.client.get(f"/api/voices/{voice.uuid}/")
+        res = self.client.get(f"/api/voices/{voice.uuid}/")
+
+        self.assertEqual('miss', res['X-Voice-Cache'])
+        self.assertEqual('no-cache', res['Cache-Control'])
+
+    def test_destroy_invalidates_cached_body(self):
+        voice = self.voice()
+        self.client.get(f"/api/voices/{voice.uuid}/")
+
+        self.assertEqual(204, self.client.delete(f"/api/voices/{voice.uuid}/").status_code)
+
+        self.assertEqual(404, self.client.get(f"/api/voices/{voice.uuid}/").status_code)
+
+    def test_missing_cache_table_falls_through_to_rendering(self):
+        voice = self.voice()
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE api_voice_response_cache')
+
+        with self.assertLogs('api.services.voice_response_cache', 'WARNING'):
+            res = self.client.get(f"/api/voices/{voice.uuid}/")
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual('miss', res['X-Voice-Cache'])
+        self.assertEqual(204, self.client.delete(f"/api/voices/{voice.uuid}/").status_code)
+
+    def test_lifetime_is_bounded_by_presigned_url_expiry(self):
+        storage = SimpleNamespace(querystring_auth=True, querystring_expire=3600)
+
+        with patch.object(Voice._meta.get_field('file'), 'storage', storage):
+            self.assertEqual(3600 - VoiceResponseCache.URL_EXPIRY_MARGIN_S, VoiceResponseCache.lifetime_s())
@@ -0,0 +1,129 @@
+from io import StringIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import responses
+from django.core.files import File
+from django.core.management import call_command
+from django.test import override_settings
+
+from api.models import Voice, VoiceTiming
+from api.tests.fixtures import WHISPER_HI_THERE, LLM_ANALYSIS, mock_openai_client
+from api.tests.test_setup import TestSetUp
+
+from langomine.settings import OPEN_AI_WHISPERER_HOST
+
+
+def openai_with_usage(prompt_tokens=900, completion_tokens=400):
+    client = mock_openai_client(LLM_ANALYSIS)
+    client.chat.completions.create.return_value.usage = MagicMock(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    return client
+
+
+@override_settings(LLM_ANALYSIS_CACHE_ENABLED=False)
+class TestVoiceTimings(TestSetUp):
+    def submit(self, **headers):
+        return self.client.post(
+            path="/api/voices/",
+            data={'file': File(open(Path(__file__).absolute().parent / "assets/hi-there.mp3", mode="rb"))},
+            **headers
+        )
+
+    @responses.activate
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_store_records_stage_times_and_tokens(self, mock_openai_class):
+        mock_openai_class.return_value = openai_with_usage()
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', status=503)
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE, status=200)
+
+        with override_settings(UPSTREAM_RESILIENCE={
+            'whisper': {'retries': 1, 'backoff_s': 0.01, 'backoff_cap_s': 0.01, 'hedge': False, 'hedge_after_s': 1,
+                        'hedge_min_samples': 20, 'breaker_failures': 5, 'breaker_reset_s': 30},
+            'openai': {'retries': 0, 'backoff_s': 0.01, 'backoff_cap_s': 0.01, 'hedge': False, 'hedge_after_s': 1,
+                       'hedge_min_samples': 20, 'breaker_failures': 5, 'breaker_reset_s': 30},
+        }):
+            res = self.submit(HTTP_CF_IPCOUNTRY='FR')
+
+        self.assertEqual(201, res.status_code)
+        timing = VoiceTiming.objects.get(voice_id=res.data['uuid'])
+        self.assertIsNotNone(timing.asr_s)
+        self.assertIsNotNone(timing.llm_s)
+        self.assertIsNotNone(timing.storage_s)
+        self.assertGreaterEqual(timing.total_s, timing.asr_s + timing.llm_s)
+        self.assertEqual((900, 400), (timing.prompt_tokens, timing.completion_tokens))
+        self.assertEqual(OPEN_AI_WHISPERER_HOST, timing.asr_host)
+        self.assertEqual(1, timing.retries)
+
+    @responses.activate
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_dedup_hit_has_no_upstream_times(self, mock_openai_class):
+        mock_openai_class.return_value = openai_with_usage()
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE, status=200)
+
+        self.submit()
+        res = self.submit()
+
+        self.assertEqual('hit', res['X-Voice-Dedup'])
+        timing = VoiceTiming.objects.get(voice_id=res.data['uuid'])
+        self.assertIsNone(timing.asr_s)
+        self.assertIsNone(timing.prompt_tokens)
+
+    @override_settings(VOICE_PROCESSING_MODE='async')
+    @responses.activate
+    @patch('api.services.llm_analyser.OpenAI')
+    def test_worker_records_job_timings(self, mock_openai_class):
+        mock_openai_class.return_value = openai_with_usage()
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE, status=200)
+
+        uuid = self.submit().data['uuid']
+        self.assertFalse(VoiceTiming.objects.filter(voice_id=uuid).exists())
+
+        call_command('process_voice_jobs', once=True, stdout=StringIO())
+
+        timing = VoiceTiming.objects.get(voice_id=uuid)
+        self.assertIsNotNone(timing.asr_s)
+        self.assertEqual(900, timing.prompt_tokens)
+
+
+class TestLatencyReport(TestSetUp):
+    def voice(self, duration_s, model, total_s, asr_s=None, llm_s=None, retries=0):
+        voice = Voice(duration_s=duration_s, language='en', analysed={**LLM_ANALYSIS, 'model_used': model})
+        voice.save()
+        VoiceTiming.objects.create(voice=voice, total_s=total_s, asr_s=asr_s, llm_s=llm_s, prompt_tokens=1000, retries=retries)
+
+    def setUp(self):
+        super().setUp()
+        for total_s in (4, 5, 6, 7):
+            self.voice(10, 'gpt-4o-mini', total_s, asr_s=total_s / 2, llm_s=total_s / 2)
+        self.voice(200, 'gpt-4o', 40, asr_s=30, llm_s=9, retries=2)
+        self.voice(200, 'gpt-4o', 1)
+        # Short answer placeholder, left out of the report
+        self.voice(10, Voice.LOCAL_MODEL, 2, asr_s=1)
+
+    def test_groups_by_duration_bucket(self):
+        res = self.client.get(path="/api/analytics/latency/")
+
+        self.assertEqual(200, res.status_code)
+        groups = {group['group']: group for group in res.data['groups']}
+        self.assertEqual(['0-15s', '120-300s'], list(groups))
+        self.assertEqual(4, groups['0-15s']['count'])
+        self.assertEqual({'p50': 5.0, 'p95': 7.0, 'p99': 7.0}, groups['0-15s']['total_s'])
+        self.assertIsNone(groups['0-15s']['storage_s'])
+        # The dedup-like row without upstream stages only counts towards total_s
+        self.assertEqual({'p50': 30.0, 'p95': 30.0, 'p99': 30.0}, groups['120-300s']['asr_s'])
+        self.assertEqual(1, groups['120-300s']['retried'])
+        self.assertEqual(1000.0, groups['120-300s']['prompt_tokens_mean'])
+
+    def test_groups_by_model(self):
+        res = self.client.get(path="/api/analytics/latency/", data={'group_by': 'model'})
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual({'gpt-4o': 2, 'gpt-4o-mini': 4}, {group['group']: group['count'] for group in res.data['groups']})
+
+    def test_command_prints_a_row_per_group(self):
+        out = StringIO()
+        call_command('voice_latency_report', group_by='model', stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertTrue(lines[2].startswith('gpt-4o-mini'))
@@ -0,0 +1,204 @@
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import boto3
+import responses
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from moto import mock_aws
+
+from api.models import ProcessingJob, Voice, VoiceStatus
+from api.tests.fixtures import WHISPER_HI_THERE, LLM_ANALYSIS, mock_openai_client
+from api.tests.test_setup import TestSetUp
+from api.services.direct_uploads import DirectUploads
+
+from langomine.settings import OPEN_AI_WHISPERER_HOST
+
+BUCKET = 'langomine-test'
+
+
+@override_settings(STORAGES={
+    "default": {
+        "BACKEND": "storages.backends.s3.S3Storage",
+        "OPTIONS": {
+            "bucket_name": BUCKET,
+            "access_key": "testing",
+            "secret_key": "testing",
+            "region_name": "us-east-1",
+        },
+    },
+})
+class TestVoiceUploads(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        aws = mock_aws()
+        aws.start()
+        self.addCleanup(aws.stop)
+        self.s3 = boto3.client('s3', region_name='us-east-1', aws_access_key_id='testing', aws_secret_access_key='testing')
+        self.s3.create_bucket(Bucket=BUCKET)
+
+        responses.start()
+        responses.add(method=responses.POST, url=OPEN_AI_WHISPERER_HOST + '/asr', json=WHISPER_HI_THERE, status=200)
+        self.addCleanup(responses.stop)
+        self.addCleanup(responses.reset)
+
+        patcher = patch('api.services.llm_analyser.OpenAI')
+        patcher.start().return_value = mock_openai_client(LLM_ANALYSIS)
+        self.addCleanup(patcher.stop)
+
+    def initiate(self):
+        res = self.client.post("/api/voices/uploads/", {'filename': 'hi-there.mp3'}, format='json', HTTP_CF_IPCOUNTRY='FR')
+        self.assertEqual(201, res.status_code)
+        return res.data
+
+    def upload(self, upload, audio=None):
+        # What the client does with the presigned POST, done through boto3 since moto intercepts botocore
+        audio = audio or (Path(__file__).absolute().parent / "assets/hi-there.mp3").read_bytes()
+        self.s3.put_object(Bucket=BUCKET, Key=upload['fields']['key'], Body=audio)
+
+    def complete(self, upload, **headers):
+        return self.client.post("/api/voices/uploads/complete/", {'token': upload['token']}, format='json', **headers)
+
+    def test_initiate_returns_presigned_post(self):
+        upload = self.initiate()
+
+        self.assertEqual('POST', upload['method'])
+        self.assertIn(BUCKET, upload['url'])
+        self.assertRegex(upload['fields']['key'], r'^voices/[0-9a-f-]{36}\.mp3$')
+        self.assertIn('policy', upload['fields'])
+        self.assertFalse(Voice.all_objects.exists())
+
+    def test_complete_processes_object_from_storage(self):
+        upload = self.initiate()
+        self.upload(upload)
+
+        res = self.client.post("/api/voices/uploads/complete/", {'token': upload['token']}, format='json')
+
+        self.assertEqual(201, res.status_code)
+        voice = Voice.objects.get(pk=upload['uuid'])
+        self.assertEqual(upload['fields']['key'], voice.file.name)
+        self.assertEqual('FR', voice.request_country)
+        self.assertEqual(VoiceStatus.ANALYSED, voice.status)
+        self.assertEqual(64, len(voice.content_hash))
+        self.assertEqual(1, len(responses.calls))
+        # The audio was read back from the bucket, never re-uploaded
+        self.assertEqual(1, self.s3.list_objects_v2(Bucket=BUCKET)['KeyCount'])
+
+    def test_complete_is_idempotent(self):
+        upload = self.initiate()
+        self.upload(upload)
+
+        self.client.post("/api/voices/uploads/complete/", {'token': upload['token']}, format='json')
+        res = self.client.post("/api/voices/uploads/complete/", {'token': upload['token']}, format='json')
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(1, len(responses.calls))
+
+    def test_complete_of_a_deleted_voice_is_gone(self):
+        upload = self.initiate()
+        self.upload(upload)
+        self.client.post("/api/voices/uploads/complete/", {'token': upload['token']}, format='json')
+        Voice.objects.filter(pk=upload['uuid']).update(deleted_at=timezone.now())
+
+        res = self.client.post("/api/voices/uploads/complete/", {'token': upload['token']}, format='json')
+
+        self.assertEqual(410, res.status_code)
+
+    def test_concurrent_complete_loses_the_claim_before_any_work(self):
+        upload = self.initiate()
+        self.upload(upload)
+        uploaded = DirectUploads.uploaded
+
+        def racing_uploaded(uploads, pending):
+            # The other request claims the upload between this one's existence check and its claim
+            Voice.objects.create(uuid=pending.uuid, request_country='FR', status=VoiceStatus.PENDING)
+            return uploaded(uploads, pending)
+
+        with patch.object(DirectUploads, 'uploaded', racing_uploaded):
+            res = self.complete(upload)
+
+        self.assertEqual(202, res.status_code)
+        self.assertEqual(upload['uuid'], str(res.data['uuid']))
+        self.assertEqual(0, len(responses.calls))
+        self.assertEqual(1, Voice.all_objects.count())
+
+    def test_failed_complete_releases_the_claim(self):
+        upload = self.initiate()
+        self.upload(upload, audio=b'definitely not audio' * 100)
+
+        self.assertEqual(400, self.complete(upload).status_code)
+        self.assertFalse(Voice.all_objects.exists())
+
+        self.upload(upload)
+        self.assertEqual(201, self.complete(upload).status_code)
+
+    @override_settings(VOICE_PROCESSING_MODE='async')
+    def test_async_complete_leaves_the_audio_to_the_worker(self):
+        upload = self.initiate()
+        self.upload(upload)
+
+        with patch('api.views.voice_uploads.hash_upload') as hash_upload, \
+                patch('api.views.voice_uploads.VoiceView.preflight') as preflight:
+            res = self.complete(upload)
+
+        self.assertEqual(202, res.status_code)
+        hash_upload.assert_not_called()
+        preflight.assert_not_called()
+        self.assertIsNone(Voice.objects.get(pk=upload['uuid']).content_hash)
+        self.assertEqual(202, self.complete(upload).status_code)
+
+        call_command('process_voice_jobs', once=True, stdout=StringIO())
+
+        voice = Voice.objects.get(pk=upload['uuid'])
+        self.assertEqual(VoiceStatus.ANALYSED, voice.status)
+        self.assertEqual(64, len(voice.content_hash))
+        self.assertEqual(1, len(responses.calls))
+
+    @override_settings(VOICE_PROCESSING_MODE='async')
+    def test_worker_dedups_direct_uploads(self):
+        first, second = self.initiate(), self.initiate()
+        self.upload(first), self.upload(second)
+
+        self.complete(first)
+        call_command('process_voice_jobs', once=True, stdout=StringIO())
+        self.complete(second)
+        call_command('process_voice_jobs', once=True, stdout=StringIO())
+
+        original, copy = Voice.objects.get(pk=first['uuid']), Voice.objects.get(pk=second['uuid'])
+        self.assertEqual(VoiceStatus.ANALYSED, copy.status)
+        self.assertEqual(original.content_hash, copy.content_hash)
+        self.assertEqual(original.analysed, copy.analysed)
+        self.assertEqual(1, len(responses.calls))
+
+    @override_settings(VOICE_PROCESSING_MODE='async')
+    def test_worker_fails_invalid_audio_without_retrying(self):
+        upload = self.initiate()
+        self.upload(upload, audio=b'definitely not audio' * 100)
+        self.complete(upload)
+
+        call_command('process_voice_jobs', once=True, stdout=StringIO())
+
+        self.assertEqual(VoiceStatus.FAILED, Voice.objects.get(pk=upload['uuid']).status)
+        self.assertEqual((ProcessingJob.Status.FAILED, 1), ProcessingJob.objects.values_list('status', 'attempts').get())
+        self.assertEqual(0, len(responses.calls))
+
+    def test_complete_requires_the_object(self):
+        upload = self.initiate()
+
+        res = self.client.post("/api/voices/uploads/complete/", {'token': upload['token']}, format='json')
+
+        self.assertEqual(400, res.status_code)
+
+    def test_complete_rejects_forged_tokens(self):
+        res = self.client.post("/api/voices/uploads/complete/", {'token': 'forged'}, format='json')
+
+        self.assertEqual(400, res.status_code)
+
+
+class TestVoiceUploadsWithoutS3(TestSetUp):
+    def test_initiate_needs_s3_storage(self):
+        res = self.client.post("/api/voices/uploads/", {'filename': 'hi-there.mp3'}, format='json')
+
+        self.assertEqual(501, res.status_code)
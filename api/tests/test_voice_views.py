@@ -4,6 +4,8 @@ from pathlib import Path
 import dateutil.parser
 from dateutil.parser import ParserError
 from django.core.files import File
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import responses
 from unittest.mock import patch, MagicMock
 
@@ -11,6 +13,7 @@ from api.models import Voice
 from api.tests.test_setup import TestSetUp
 from django.utils import timezone
 from api.services.llm_analyser import ModelType
+from api.tests.fixtures import LLM_ANALYSIS
 
 from langomine.settings import OPEN_AI_WHISPERER_HOST
 
@@ -19,18 +22,7 @@ class TestVoiceViews(TestSetUp):
     def setUp(self):
         super().setUp()
         self.mock_llm_response = {
-            "fluency_and_coherence": {
-                "band_score": 7.0,
-                "strengths": ["Good flow"],
-                "areas_for_improvement": ["Pausing"],
-                "detailed_feedback": "Good overall fluency"
-            },
-            "overall_assessment": {
-                "band_score": 6.5,
-                "key_strengths": ["strength1"],
-                "priority_improvements": ["improvement1"],
-                "summary": "Good overall performance"
-            },
+            **LLM_ANALYSIS,
             "model_used": "gpt-4o"  # Added this field to match actual response
         }
 
@@ -46,11 +38,11 @@ class TestVoiceViews(TestSetUp):
 
         self.assertEqual(200, res.status_code)
 
-        self.assertEqual(f"{voice.uuid}", res.data['uuid'])
-        self.assertEqual(30, res.data['duration_s'])
-        self.assertEqual(voice.text, res.data['text'])
-        self.assertEqual(voice.language, res.data['language'])
-        self.assertEqual(f"{res.data['created_at']}", res.data['created_at'])
+        self.assertEqual(f"{voice.uuid}", res.json()['uuid'])
+        self.assertEqual(30, res.json()['duration_s'])
+        self.assertEqual(voice.text, res.json()['text'])
+        self.assertEqual(voice.language, res.json()['language'])
+        self.assertEqual(f"{res.json()['created_at']}", res.json()['created_at'])
 
     def test_can_not_get_deleted_voice(self):
         voice = Voice(
@@ -65,6 +57,44 @@ class TestVoiceViews(TestSetUp):
 
         self.assertEqual(404, res.status_code)
 
+    def test_show_selects_fields_and_analysis_sections(self):
+        voice = Voice(duration_s=30, text='hi there', analysed=self.mock_llm_response)
+        voice.save()
+
+        res = self.client.get(f"/api/voices/{voice.uuid}/?fields=uuid,status,analysed.overall_assessment")
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual({'uuid', 'status', 'analysed'}, set(res.data))
+        self.assertEqual({'overall_assessment'}, set(res.data['analysed']))
+
+    def test_show_loads_only_requested_columns(self):
+        voice = Voice(duration_s=30, words=[{"word": "hi", "start": 0.0, "end": 0.3}], analysed=self.mock_llm_response)
+        voice.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(f"/api/voices/{voice.uuid}/?fields=uuid,text")
+
+        self.assertEqual({'uuid', 'text'}, set(res.data))
+        self.assertEqual(1, len(queries))
+        self.assertNotIn('"analysed"', queries[0]['sql'])
+        self.assertNotIn('"words"', queries[0]['sql'])
+
+    def test_show_expands_words(self):
+        words = [{"word": " hi", "start": 0.0, "end": 0.3, "probability": 0.5}]
+        voice = Voice(duration_s=30, words=words)
+        voice.save()
+
+        self.assertNotIn('words', self.client.get(f"/api/voices/{voice.uuid}/").json())
+        self.assertEqual(words, self.client.get(f"/api/voices/{voice.uuid}/?expand=words").json()['words'])
+
+    def test_show_rejects_unknown_fields(self):
+        voice = Voice(duration_s=30)
+        voice.save()
+
+        res = self.client.get(f"/api/voices/{voice.uuid}/?fields=uuid,secret")
+
+        self.assertEqual(400, res.status_code)
+
     @responses.activate
     @patch('api.services.llm_analyser.OpenAI')
     def test_can_submit_voice_with_country_and_analysis(self, mock_openai_class):
@@ -117,7 +147,7 @@ class TestVoiceViews(TestSetUp):
 
         self.assertEqual(204, res.status_code)
 
-        voice = Voice.objects.first()
+        voice = Voice.all_objects.first()
 
         self.assertFalse(bool(voice.file))
         self.assertIsNotNone(voice.deleted_at)
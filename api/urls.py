@@ -1,7 +1,10 @@
 from django.urls import path, re_path
 from drf_yasg import openapi
 
+from .views import async_voices
+from .views.analytics import AnalyticsView
 from .views.questions import QuestionView
+from .views.voice_uploads import VoiceUploadView
 from .views.voices import VoiceView
 from .views.stats import StatView
 
@@ -15,19 +18,56 @@ urlpatterns = [
         'get': 'show'
     })),
 
+    path('stats/cache/', StatView.as_view({
+        'get': 'cache'
+    })),
+
+    path('stats/asr/', StatView.as_view({
+        'get': 'asr'
+    })),
+
+    path('stats/upstreams/', StatView.as_view({
+        'get': 'upstreams'
+    })),
+
+    path('metrics/', StatView.as_view({
+        'get': 'metrics'
+    })),
+
+    path('analytics/band-scores/', AnalyticsView.as_view({
+        'get': 'band_scores'
+    })),
+
+    path('analytics/latency/', AnalyticsView.as_view({
+        'get': 'latency'
+    })),
+
     path('questions/', QuestionView.as_view({
         'get': 'index'
     })),
 
     path('voices/', VoiceView.as_view({
+        'get': 'index',
         'post': 'store'
     })),
 
+    path('voices/uploads/', VoiceUploadView.as_view({
+        'post': 'initiate'
+    })),
+
+    path('voices/uploads/complete/', VoiceUploadView.as_view({
+        'post': 'complete'
+    })),
+
     path('voices/<uuid:uuid>/', VoiceView.as_view({
         'get': 'show',
         'delete': 'destroy',
     })),
 
+    # Native async variants for ASGI deployments
+    path('async/voices/', async_voices.store),
+    path('async/voices/<uuid:uuid>/', async_voices.show),
+
     # path('voices', VoiceView.store, name='voices.store'),
     # path('voices/<str:pk>', VoiceView.show, name='voices.store'),
     # path('voices/<str:pk>', delete, name='voices.delete'),
@@ -0,0 +1,51 @@
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from api.serializer import BandScoreQuerySerializer, BandScoreAnalyticsSerializer, LatencyQuerySerializer, \
+    LatencyReportSerializer
+from api.services.band_analytics import BandScoreAnalytics
+from api.services.latency_report import LatencyReport
+
+
+class AnalyticsView(ViewSet):
+    serializer_class = BandScoreAnalyticsSerializer
+
+    @extend_schema(
+        tags=['Analytics'],
+        parameters=[BandScoreQuerySerializer],
+        responses={200: BandScoreAnalyticsSerializer},
+    )
+    @action(methods=['get'], detail=False)
+    def band_scores(self, request):
+        query = BandScoreQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        analytics = BandScoreAnalyticsSerializer(data={
+            **query.validated_data,
+            "groups": BandScoreAnalytics(**query.validated_data).compute(),
+        })
+        analytics.is_valid(raise_exception=True)
+
+        return Response(analytics.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        tags=['Analytics'],
+        parameters=[LatencyQuerySerializer],
+        responses={200: LatencyReportSerializer},
+    )
+    @action(methods=['get'], detail=False)
+    def latency(self, request):
+        """Processing time percentiles per recording length, model or language, from the stored timings."""
+        query = LatencyQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        report = LatencyReportSerializer(data={
+            "group_by": query.validated_data['group_by'],
+            "groups": LatencyReport(**query.validated_data).compute(),
+        })
+        report.is_valid(raise_exception=True)
+
+        return Response(report.data, status=status.HTTP_200_OK)
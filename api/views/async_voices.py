@@ -0,0 +1,136 @@
+import asyncio
+import io
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import APIException
+
+from api.models import Voice, VoiceStatus, VoiceTiming
+from api.serializer import ProcessedVoiceSerializer, VoiceQuerySerializer, VoiceStatusSerializer
+from api.services import timings
+from api.services.audio_probe import AudioProbe, InvalidAudio
+from api.services.job_queue import VoiceJobQueue
+from api.services.voice_dedup import VoiceDedup, hash_upload
+from api.services.voice_processor import VoiceProcessor
+from api.views.voices import VoiceView
+
+# Native async counterparts of VoiceView.store/show for ASGI servers (uvicorn, daphne).
+# DRF views are sync-only, so these are plain Django async views with the same payloads.
+
+
+def _reopen(upload):
+    """Independent handle on the upload so ASR and storage can read it concurrently."""
+    if hasattr(upload, 'temporary_file_path'):
+        return open(upload.temporary_file_path(), 'rb')
+
+    upload.seek(0)
+    return io.BytesIO(upload.read())
+
+
+def _store(voice, upload):
+    with timings.stage('storage'):
+        voice.file.save(upload.name, upload, save=False)
+
+
+async def _record_timing(voice):
+    scope = timings.current()
+    if scope is not None:
+        await sync_to_async(VoiceTiming.record)(voice, scope)
+
+
+def _enqueue(voice, analysis_mode):
+    with transaction.atomic():
+        voice.save()
+        VoiceJobQueue().enqueue(voice, analysis_mode=analysis_mode)
+
+
+@csrf_exempt
+@require_POST
+async def store(request):
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'file': ['No file was submitted.']}, status=400)
+
+    country = request.headers.get('CF-IPCountry', '')
+    processor = VoiceProcessor(country_code=country, analysis_mode=VoiceView.analysis_mode(request))
+    dedup = VoiceDedup()
+
+    try:
+        info = await sync_to_async(AudioProbe().check, thread_sensitive=False)(upload)
+    except InvalidAudio as exc:
+        return JsonResponse({'file': [f'{exc}.']}, status=400)
+
+    voice = Voice(
+        request_country=country,
+        content_hash=await sync_to_async(hash_upload, thread_sensitive=False)(upload),
+        duration_s=round(info.duration_s) if info.duration_s is not None else 0,
+        status=VoiceStatus.PENDING,
+    )
+
+    duplicate = await sync_to_async(dedup.lookup)(voice.content_hash, country, processor.analysis_mode)
+    dedup_outcome = dedup.outcome(duplicate)
+
+    if duplicate is not None:
+        voice.file = upload
+        dedup.copy_into(duplicate, voice)
+        await voice.asave()
+        await _record_timing(voice)
+        response = JsonResponse(ProcessedVoiceSerializer(voice).data, status=201)
+        response['X-Voice-Dedup'] = dedup_outcome
+        return response
+
+    if VoiceView.wants_async(request):
+        voice.file = upload
+        await sync_to_async(_enqueue)(voice, processor.analysis_mode)
+        response = JsonResponse(VoiceStatusSerializer(voice).data, status=202)
+        response['X-Voice-Dedup'] = dedup_outcome
+        return response
+
+    asr_audio = await sync_to_async(_reopen, thread_sensitive=False)(upload)
+    try:
+        whisper, stored = await asyncio.gather(
+            processor.atranscribe(asr_audio, upload.name, info.duration_s),
+            sync_to_async(_store, thread_sensitive=False)(voice, upload),
+            return_exceptions=True,
+        )
+    finally:
+        asr_audio.close()
+
+    if isinstance(whisper, BaseException):
+        if not isinstance(stored, BaseException):
+            await sync_to_async(voice.file.delete, thread_sensitive=False)(save=False)
+        if isinstance(whisper, APIException):
+            return JsonResponse({'detail': str(whisper.detail)}, status=whisper.status_code)
+        raise whisper
+    if isinstance(stored, BaseException):
+        raise stored
+
+    processor.apply_transcript(voice, whisper)
+    processor.apply_analysis(voice, await processor.aanalyse(processor.transcript(whisper)))
+    await voice.asave()
+    await _record_timing(voice)
+
+    response = JsonResponse(ProcessedVoiceSerializer(voice).data, status=201)
+    response['X-Voice-Dedup'] = dedup_outcome
+    return response
+
+
+@require_GET
+async def show(request, uuid):
+    query = VoiceQuerySerializer(data=request.GET)
+    if not query.is_valid():
+        return JsonResponse(query.errors, status=400)
+    fields, expand = query.validated_data['fields'], query.validated_data['expand']
+
+    try:
+        if not fields:
+            return await sync_to_async(VoiceView.cached_show)(request, uuid, expand)
+
+        voice = await Voice.objects.only(*ProcessedVoiceSerializer.columns(fields, expand)).aget(pk=uuid)
+    except Voice.DoesNotExist:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    return JsonResponse(ProcessedVoiceSerializer(voice, fields=fields, expand=expand).data)
@@ -1,9 +1,11 @@
 import datetime
 
 import requests
+from django.conf import settings
 from django.db.models import Sum
-from django.http import Http404
-from drf_spectacular.utils import extend_schema
+from django.http import Http404, HttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.decorators import api_view
@@ -14,21 +16,93 @@ from rest_framework import status, views
 from rest_framework.viewsets import ViewSet
 
 from langomine.settings import OPEN_AI_WHISPERER_HOST
-from api.models import Voice
-from api.serializer import MainStatsSerializer
+from api.models import Voice, VoiceRollup
+from api.serializer import MainStatsSerializer, CacheStatsSerializer, AsrPoolStatsSerializer, \
+    UpstreamStatsSerializer
+from api.services import timings
+from api.services.analysis_cache import AnalysisCache
+from api.services.asr_pool import AsrPool
+from api.services.metrics import MetricsRegistry, registry
+from api.services.resilience import ResilientCaller
+from api.services.audio_normalizer import AudioNormalizer
+from api.services.voice_dedup import VoiceDedup
 from rest_framework.decorators import action
 from django.utils import timezone
 
 class StatView(ViewSet):
     serializer_class = MainStatsSerializer
 
-    @extend_schema(tags=['Stats'])
+    @extend_schema(
+        tags=['Stats'],
+        parameters=[
+            OpenApiParameter(name='days', type=int, required=False, description='Days of per-day breakdown (default 30)'),
+        ],
+    )
     @action(methods=['get'], detail=True)
     def show(self, request):
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            raise ValidationError({'days': ['A valid integer is required.']})
+        since = (timezone.localdate() - datetime.timedelta(days=max(days - 1, 0))).isoformat()
+
+        rollups = VoiceRollup.objects.filter(count__gt=0).exclude(dimension=VoiceRollup.Dimension.DAY, key__lt=since)
+        buckets = {dimension: {} for dimension in VoiceRollup.Dimension.values}
+        with timings.stage('aggregate'):
+            for rollup in rollups:
+                buckets[rollup.dimension][rollup.key] = {"count": rollup.count, "duration_s": rollup.duration_s}
+
+        total = buckets[VoiceRollup.Dimension.TOTAL].get('', {"count": 0, "duration_s": 0})
         stat = MainStatsSerializer(data={
-            "total_duration_s": Voice.objects.filter(deleted_at__isnull=True).aggregate(Sum('duration_s'))['duration_s__sum'],
+            "total_count": total["count"],
+            "total_duration_s": total["duration_s"],
+            "by_language": buckets[VoiceRollup.Dimension.LANGUAGE],
+            "by_country": buckets[VoiceRollup.Dimension.COUNTRY],
+            "by_day": buckets[VoiceRollup.Dimension.DAY],
         })
 
+        with timings.stage('serialize'):
+            stat.is_valid(raise_exception=True)
+
+        return Response(stat.data, status=status.HTTP_200_OK)
+
+    @extend_schema(tags=['Stats'], responses={200: CacheStatsSerializer})
+    @action(methods=['get'], detail=True)
+    def cache(self, request):
+        stat = CacheStatsSerializer(data={
+            "analysis_cache": AnalysisCache.stats(),
+            "voice_dedup": VoiceDedup.stats(),
+            "asr_normalization": AudioNormalizer.stats(),
+        })
+
+        stat.is_valid(raise_exception=True)
+
+        return Response(stat.data, status=status.HTTP_200_OK)
+
+    @extend_schema(tags=['Stats'], responses={200: AsrPoolStatsSerializer})
+    @action(methods=['get'], detail=True)
+    def asr(self, request):
+        """Per-process ASR pool load; a queue_depth that stays above zero means it is time to add hosts."""
+        stat = AsrPoolStatsSerializer(data=AsrPool.instance().stats())
+
         stat.is_valid(raise_exception=True)
 
         return Response(stat.data, status=status.HTTP_200_OK)
+
+    @extend_schema(tags=['Stats'], responses={200: UpstreamStatsSerializer(many=True)})
+    @action(methods=['get'], detail=True)
+    def upstreams(self, request):
+        """Circuit state, retries and hedges per upstream in this process."""
+        stat = UpstreamStatsSerializer(data=[
+            ResilientCaller.for_upstream(name).stats() for name in settings.UPSTREAM_RESILIENCE
+        ], many=True)
+
+        stat.is_valid(raise_exception=True)
+
+        return Response(stat.data, status=status.HTTP_200_OK)
+
+    @extend_schema(tags=['Stats'], responses={(200, 'text/plain'): OpenApiTypes.STR})
+    @action(methods=['get'], detail=True)
+    def metrics(self, request):
+        """Request and per-stage latency histograms and OpenAI token counters in the Prometheus text format."""
+        return HttpResponse(registry.render(), content_type=MetricsRegistry.CONTENT_TYPE)
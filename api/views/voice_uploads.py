@@ -0,0 +1,126 @@
+from django.core import signing
+from django.db import IntegrityError, transaction
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from api.models import Voice, VoiceStatus
+from api.serializer import DirectUploadRequestSerializer, DirectUploadSerializer, DirectUploadCompleteSerializer, \
+    ProcessedVoiceSerializer, VoiceStatusSerializer
+from api.services.direct_uploads import DirectUploads
+from api.services.job_queue import VoiceJobQueue
+from api.services.voice_dedup import hash_upload
+from api.views.voices import VoiceView
+
+
+class DirectUploadsUnavailable(APIException):
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = 'Direct uploads need S3 storage.'
+
+
+class UploadedVoiceDeleted(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'The voice for this upload was deleted.'
+
+
+class VoiceUploadView(ViewSet):
+    """Audio goes client -> S3 directly; the API signs the upload, and whoever processes it reads the object back."""
+
+    @extend_schema(
+        tags=['Voice'],
+        request=DirectUploadRequestSerializer,
+        responses={
+            201: DirectUploadSerializer,
+            501: OpenApiResponse(description='Storage does not support direct uploads'),
+        },
+    )
+    @action(methods=['post'], detail=False)
+    def initiate(self, request):
+        uploads = self.uploads()
+        payload = DirectUploadRequestSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+
+        upload = uploads.initiate(payload.validated_data['filename'], request.headers.get('CF-IPCountry', ''))
+
+        return Response(DirectUploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        tags=['Voice'],
+        request=DirectUploadCompleteSerializer,
+        responses={
+            200: ProcessedVoiceSerializer,
+            201: ProcessedVoiceSerializer,
+            202: VoiceStatusSerializer,
+            410: OpenApiResponse(description='The voice for this upload was deleted'),
+            501: OpenApiResponse(description='Storage does not support direct uploads'),
+        },
+    )
+    @action(methods=['post'], detail=False)
+    def complete(self, request):
+        uploads = self.uploads()
+        payload = DirectUploadCompleteSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+
+        try:
+            upload = uploads.resolve(payload.validated_data['token'])
+        except signing.BadSignature:
+            raise ValidationError({'token': ['Invalid or expired upload token.']})
+
+        existing = Voice.all_objects.filter(pk=upload.uuid).first()
+        if existing is not None:
+            return self.completed(existing)
+
+        if not uploads.uploaded(upload):
+            raise ValidationError({'token': ['Nothing was uploaded for this token yet.']})
+
+        voice = Voice(uuid=upload.uuid, request_country=upload.country, status=VoiceStatus.PENDING)
+        voice.file.name = upload.key
+        asynchronous = VoiceView.wants_async(request)
+
+        # Claim the upload before any work: of concurrent completes, only the one that inserts the voice goes on
+        try:
+            with transaction.atomic():
+                voice.save(force_insert=True)
+                if asynchronous:
+                    # The worker probes, hashes and dedups the object, so this process never reads the audio
+                    VoiceJobQueue().enqueue(voice, analysis_mode=VoiceView.analysis_mode(request))
+        except IntegrityError:
+            return self.completed(Voice.all_objects.get(pk=upload.uuid))
+
+        if asynchronous:
+            return Response(VoiceStatusSerializer(voice).data, status=status.HTTP_202_ACCEPTED)
+
+        try:
+            with voice.file.open('rb') as audio:
+                try:
+                    VoiceView.preflight(voice, audio)
+                except ValidationError:
+                    # The token stays valid, so a corrected file can be uploaded under the same key
+                    voice.file.delete(save=False)
+                    raise
+
+                voice.content_hash = hash_upload(audio)
+                return VoiceView.submit(request, voice, audio)
+        except BaseException:
+            # Release the claim so the upload can be completed again
+            voice.delete()
+            raise
+
+    @staticmethod
+    def completed(voice: Voice) -> Response:
+        """Answer for an upload that was already completed, possibly still being processed."""
+        if voice.deleted_at is not None:
+            raise UploadedVoiceDeleted()
+        if voice.status not in (VoiceStatus.ANALYSED, VoiceStatus.FAILED):
+            return Response(VoiceStatusSerializer(voice).data, status=status.HTTP_202_ACCEPTED)
+        return Response(ProcessedVoiceSerializer(voice).data, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def uploads() -> DirectUploads:
+        uploads = DirectUploads()
+        if not uploads.supported():
+            raise DirectUploadsUnavailable()
+        return uploads
@@ -1,8 +1,11 @@
-import datetime
+from typing import Optional
 
 import requests
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
 from django.http import Http404
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.decorators import api_view
@@ -12,72 +15,265 @@ from rest_framework.response import Response
 from rest_framework import status, views
 from rest_framework.viewsets import ViewSet
 
+from api.services import date_bounds, timings
+from api.services.audio_probe import AudioInfo, AudioProbe, InvalidAudio
+from api.services.job_queue import VoiceJobQueue
 from api.services.llm_analyser import LlmAnalyser
+from api.services.upload_tee import UploadTee
+from api.services.voice_dedup import VoiceDedup, hash_upload
+from api.services.voice_processor import VoiceProcessor
+from api.services.voice_response_cache import VoiceResponseCache
 from langomine.settings import OPEN_AI_WHISPERER_HOST
-from api.models import Voice
-from api.serializer import VoiceSerializer, VoiceUploadSerializer, ProcessedVoiceSerializer
+from api.models import Voice, VoiceStatus, VoiceTiming
+from api.pagination import KeysetPagination
+from api.serializer import VoiceSerializer, VoiceUploadSerializer, ProcessedVoiceSerializer, \
+    VoiceStatusSerializer, VoiceSummarySerializer, VoiceListQuerySerializer, VoiceQuerySerializer
 from rest_framework.decorators import action
 from django.utils import timezone
 
 class VoiceView(ViewSet):
     parser_classes = [MultiPartParser, FormParser, FileUploadParser]
+    pagination_class = KeysetPagination
 
     @extend_schema(
         tags=['Voice'],
+        parameters=[VoiceListQuerySerializer],
+        responses={200: VoiceSummarySerializer(many=True)}
+    )
+    @action(methods=['get'], detail=False)
+    def index(self, request):
+        query = VoiceListQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        filters = query.validated_data
+        include = filters.get('include', set())
+
+        voices = Voice.objects.defer(*(set(Voice.HEAVY_FIELDS) - include))
+
+        if 'language' in filters:
+            voices = voices.filter(language=filters['language'])
+        if 'country' in filters:
+            voices = voices.filter(request_country=filters['country'])
+        since, until = date_bounds.day_range(filters.get('since'), filters.get('until'))
+        if since is not None:
+            voices = voices.filter(created_at__gte=since)
+        if until is not None:
+            voices = voices.filter(created_at__lt=until)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(voices, request, view=self)
+
+        return paginator.get_paginated_response(VoiceSummarySerializer(page, many=True, include=include).data)
+
+    @extend_schema(
+        tags=['Voice'],
+        parameters=[
+            VoiceQuerySerializer,
+            OpenApiParameter(
+                name='If-None-Match',
+                location=OpenApiParameter.HEADER,
+                required=False,
+                description='ETag of a cached copy; answered with 304 when it is still current',
+            ),
+        ],
         responses={
             200: ProcessedVoiceSerializer,
+            304: OpenApiResponse(description='Not modified'),
             404: OpenApiResponse(description='Not found')
         }
     )
     @action(methods=['get'], detail=True)
     def show(self, request, uuid):
+        query = VoiceQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        fields, expand = query.validated_data['fields'], query.validated_data['expand']
+
         try:
-            voice = Voice.objects.filter(deleted_at__isnull=True).get(pk=uuid)
-            serializer = ProcessedVoiceSerializer(voice)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            if not fields and request.accepted_renderer.format == 'json':
+                return self.cached_show(request, uuid, expand)
+
+            with timings.stage('db'):
+                voice = Voice.objects.only(*ProcessedVoiceSerializer.columns(fields, expand)).get(pk=uuid)
+            with timings.stage('serialize'):
+                data = ProcessedVoiceSerializer(voice, fields=fields, expand=expand).data
+            return Response(data, status=status.HTTP_200_OK)
         except Voice.DoesNotExist:
             raise Http404
 
+    @staticmethod
+    def cached_show(request, uuid, expand):
+        """Full payloads are served as cached bytes with an ETag; see VoiceResponseCache."""
+        cache = VoiceResponseCache()
+        with timings.stage('cache'):
+            entry = cache.get(uuid, expand)
+        outcome = 'hit'
+
+        if entry is None:
+            with timings.stage('db'):
+                voice = Voice.objects.only(*ProcessedVoiceSerializer.columns(expand=expand)).get(pk=uuid)
+            with timings.stage('serialize'):
+                entry = cache.render(voice, expand)
+            outcome = 'miss'
+
+        return cache.respond(entry, request.headers.get('If-None-Match'), outcome)
+
     @extend_schema(
         request=VoiceUploadSerializer,
         tags=['Voice'],
-        responses={200: ProcessedVoiceSerializer}
+        parameters=[
+            OpenApiParameter(
+                name='Prefer',
+                location=OpenApiParameter.HEADER,
+                required=False,
+                description='Send `respond-async` to queue processing and get 202 right away, and '
+                            '`analysis=parallel` (or `analysis=single`) to pick how the LLM analysis is requested',
+            ),
+        ],
+        responses={
+            201: ProcessedVoiceSerializer,
+            202: VoiceStatusSerializer,
+        }
     )
     @action(methods=['post'], detail=True)
     def store(self, request, format=None):
-        whisper = requests.post(
-            url=OPEN_AI_WHISPERER_HOST + '/asr',
-            params={
-                "encode": "true",
-                "task": "transcribe",
-                "word_timestamps": "true",
-                "output": "json"
-            },
-            files={
-                "audio_file": request.FILES['file']
-            },
-        ).json()
-
-        country = request.headers.get('CF-IPCountry', '')
-
-        analyser = LlmAnalyser(
-            voice_content=whisper['segments'][0],
-            country_code=country
+        # DRF parses the multipart body lazily, on first access
+        with timings.stage('parse'):
+            upload = request.FILES['file']
+        voice = Voice(request_country=request.headers.get('CF-IPCountry', ''), status=VoiceStatus.PENDING)
+        timings.label(
+            model=LlmAnalyser.model_for_country(voice.request_country).value,
+            country_tier=LlmAnalyser.country_tier(voice.request_country),
         )
+        with timings.stage('probe'):
+            self.preflight(voice, upload)
 
-        analysed = analyser.analyze()
+        # Long recordings need the seekable upload for chunked ASR, so they are never streamed
+        if settings.VOICE_UPLOAD_STREAMING and not self.wants_async(request) and not self.is_long(voice):
+            return self.store_streaming(request, voice, upload)
 
-        voice = Voice(
-            duration_s=(datetime.timedelta(seconds=whisper['segments'][0]['end']) - datetime.timedelta(seconds=whisper['segments'][0]['start'])).seconds,
-            file=request.FILES['file'],
-            language=whisper['language'],
-            text=whisper['text'],
-            words=whisper['segments'][0]['words'],
-            request_country=country,
-            analysed=analysed
-        )
-        voice.save()
-        return Response(ProcessedVoiceSerializer(voice).data, status=status.HTTP_201_CREATED)
+        voice.file = upload
+        with timings.stage('hash'):
+            voice.content_hash = hash_upload(upload)
+
+        return self.submit(request, voice, upload)
+
+    @staticmethod
+    def preflight(voice: Voice, audio) -> AudioInfo:
+        """Rejects unreadable or too long audio before any upstream call and fills `duration_s`."""
+        try:
+            info = AudioProbe().check(audio)
+        except InvalidAudio as exc:
+            raise ValidationError({'file': [f'{exc}.']})
+
+        if info.duration_s is not None:
+            voice.duration_s = round(info.duration_s)
+
+        return info
+
+    @staticmethod
+    def is_long(voice: Voice) -> bool:
+        return voice.duration_s > settings.ASR_CHUNK_THRESHOLD_S
+
+    @classmethod
+    def submit(cls, request, voice: Voice, audio) -> Response:
+        """Dedups, queues or processes a new voice whose audio is readable from `audio`."""
+        processor = VoiceProcessor(country_code=voice.request_country, analysis_mode=cls.analysis_mode(request))
+        dedup = VoiceDedup()
+
+        with timings.stage('dedup'):
+            duplicate = dedup.lookup(voice.content_hash, voice.request_country, processor.analysis_mode)
+        dedup_outcome = dedup.outcome(duplicate)
+
+        if duplicate is not None:
+            dedup.copy_into(duplicate, voice)
+            return cls.created(voice, dedup_outcome)
+
+        if cls.wants_async(request):
+            with timings.stage('save'), transaction.atomic():
+                voice.save()
+                VoiceJobQueue().enqueue(voice, analysis_mode=processor.analysis_mode)
+
+            response = Response(VoiceStatusSerializer(voice).data, status=status.HTTP_202_ACCEPTED)
+            response['X-Voice-Dedup'] = dedup_outcome
+            return response
+
+        whisper = processor.transcribe(audio, duration_s=voice.duration_s or None)
+        processor.apply_transcript(voice, whisper)
+        processor.apply_analysis(voice, processor.analyse(processor.transcript(whisper)))
+        return cls.created(voice, dedup_outcome)
+
+    @staticmethod
+    def created(voice: Voice, dedup_outcome: str) -> Response:
+        """Saves a processed voice and its timings and answers 201 with it."""
+        # FileField would write a new upload during save(); doing it first keeps storage out of the save stage
+        if voice.file and not voice.file._committed:
+            with timings.stage('storage'):
+                voice.file.save(voice.file.name, voice.file.file, save=False)
+        with timings.stage('save'):
+            voice.save()
+            if (scope := timings.current()) is not None:
+                VoiceTiming.record(voice, scope)
+        with timings.stage('serialize'):
+            data = ProcessedVoiceSerializer(voice).data
+
+        response = Response(data, status=status.HTTP_201_CREATED)
+        response['X-Voice-Dedup'] = dedup_outcome
+        return response
+
+    @staticmethod
+    def store_streaming(request, voice: Voice, upload) -> Response:
+        """Reads the upload once, streaming it to Whisper and to storage at the same time.
+
+        The hash is only known once the stream ends, so a dedup hit can save the LLM
+        call but not the transcription. Recordings are transcribed whole, without chunking.
+        """
+        processor = VoiceProcessor(country_code=voice.request_country, analysis_mode=VoiceView.analysis_mode(request))
+        dedup = VoiceDedup()
+        name = voice.file.field.generate_filename(voice, upload.name)
+        tee = UploadTee(upload)
+
+        def store(stream):
+            with timings.stage('storage'):
+                return voice.file.storage.save(name, File(stream, name=upload.name))
+
+        # ASR and storage overlap, so their Server-Timing entries do too
+        whisper, stored = tee.run(lambda stream: processor.transcribe_stream(stream, upload.name), store)
+
+        if isinstance(whisper, BaseException):
+            if not isinstance(stored, BaseException):
+                voice.file.storage.delete(stored)
+            raise whisper
+        if isinstance(stored, BaseException):
+            raise stored
+
+        voice.file = stored
+        voice.content_hash = tee.hexdigest
+        with timings.stage('dedup'):
+            duplicate = dedup.lookup(voice.content_hash, voice.request_country, processor.analysis_mode)
+
+        if duplicate is not None:
+            dedup.copy_into(duplicate, voice)
+        else:
+            processor.apply_transcript(voice, whisper)
+            processor.apply_analysis(voice, processor.analyse(processor.transcript(whisper)))
+
+        return VoiceView.created(voice, dedup.outcome(duplicate))
+
+    @staticmethod
+    def wants_async(request) -> bool:
+        if 'respond-async' in request.headers.get('Prefer', ''):
+            return True
+
+        return settings.VOICE_PROCESSING_MODE == 'async'
+
+    @staticmethod
+    def analysis_mode(request) -> Optional[str]:
+        """LLM analysis mode asked for with `Prefer: analysis=...`; None leaves it to `LLM_ANALYSIS_MODE`."""
+        for preference in request.headers.get('Prefer', '').split(','):
+            name, _, value = preference.partition('=')
+            value = value.strip().strip('"')
+            if name.strip() == 'analysis' and value in LlmAnalyser.MODES:
+                return value
+        return None
 
     @extend_schema(
         tags=['Voice'],
@@ -89,10 +285,11 @@ class VoiceView(ViewSet):
     @action(methods=['delete'], detail=True)
     def destroy(self, request, uuid):
         try:
-            voice = Voice.objects.filter(deleted_at__isnull=True).get(pk=uuid)
+            voice = Voice.objects.get(pk=uuid)
             voice.file = None
             voice.deleted_at = timezone.now()
             voice.save()
+            VoiceResponseCache().invalidate(voice.uuid)
             return Response(status=status.HTTP_204_NO_CONTENT)
         except Voice.DoesNotExist:
             raise Http404
@@ -0,0 +1,90 @@
+"""Stdlib json vs orjson on realistic payloads.
+
+    python3 -m benchmarks.json_payloads [--words 600] [--repeat 2000]
+
+Times decoding a Whisper response, decoding the OpenAI analysis, and rendering a
+voice (with and without `expand=words`) through the DRF renderers.
+"""
+import argparse
+import os
+import random
+import timeit
+from unittest.mock import patch
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'langomine.settings')
+django.setup()
+
+from api.renderers import ORJSONRenderer  # noqa: E402
+from api.services import fast_json  # noqa: E402
+from api.tests.fixtures import LLM_ANALYSIS  # noqa: E402
+
+
+def whisper_response(words: int) -> dict:
+    rng = random.Random(0)
+    vocabulary = [' I', ' think', ' that', ' the', ' city', ' has', ' changed', ' a', ' lot', ' recently.']
+    timeline, segments = 0.0, []
+
+    for segment_id in range(0, words, 20):
+        segment_words = []
+        for _ in range(min(20, words - segment_id)):
+            start, timeline = timeline, timeline + rng.uniform(0.15, 0.6)
+            segment_words.append({"word": rng.choice(vocabulary), "start": round(start, 2), "end": round(timeline, 2),
+                                  "probability": rng.random()})
+        segments.append({
+            "id": len(segments), "seek": 0, "start": segment_words[0]['start'], "end": segment_words[-1]['end'],
+            "text": ''.join(word['word'] for word in segment_words), "tokens": list(range(50364, 50384)),
+            "temperature": 0.0, "avg_logprob": -0.3, "compression_ratio": 1.4, "no_speech_prob": 0.01,
+            "words": segment_words,
+        })
+
+    return {"text": ''.join(segment['text'] for segment in segments), "segments": segments, "language": "en"}
+
+
+def voice_payload(whisper: dict, with_words: bool) -> dict:
+    payload = {
+        "uuid": "2f1c8a8e-3a53-4f7a-9a43-0d3f8f0d7a11", "status": "analysed", "duration_s": 240,
+        "text": whisper['text'], "file": "https://bucket.s3.amazonaws.com/voices/2f1c8a8e.mp3?X-Amz-Signature=abc",
+        "language": "en", "created_at": "2026-10-18T12:00:00.123456Z", "analysed": {**LLM_ANALYSIS, "model_used": "gpt-4o"},
+    }
+    if with_words:
+        payload["words"] = [word for segment in whisper['segments'] for word in segment['words']]
+    return payload
+
+
+def run(cases, repeat: int) -> None:
+    print(f"{'case':<32}{'json µs':>12}{'orjson µs':>12}{'speedup':>10}")
+
+    for name, call in cases:
+        with patch('api.services.fast_json.orjson', None):
+            baseline = min(timeit.repeat(call, number=repeat, repeat=3)) / repeat * 1e6
+        fast = min(timeit.repeat(call, number=repeat, repeat=3)) / repeat * 1e6
+        print(f"{name:<32}{baseline:>12.1f}{fast:>12.1f}{baseline / fast:>9.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', type=int, default=600, help="Words in the synthetic recording (~4 minutes).")
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    if fast_json.orjson is None:
+        raise SystemExit("orjson is not installed, nothing to compare")
+
+    whisper = whisper_response(args.words)
+    whisper_body = fast_json.dumps(whisper)
+    analysis_body = fast_json.dumps(LLM_ANALYSIS).decode()
+    renderer = ORJSONRenderer()
+    voice, voice_with_words = voice_payload(whisper, False), voice_payload(whisper, True)
+
+    run([
+        (f"decode whisper ({len(whisper_body) / 1024:.1f} KiB)", lambda: fast_json.loads(whisper_body)),
+        (f"decode analysis ({len(analysis_body) / 1024:.1f} KiB)", lambda: fast_json.loads(analysis_body)),
+        ("render voice", lambda: renderer.render(voice)),
+        ("render voice expand=words", lambda: renderer.render(voice_with_words)),
+    ], args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""Load test for the voice endpoints against local Whisper and OpenAI stand-ins.
+
+    python3 -m benchmarks.load_voices [--concurrency 8] [--requests 200] [--workers 8] [--mix store=1,show=4,index=1]
+
+By default the app runs in-process on a fixed pool of `--workers` threads (like
+gunicorn's gthread worker) with a throwaway SQLite database, in-memory storage and
+the stubs from `benchmarks.stub_upstreams`. `--concurrency` clients replay the
+`--audio` upload and read back what they stored. The report has per-endpoint
+p50/p95/p99 latency, throughput and worker utilisation (busy worker time / worker
+time available). `--target URL` drives an already running deployment instead (no
+utilisation figures). `--json` saves the results and `--baseline` fails the run when
+a p95 regressed by more than `--max-regression`.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'langomine.settings')
+os.environ.setdefault('CORS_ALLOWED_ORIGIN', 'http://localhost:3000')
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+
+import requests  # noqa: E402
+
+from benchmarks import stub_upstreams  # noqa: E402  (sets Django up)
+
+AUDIO = Path(__file__).absolute().parent.parent / 'api/tests/assets/hi-there.mp3'
+STORE, SHOW, INDEX = 'POST /api/voices/', 'GET /api/voices/<uuid>/', 'GET /api/voices/'
+OPERATIONS = {'store': STORE, 'show': SHOW, 'index': INDEX}
+
+
+class PooledWSGIServer(WSGIServer):
+    """Serves each connection on one of a fixed number of worker threads; the rest wait in line."""
+
+    def __init__(self, address, workers: int) -> None:
+        super().__init__(address, QuietHandler)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='worker')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class BusyTime:
+    """WSGI middleware adding up the time workers spend on each endpoint."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.busy_s = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        started = time.perf_counter()
+        body = list(self.app(environ, start_response))
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.busy_s[self.endpoint(environ)] += elapsed
+        return body
+
+    @staticmethod
+    def endpoint(environ) -> str:
+        path = environ.get('PATH_INFO', '')
+        if environ['REQUEST_METHOD'] == 'POST':
+            return STORE
+        return INDEX if path.rstrip('/') == '/api/voices' else SHOW
+
+
+class Results:
+    def __init__(self) -> None:
+        self.latencies_s = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.uuids = []
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, latency_s: float, ok: bool, uuid: str = None) -> None:
+        with self._lock:
+            self.latencies_s[endpoint].append(latency_s)
+            if not ok:
+                self.errors[endpoint] += 1
+            if uuid:
+                self.uuids.append(uuid)
+
+    def random_uuid(self, rng: random.Random):
+        with self._lock:
+            return rng.choice(self.uuids) if self.uuids else None
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))] if ordered else 0.0
+
+
+def run_client(base_url: str, audio: bytes, mix, results: Results, budget: dict, seed: int) -> None:
+    rng = random.Random(seed)
+    session = requests.Session()
+    operations, weights = zip(*mix.items())
+
+    while True:
+        with budget['lock']:
+            if budget['left'] <= 0 or time.monotonic() >= budget['until']:
+                return
+            budget['left'] -= 1
+
+        operation = rng.choices(operations, weights)[0]
+        uuid = results.random_uuid(rng)
+        if operation == 'show' and uuid is None:
+            operation = 'store'
+
+        started = time.perf_counter()
+        try:
+            if operation == 'store':
+                response = session.post(f'{base_url}/api/voices/', files={'file': ('answer.mp3', audio)})
+            elif operation == 'show':
+                response = session.get(f'{base_url}/api/voices/{uuid}/')
+            else:
+                response = session.get(f'{base_url}/api/voices/')
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+
+        created = response.json().get('uuid') if ok and operation == 'store' else None
+        results.record(OPERATIONS[operation], time.perf_counter() - started, ok, created)
+
+
+def serve_in_process(args):
+    """Starts stubs and the app on a pooled WSGI server; returns (base URL, busy-time meter, cleanup)."""
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    asr, openai = stub_upstreams.start_stubs(args)
+    os.environ['OPENAI_BASE_URL'] = f'{openai.url}/v1'
+
+    overrides = override_settings(
+        DEBUG=False,
+        ALLOWED_HOSTS=['*'],
+        STORAGES={**settings.STORAGES, 'default': {'BACKEND': 'django.core.files.storage.memory.InMemoryStorage'}},
+        OPEN_AI_WHISPERER_HOST=asr[0].url,
+        ASR_HOSTS=[stub.url for stub in asr],
+        ASR_HOST_MAX_CONCURRENCY=max(1, args.asr_workers),
+        ASR_HEALTH_PROBE_INTERVAL_S=0,
+        VOICE_PROCESSING_MODE='sync',
+        # Every replayed upload is the same file; without these each would be a cache hit
+        VOICE_DEDUP_ENABLED=args.dedup,
+        LLM_ANALYSIS_CACHE_ENABLED=args.dedup,
+    )
+    overrides.enable()
+    database = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    meter = BusyTime(WSGIHandler())
+    server = PooledWSGIServer(('127.0.0.1', 0), args.workers)
+    server.set_app(meter)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def cleanup():
+        server.shutdown()
+        server.pool.shutdown(wait=False)
+        connection.creation.destroy_test_db(database, verbosity=0)
+        overrides.disable()
+        for stub in [*asr, openai]:
+            stub.stop()
+
+    return f'http://127.0.0.1:{server.server_port}', meter, cleanup
+
+
+def report(results: Results, wall_s: float, workers: int, meter) -> dict:
+    rows = {}
+    print(f"{'endpoint':<26}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>8}{'util':>7}")
+
+    for endpoint in (STORE, SHOW, INDEX):
+        samples = results.latencies_s.get(endpoint)
+        if not samples:
+            continue
+
+        row = rows[endpoint] = {
+            'requests': len(samples),
+            'errors': results.errors[endpoint],
+            'p50_ms': percentile(samples, 50) * 1000,
+            'p95_ms': percentile(samples, 95) * 1000,
+            'p99_ms': percentile(samples, 99) * 1000,
+            'throughput_rps': len(samples) / wall_s,
+            'utilisation': meter.busy_s[endpoint] / (workers * wall_s) if meter else None,
+        }
+        utilisation = f"{row['utilisation']:>6.0%}" if meter else f"{'-':>6}"
+        print(f"{endpoint:<26}{row['requests']:>9}{row['errors']:>8}{row['p50_ms']:>9.0f}{row['p95_ms']:>9.0f}"
+              f"{row['p99_ms']:>9.0f}{row['throughput_rps']:>8.2f} {utilisation}")
+
+    total = sum(len(samples) for samples in results.latencies_s.values())
+    busy = f", workers {sum(meter.busy_s.values()) / (workers * wall_s):.0%} busy" if meter else ''
+    print(f"\n{total} requests in {wall_s:.1f}s ({total / wall_s:.2f} req/s){busy}")
+
+    return rows
+
+
+def regressions(rows: dict, baseline: dict, max_regression: float):
+    for endpoint, row in rows.items():
+        before = baseline.get(endpoint, {}).get('p95_ms')
+        if before and row['p95_ms'] > before * (1 + max_regression):
+            yield f"{endpoint}: p95 {before:.0f} ms -> {row['p95_ms']:.0f} ms"
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(','):
+        operation, _, weight = part.partition('=')
+        if operation not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {operation!r}, expected one of {', '.join(OPERATIONS)}")
+        mix[operation] = float(weight or 1)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', help="Base URL of a running deployment; by default the app runs in-process.")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent clients.")
+    parser.add_argument('--requests', type=int, default=200, help="Total requests to send.")
+    parser.add_argument('--duration', type=float, default=0, help="Stop after this many seconds (0 = no limit).")
+    parser.add_argument('--workers', type=int, default=8, help="In-process app worker threads.")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('store=1,show=4,index=1'))
+    parser.add_argument('--audio', type=Path, default=AUDIO, help="Upload to replay.")
+    parser.add_argument('--dedup', action='store_true', help="Keep upload dedup and the analysis cache on.")
+    parser.add_argument('--json', type=Path, help="Write the results here.")
+    parser.add_argument('--baseline', type=Path, help="Results of an earlier run to compare p95 against.")
+    parser.add_argument('--max-regression', type=float, default=0.2, help="Allowed p95 growth over the baseline.")
+    parser.add_argument('--seed', type=int, default=0)
+    stub_upstreams.add_arguments(parser)
+    args = parser.parse_args()
+
+    meter, cleanup = None, None
+    base_url = args.target.rstrip('/') if args.target else None
+    if base_url is None:
+        base_url, meter, cleanup = serve_in_process(args)
+
+    audio = args.audio.read_bytes()
+    results = Results()
+    budget = {
+        'left': args.requests,
+        'until': time.monotonic() + args.duration if args.duration else float('inf'),
+        'lock': threading.Lock(),
+    }
+
+    started = time.monotonic()
+    try:
+        clients = [
+            threading.Thread(target=run_client, args=(base_url, audio, args.mix, results, budget, args.seed + index))
+            for index in range(args.concurrency)
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        wall_s = time.monotonic() - started
+    finally:
+        if cleanup:
+            cleanup()
+
+    rows = report(results, wall_s, args.workers, meter)
+
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+    if args.baseline:
+        failures = list(regressions(rows, json.loads(args.baseline.read_text()), args.max_regression))
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
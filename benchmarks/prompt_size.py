@@ -0,0 +1,124 @@
+"""Compact vs legacy LlmAnalyser prompts: size, and optionally latency and agreement on a live endpoint.
+
+    python3 -m benchmarks.prompt_size [--words 60,150,400] [--live --runs 5 [--transcript whisper.json ...]]
+
+Offline it builds both prompts for synthetic Whisper transcripts of `--words` words
+and prints their size in characters and tokens (tiktoken when installed, else about
+4 characters per token) and the time to build them. `--live` sends each transcript
+with both styles to OpenAI (or `OPENAI_BASE_URL`, e.g. `benchmarks.stub_upstreams`)
+`--runs` times and reports the latency, the prompt tokens OpenAI billed (and how many
+came from its prefix cache) and how far the compact prompt's band scores land from
+the legacy prompt's, as a proxy for quality.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import timeit
+from pathlib import Path
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'langomine.settings')
+django.setup()
+
+from django.test.utils import override_settings  # noqa: E402
+
+from api.services.llm_analyser import LlmAnalyser  # noqa: E402
+from api.services.prompt_builder import PromptBuilder  # noqa: E402
+from api.services.voice_processor import VoiceProcessor  # noqa: E402
+from benchmarks.json_payloads import whisper_response  # noqa: E402
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover
+    tiktoken = None
+
+STYLES = (PromptBuilder.LEGACY, PromptBuilder.COMPACT)
+CRITERIA = ('fluency_and_coherence', 'lexical_resource', 'grammatical_range_and_accuracy', 'pronunciation', 'overall_assessment')
+
+
+def count_tokens(messages) -> int:
+    text = ''.join(message['content'] for message in messages)
+    if tiktoken is None:
+        return len(text) // 4
+    return len(tiktoken.get_encoding('o200k_base').encode(text))
+
+
+def offline(transcripts, repeat: int) -> None:
+    estimate = '' if tiktoken else ' (~4 chars/token)'
+    print(f"{'transcript':<16}{'style':<9}{'chars':>9}{'tokens' + estimate:>26}{'build us':>10}")
+
+    for name, segment in transcripts:
+        sizes = {}
+        for style in STYLES:
+            builder = PromptBuilder(style=style)
+            messages = builder.messages(segment)
+            build_us = min(timeit.repeat(lambda: builder.messages(segment), number=repeat, repeat=3)) / repeat * 1e6
+            sizes[style] = count_tokens(messages)
+            print(f"{name:<16}{style:<9}{sum(len(m['content']) for m in messages):>9}{sizes[style]:>26}{build_us:>10.1f}")
+        print(f"{'':<16}compact is {sizes[PromptBuilder.COMPACT] / sizes[PromptBuilder.LEGACY]:.0%} of legacy\n")
+
+
+def live(transcripts, runs: int) -> None:
+    results = {style: {'latency_s': [], 'prompt_tokens': [], 'cached_tokens': [], 'bands': []} for style in STYLES}
+
+    for name, segment in transcripts:
+        for _ in range(runs):
+            for style in STYLES:
+                with override_settings(LLM_PROMPT_STYLE=style, LLM_ANALYSIS_CACHE_ENABLED=False):
+                    analyser = LlmAnalyser(segment, country_code='')
+                    started = time.perf_counter()
+                    response = analyser.openai_client.chat.completions.create(
+                        model=analyser.model.value,
+                        messages=analyser._build_messages(),
+                        response_format=LlmAnalyser.ANALYSIS_FUNCTION,
+                    )
+                    results[style]['latency_s'].append(time.perf_counter() - started)
+
+                usage = response.usage
+                details = getattr(usage, 'prompt_tokens_details', None)
+                results[style]['prompt_tokens'].append(usage.prompt_tokens)
+                results[style]['cached_tokens'].append(getattr(details, 'cached_tokens', None) or 0)
+                analysis = json.loads(response.choices[0].message.content)
+                results[style]['bands'].append([analysis.get(criterion, {}).get('band_score') for criterion in CRITERIA])
+        print(f"{name}: {runs} run(s) per style done")
+
+    print(f"\n{'style':<9}{'p50 s':>8}{'max s':>8}{'prompt tok':>12}{'cached tok':>12}")
+    for style in STYLES:
+        row = results[style]
+        print(f"{style:<9}{statistics.median(row['latency_s']):>8.2f}{max(row['latency_s']):>8.2f}"
+              f"{statistics.mean(row['prompt_tokens']):>12.0f}{statistics.mean(row['cached_tokens']):>12.0f}")
+
+    print("\nMean |compact - legacy| band difference per criterion (same transcript and run):")
+    for index, criterion in enumerate(CRITERIA):
+        deltas = [
+            abs(compact[index] - legacy[index])
+            for legacy, compact in zip(results[PromptBuilder.LEGACY]['bands'], results[PromptBuilder.COMPACT]['bands'])
+            if legacy[index] is not None and compact[index] is not None
+        ]
+        print(f"  {criterion:<32}{statistics.mean(deltas) if deltas else float('nan'):.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', default='60,150,400', help="Comma-separated sizes of synthetic transcripts.")
+    parser.add_argument('--transcript', type=Path, action='append', default=[], help="Whisper JSON to use instead.")
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--live', action='store_true', help="Call the OpenAI API (costs credit unless stubbed).")
+    parser.add_argument('--runs', type=int, default=3, help="Live calls per transcript and style.")
+    args = parser.parse_args()
+
+    if args.transcript:
+        transcripts = [(path.stem, VoiceProcessor.transcript(json.loads(path.read_text()))) for path in args.transcript]
+    else:
+        transcripts = [(f'{words} words', VoiceProcessor.transcript(whisper_response(int(words)))) for words in args.words.split(',')]
+
+    offline(transcripts, args.repeat)
+    if args.live:
+        live(transcripts, args.runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""Local stand-ins for the Whisper ASR service and the OpenAI chat completions API.
+
+    python3 -m benchmarks.stub_upstreams [--asr-port 9100] [--openai-port 9200] [--asr-latency-ms 800] ...
+
+Replies have configurable latency (mean plus uniform jitter) and size: the ASR stub
+answers with a synthetic Whisper response of `--words` words and the OpenAI stub
+with the test-fixture analysis padded to `--analysis-bytes`. `--asr-workers` caps
+how many transcriptions the ASR stub runs at once, like a single Whisper container.
+Point the app at them with `ASR_HOSTS=http://127.0.0.1:9100` and
+`OPENAI_BASE_URL=http://127.0.0.1:9200/v1`.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.json_payloads import whisper_response
+from api.tests.fixtures import LLM_ANALYSIS
+
+
+class StubUpstream(ThreadingHTTPServer):
+    """Threaded HTTP server replying to POSTs after a random latency; GETs answer 200 (health checks)."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int, latency_ms: float, jitter_ms: float, workers: int = 0, seed: int = 0) -> None:
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slots = threading.BoundedSemaphore(workers) if workers else None
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}'
+
+    def delay_s(self) -> float:
+        with self._lock:
+            self.requests += 1
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def reply(self, path: str, body: bytes) -> bytes:
+        raise NotImplementedError
+
+    def start(self) -> 'StubUpstream':
+        threading.Thread(target=self.serve_forever, name=type(self).__name__, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send(b'{}')
+
+    def do_POST(self):
+        body = self.read_body()
+        server = self.server
+
+        if server.slots is not None:
+            server.slots.acquire()
+        try:
+            time.sleep(server.delay_s())
+            payload = server.reply(self.path, body)
+        finally:
+            if server.slots is not None:
+                server.slots.release()
+
+        self.send(payload)
+
+    def read_body(self) -> bytes:
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            body = b''
+            while size := int(self.rfile.readline().strip() or b'0', 16):
+                body += self.rfile.read(size)
+                self.rfile.readline()
+            self.rfile.readline()
+            return body
+
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def send(self, payload: bytes) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class AsrStub(StubUpstream):
+    """`POST /asr` answers like onerahmet/openai-whisper-asr-webservice with `output=json`."""
+
+    def __init__(self, port: int = 0, latency_ms: float = 800, jitter_ms: float = 200, workers: int = 1, words: int = 120) -> None:
+        super().__init__(port, latency_ms, jitter_ms, workers)
+        self.payload = json.dumps(whisper_response(words)).encode()
+
+    def reply(self, path: str, body: bytes) -> bytes:
+        return self.payload
+
+
+class OpenAIStub(StubUpstream):
+    """`POST /v1/chat/completions` answers with the fixture analysis as the message content."""
+
+    def __init__(self, port: int = 0, latency_ms: float = 2500, jitter_ms: float = 500, analysis_bytes: int = 0) -> None:
+        super().__init__(port, latency_ms, jitter_ms)
+        analysis = json.loads(json.dumps(LLM_ANALYSIS))
+        padding = analysis_bytes - len(json.dumps(analysis))
+        if padding > 0:
+            analysis['overall_assessment']['summary'] += ' ' + 'x' * padding
+        self.content = json.dumps(analysis)
+
+    def reply(self, path: str, body: bytes) -> bytes:
+        request = json.loads(body or b'{}')
+        prompt_tokens = len(json.dumps(request.get('messages', []))) // 4
+        completion_tokens = len(self.content) // 4
+
+        return json.dumps({
+            "id": f"chatcmpl-stub-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get('model', 'gpt-4o-mini'),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }).encode()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--asr-latency-ms', type=float, default=800)
+    parser.add_argument('--asr-jitter-ms', type=float, default=200)
+    parser.add_argument('--asr-workers', type=int, default=1, help="Concurrent transcriptions per ASR stub (0 = unlimited).")
+    parser.add_argument('--asr-hosts', type=int, default=1, help="Number of ASR stubs.")
+    parser.add_argument('--words', type=int, default=120, help="Words in each stub transcript.")
+    parser.add_argument('--openai-latency-ms', type=float, default=2500)
+    parser.add_argument('--openai-jitter-ms', type=float, default=500)
+    parser.add_argument('--analysis-bytes', type=int, default=0, help="Pad the analysis JSON to this size.")
+
+
+def start_stubs(args, asr_port: int = 0, openai_port: int = 0):
+    asr = [
+        AsrStub(asr_port + index if asr_port else 0, args.asr_latency_ms, args.asr_jitter_ms, args.asr_workers, args.words).start()
+        for index in range(args.asr_hosts)
+    ]
+    openai = OpenAIStub(openai_port, args.openai_latency_ms, args.openai_jitter_ms, args.analysis_bytes).start()
+    return asr, openai
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--asr-port', type=int, default=9100, help="First ASR stub port; further stubs count up.")
+    parser.add_argument('--openai-port', type=int, default=9200)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    asr, openai = start_stubs(args, args.asr_port, args.openai_port)
+    print(f"ASR_HOSTS={','.join(stub.url for stub in asr)}")
+    print(f"OPENAI_BASE_URL={openai.url}/v1")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
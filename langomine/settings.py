@@ -54,6 +54,16 @@ INSTALLED_APPS = [
 REST_FRAMEWORK = {
     # YOUR SETTINGS
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # orjson-backed JSON, falling back to the stdlib when orjson is not installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -61,6 +71,7 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.ServerTimingMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     'django.middleware.security.SecurityMiddleware',
@@ -70,6 +81,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.RequestDeadlineMiddleware',
 ]
 
 ROOT_URLCONF = 'langomine.urls'
@@ -111,6 +123,44 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # In-process LRU tier for LLM analyses
+    'analysis-memory': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'analysis-memory',
+        'TIMEOUT': int(os.getenv("LLM_ANALYSIS_CACHE_MEMORY_TTL_S", 3600)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv("LLM_ANALYSIS_CACHE_MEMORY_ENTRIES", 1000)),
+        },
+    },
+    # Persistent tier shared by all processes; migration 0024 creates the DatabaseCache tables
+    'analysis-db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'api_analysis_cache',
+        'TIMEOUT': int(os.getenv("LLM_ANALYSIS_CACHE_DB_TTL_S", 30 * 24 * 3600)),
+    },
+    # Rendered GET /api/voices/<uuid>/ bodies; the short TTL bounds how long other processes serve deleted voices
+    'voice-response-memory': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'voice-response-memory',
+        'TIMEOUT': int(os.getenv("VOICE_RESPONSE_CACHE_MEMORY_TTL_S", 60)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv("VOICE_RESPONSE_CACHE_MEMORY_ENTRIES", 5000)),
+        },
+    },
+    'voice-response-db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'api_voice_response_cache',
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -170,6 +220,119 @@ STORAGES = {
 
 OPEN_AI_WHISPERER_HOST=os.getenv("OPEN_AI_WHISPERER_HOST")
 
+# ASR endpoints balanced by least outstanding requests; defaults to the single OPEN_AI_WHISPERER_HOST
+ASR_HOSTS = [host.strip() for host in os.getenv("ASR_HOSTS", OPEN_AI_WHISPERER_HOST or '').split(',') if host.strip()]
+ASR_HOST_MAX_CONCURRENCY = int(os.getenv("ASR_HOST_MAX_CONCURRENCY", 2))
+ASR_POOL_ACQUIRE_TIMEOUT_S = float(os.getenv("ASR_POOL_ACQUIRE_TIMEOUT_S", 30))
+ASR_HOST_COOLDOWN_S = float(os.getenv("ASR_HOST_COOLDOWN_S", 30))
+ASR_HEALTH_PATH = os.getenv("ASR_HEALTH_PATH", "/docs")
+ASR_HEALTH_PROBE_INTERVAL_S = float(os.getenv("ASR_HEALTH_PROBE_INTERVAL_S", 10))
+
+# Keep-alive connection pools per upstream, one pool per process
+OUTBOUND_HTTP = {
+    'whisper': {
+        'pool_size': int(os.getenv("WHISPER_POOL_SIZE", 10)),
+        'connect_timeout': float(os.getenv("WHISPER_CONNECT_TIMEOUT_S", 5)),
+        'read_timeout': float(os.getenv("WHISPER_READ_TIMEOUT_S", 300)),
+    },
+    'openai': {
+        'pool_size': int(os.getenv("OPENAI_POOL_SIZE", 20)),
+        'connect_timeout': float(os.getenv("OPENAI_CONNECT_TIMEOUT_S", 5)),
+        'read_timeout': float(os.getenv("OPENAI_READ_TIMEOUT_S", 120)),
+    },
+}
+
+# Resilience around each upstream (see api/services/resilience.py). Per-attempt timeouts come from OUTBOUND_HTTP,
+# cut down to what is left of the request (or job) budget.
+REQUEST_BUDGET_S = float(os.getenv("REQUEST_BUDGET_S", 240))
+VOICE_JOB_BUDGET_S = float(os.getenv("VOICE_JOB_BUDGET_S", 900))
+# Threads shared by hedge attempts across requests; primary attempts never wait for them
+UPSTREAM_HEDGE_WORKERS = int(os.getenv("UPSTREAM_HEDGE_WORKERS", 16))
+UPSTREAM_RESILIENCE = {
+    'whisper': {
+        'retries': int(os.getenv("WHISPER_RETRIES", 2)),
+        'backoff_s': float(os.getenv("WHISPER_BACKOFF_S", 0.5)),
+        'backoff_cap_s': float(os.getenv("WHISPER_BACKOFF_CAP_S", 5)),
+        # A hedged transcription doubles Whisper load, so it is opt-in
+        'hedge': os.getenv("WHISPER_HEDGE", "false").lower() == "true",
+        'hedge_after_s': float(os.getenv("WHISPER_HEDGE_AFTER_S", 30)),
+        'hedge_min_samples': int(os.getenv("WHISPER_HEDGE_MIN_SAMPLES", 20)),
+        'breaker_failures': int(os.getenv("WHISPER_BREAKER_FAILURES", 5)),
+        'breaker_reset_s': float(os.getenv("WHISPER_BREAKER_RESET_S", 30)),
+    },
+    'openai': {
+        'retries': int(os.getenv("OPENAI_RETRIES", 2)),
+        'backoff_s': float(os.getenv("OPENAI_BACKOFF_S", 0.5)),
+        'backoff_cap_s': float(os.getenv("OPENAI_BACKOFF_CAP_S", 8)),
+        'hedge': os.getenv("OPENAI_HEDGE", "true").lower() == "true",
+        'hedge_after_s': float(os.getenv("OPENAI_HEDGE_AFTER_S", 20)),
+        'hedge_min_samples': int(os.getenv("OPENAI_HEDGE_MIN_SAMPLES", 20)),
+        'breaker_failures': int(os.getenv("OPENAI_BREAKER_FAILURES", 5)),
+        'breaker_reset_s': float(os.getenv("OPENAI_BREAKER_RESET_S", 30)),
+    },
+}
+
+# Per-stage timings go out in a Server-Timing header (browser devtools show them) and to the histograms on /api/metrics/
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+
+# Long recordings are cut near silence into windows transcribed in parallel
+ASR_CHUNKING_ENABLED = os.getenv("ASR_CHUNKING_ENABLED", "true").lower() == "true"
+ASR_CHUNK_THRESHOLD_S = float(os.getenv("ASR_CHUNK_THRESHOLD_S", 60))
+ASR_CHUNK_SECONDS = float(os.getenv("ASR_CHUNK_SECONDS", 30))
+ASR_CHUNK_SILENCE_SEARCH_S = float(os.getenv("ASR_CHUNK_SILENCE_SEARCH_S", 5))
+ASR_CHUNK_MAX_WORKERS = int(os.getenv("ASR_CHUNK_MAX_WORKERS", 4))
+
+# Optional pre-ASR pass: 16 kHz mono, edge silence trimmed, re-encoded (Opus via ffmpeg, else WAV).
+# Only the ASR request gets the reduced audio; the original upload is what is stored.
+ASR_NORMALIZE_AUDIO = os.getenv("ASR_NORMALIZE_AUDIO", "false").lower() == "true"
+ASR_NORMALIZE_CODEC = os.getenv("ASR_NORMALIZE_CODEC", "opus")
+ASR_NORMALIZE_BITRATE = os.getenv("ASR_NORMALIZE_BITRATE", "24k")
+ASR_NORMALIZE_SILENCE_DBFS = float(os.getenv("ASR_NORMALIZE_SILENCE_DBFS", -45))
+ASR_NORMALIZE_PADDING_S = float(os.getenv("ASR_NORMALIZE_PADDING_S", 0.25))
+
+# "sync" processes uploads inside the request, "async" queues them for `manage.py process_voice_jobs`
+VOICE_PROCESSING_MODE = os.getenv("VOICE_PROCESSING_MODE", "sync")
+VOICE_JOB_MAX_ATTEMPTS = int(os.getenv("VOICE_JOB_MAX_ATTEMPTS", 3))
+VOICE_JOB_RETRY_DELAY_S = int(os.getenv("VOICE_JOB_RETRY_DELAY_S", 10))
+# A running job's lock only goes stale after its whole budget plus a margin, so a slow job is never claimed twice
+VOICE_JOB_LOCK_TIMEOUT_S = int(os.getenv("VOICE_JOB_LOCK_TIMEOUT_S", VOICE_JOB_BUDGET_S + 60))
+
+# Uploads are probed from their container headers; longer recordings are rejected (0 = no limit)
+VOICE_MAX_DURATION_S = int(os.getenv("VOICE_MAX_DURATION_S", 15 * 60))
+
+# Sync uploads read once and streamed to Whisper and storage concurrently (no dedup-before-ASR, no chunked ASR)
+VOICE_UPLOAD_STREAMING = os.getenv("VOICE_UPLOAD_STREAMING", "false").lower() == "true"
+VOICE_UPLOAD_TEE_CHUNK_BYTES = int(os.getenv("VOICE_UPLOAD_TEE_CHUNK_BYTES", 256 * 1024))
+VOICE_UPLOAD_TEE_MAX_CHUNKS = int(os.getenv("VOICE_UPLOAD_TEE_MAX_CHUNKS", 16))
+
+# Presigned direct-to-S3 uploads (POST /api/voices/uploads/)
+VOICE_UPLOAD_URL_EXPIRE_S = int(os.getenv("VOICE_UPLOAD_URL_EXPIRE_S", 900))
+VOICE_UPLOAD_MAX_BYTES = int(os.getenv("VOICE_UPLOAD_MAX_BYTES", 50 * 1024 * 1024))
+
+# Reuse transcript and analysis of byte-identical uploads; 0 days means no age limit
+VOICE_DEDUP_ENABLED = os.getenv("VOICE_DEDUP_ENABLED", "true").lower() == "true"
+VOICE_DEDUP_MAX_AGE_DAYS = int(os.getenv("VOICE_DEDUP_MAX_AGE_DAYS", 0))
+
+# Transcript-keyed LLM analysis cache, tiers are CACHES aliases ordered fastest first
+LLM_ANALYSIS_CACHE_ENABLED = os.getenv("LLM_ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+LLM_ANALYSIS_CACHE_TIERS = ['analysis-memory', 'analysis-db']
+
+# "compact" sends a fixed instruction prefix plus the transcript with pause markers and low-confidence words;
+# "legacy" sends the repr of the whole transcript dict, word timings and probabilities included
+LLM_PROMPT_STYLE = os.getenv("LLM_PROMPT_STYLE", "compact")
+# "single" (one structured-output call) or "parallel" (one call per criterion); uploads can override it with
+# `Prefer: analysis=parallel`
+LLM_ANALYSIS_MODE = os.getenv("LLM_ANALYSIS_MODE", "single")
+LLM_PROMPT_PAUSE_S = float(os.getenv("LLM_PROMPT_PAUSE_S", 0.5))
+LLM_PROMPT_LOW_CONFIDENCE = float(os.getenv("LLM_PROMPT_LOW_CONFIDENCE", 0.5))
+# Answers with fewer words get a band 1 analysis built locally instead of an LLM call
+LLM_MIN_WORDS = int(os.getenv("LLM_MIN_WORDS", 2))
+
+# Rendered voice bodies of finished voices, served with ETags; max-age is also capped by the signed file URL expiry
+VOICE_RESPONSE_CACHE_ENABLED = os.getenv("VOICE_RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+VOICE_RESPONSE_CACHE_TIERS = ['voice-response-memory', 'voice-response-db']
+VOICE_RESPONSE_CACHE_MAX_AGE_S = int(os.getenv("VOICE_RESPONSE_CACHE_MAX_AGE_S", 24 * 3600))
+
 SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True
 }